@@ -0,0 +1,316 @@
+"""
+Background serial acquisition for SensorLab.
+
+A reader thread pulls raw bytes from the port, parses whatever complete
+frames have arrived as one block and hands (ts, block) batches to the UI
+through a bounded queue. When the UI falls behind the oldest batch is
+dropped, so a slow repaint never stalls the port.
+
+FakeDevice streams the same frames through a pseudo-terminal, so the full
+path can run without hardware (POSIX only).
+"""
+
+import os, sys, time, queue, threading
+import numpy as np
+
+from codec import BinaryFrameDecoder, BinaryFrameEncoder
+from metrics import Timer
+
+FRAME_ASCII = "ASCII (CSV)"
+FRAME_BINARY = "Binary"
+SIMULATED_PORT = "Simulated device"
+
+
+# ---------- Port helpers ----------
+def list_ports():
+    # real serial ports; empty if pyserial is not installed
+    try:
+        from serial.tools import list_ports as lp
+    except ImportError:
+        return []
+    return [p.device for p in lp.comports()]
+
+
+def open_port(port, baud, timeout_ms):
+    try:
+        import serial
+    except ImportError:
+        raise RuntimeError("pyserial is required for serial acquisition (pip install pyserial)")
+    return serial.Serial(port, int(baud), timeout=timeout_ms / 1000.0)
+
+
+# ---------- ASCII (CSV) frames ----------
+class AsciiFrameParser:
+    """One frame per line: `v1,v2,...,vN\\n`. Feed raw bytes, get (n, N) blocks."""
+
+    max_tail = 1 << 16
+
+    def __init__(self, channels):
+        self.channels = int(channels)
+        self.bad_frames = 0
+        self._tail = b""
+
+    def reset(self):
+        self._tail = b""
+
+    def feed(self, data):
+        buf = self._tail + data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            # no complete line yet; drop runaway garbage without newlines
+            self._tail = buf if len(buf) < self.max_tail else b""
+            return np.empty((0, self.channels))
+        body, self._tail = buf[:end], buf[end + 1:]
+        commas = self.channels - 1
+        lines = [ln for ln in body.replace(b"\r", b"").split(b"\n") if ln]
+        good = [ln for ln in lines if ln.count(b",") == commas]
+        self.bad_frames += len(lines) - len(good)
+        if not good:
+            return np.empty((0, self.channels))
+        fields = b",".join(good).split(b",")
+        try:
+            vals = np.fromiter(map(float, fields), np.float64, count=len(fields))
+        except ValueError:
+            return self._feed_slow(good)
+        return vals.reshape(-1, self.channels)
+
+    def _feed_slow(self, lines):
+        # only used when a batch holds a malformed number somewhere
+        rows = []
+        for ln in lines:
+            try:
+                rows.append([float(v) for v in ln.split(b",")])
+            except ValueError:
+                self.bad_frames += 1
+        return np.array(rows, dtype=np.float64).reshape(-1, self.channels)
+
+
+def make_parser(frame, channels, crc=False):
+    if frame == FRAME_ASCII:
+        return AsciiFrameParser(channels)
+    if frame == FRAME_BINARY:
+        return BinaryFrameDecoder(channels, crc)
+    raise ValueError(f"Unsupported frame type: {frame}")
+
+
+# ---------- Acquisition engine ----------
+class AcquisitionEngine:
+    def __init__(self, port, baud=115200, channels=8, frame=FRAME_ASCII, rate=10,
+                 timeout_ms=1000, crc=False, queue_size=256, batch_interval=0.01, clock=None):
+        self.port = port
+        self.baud = int(baud)
+        self.channels = int(channels)
+        self.rate = max(1, int(rate))  # nominal, used to spread timestamps inside a batch
+        self.timeout_ms = int(timeout_ms)
+        self.batch_interval = batch_interval
+        self.clock = clock or time.time  # epoch seconds; shared between devices by DeviceManager
+        self.parser = make_parser(frame, channels, crc)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.samples = 0
+        self.dropped_batches = 0
+        self.late_samples = 0  # arrived faster than the nominal rate allows (reader stalled, then caught up)
+        self.parse_time = Timer()
+        self.error = None
+        self._last_ts = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def bad_frames(self):
+        return self.parser.bad_frames
+
+    @property
+    def backlog(self):
+        return self.queue.qsize()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        # open here so a bad port fails loudly in the caller's thread
+        self._ser = open_port(self.port, self.baud, self.timeout_ms)
+        self._thread = threading.Thread(target=self._run, name=f"acq-{self.port}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 + self.timeout_ms / 1000.0)
+            self._thread = None
+
+    def _run(self):
+        ser = self._ser
+        try:
+            while not self._stop.is_set():
+                waiting = ser.in_waiting
+                data = ser.read(waiting or 1)  # blocks up to the port timeout when idle
+                if not data:
+                    continue
+                t0 = time.perf_counter()
+                block = self.parser.feed(data)
+                self.parse_time.add(time.perf_counter() - t0)
+                if len(block):
+                    self._push(self._stamp(len(block)), block)
+                # let the next batch accumulate instead of parsing line by line
+                self._stop.wait(self.batch_interval)
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                ser.close()
+            except Exception:
+                pass
+
+    def _stamp(self, n):
+        # host receive time, spread back over the batch at the nominal rate
+        now = self.clock()
+        ts = now - np.arange(n - 1, -1, -1) / self.rate
+        if ts[0] <= self._last_ts:
+            # read jitter overlaps batches by a fraction of a period; only a longer lag means the reader fell behind
+            self.late_samples += int(np.count_nonzero(ts < self._last_ts - 1.0 / self.rate))
+            ts += self._last_ts - ts[0] + 1e-6
+        self._last_ts = ts[-1]
+        return ts
+
+    def _push(self, ts, block):
+        self.samples += len(ts)
+        try:
+            self.queue.put_nowait((ts, block))
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+                self.dropped_batches += 1
+            except queue.Empty:
+                pass
+            self.queue.put_nowait((ts, block))
+
+    def drain(self):
+        # everything queued so far as one (ts, block) pair, or None
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not items:
+            return None
+        if len(items) == 1:
+            return items[0]
+        return np.concatenate([t for t, _ in items]), np.concatenate([b for _, b in items])
+
+
+# ---------- Simulated device ----------
+def simulated_block(t, channels):
+    # same waveform family the dashboard used to synthesize itself
+    t = np.asarray(t, dtype=np.float64)[:, None]
+    ch = np.arange(channels)[None, :]
+    noise = np.random.normal(0, 0.01, (t.shape[0], channels))
+    return np.sin(t * (0.25 + ch * 0.06)) + ch * 0.2 + noise
+
+
+def encode_ascii(block):
+    return "".join(",".join(f"{v:.6f}" for v in row) + "\n" for row in block).encode()
+
+
+class FakeDevice:
+    """Pseudo-terminal that streams simulated frames; open `port` like a serial port."""
+
+    def __init__(self, channels=8, rate=10, frame=FRAME_ASCII, crc=False):
+        if not sys.platform.startswith(("linux", "darwin")):
+            raise RuntimeError("The simulated device needs a POSIX pseudo-terminal")
+        import pty, tty
+        self.channels = int(channels)
+        self.rate = max(1, int(rate))
+        self.frame = frame
+        self.crc = crc
+        self._binary = BinaryFrameEncoder(crc)
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        self.sent = 0
+        self.overruns = 0
+        self.heater = 0.0  # volts; a hotter film reads lower
+        self._schedule = None  # (setpoint_at, clock) once the board holds the heater LUT itself
+        self._pending = b""  # bytes of a batch the pty has not taken yet
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_rate(self, rate):
+        self.rate = max(1, int(rate))
+
+    def set_heater(self, volts):
+        self.heater = float(volts)
+
+    def set_schedule(self, setpoint_at, clock):
+        # like a board that was sent the heater LUT: every sample gets the set-point of its own
+        # timestamp, however late the host's scheduler thread runs
+        self._schedule = (setpoint_at, clock)
+
+    def block(self, n):
+        # the next n samples, as they would read with the heater at its current set-point
+        t = (self.sent + np.arange(n)) / self.rate
+        if self._schedule is None:
+            volts = self.heater
+        else:
+            setpoint_at, clock = self._schedule
+            volts = setpoint_at(clock() - np.arange(n - 1, -1, -1) / self.rate)[:, None]
+        return simulated_block(t, self.channels) - 0.05 * volts
+
+    def encode(self, block):
+        if self.frame == FRAME_ASCII:
+            return encode_ascii(block)
+        if self.frame == FRAME_BINARY:
+            return self._binary.encode(block)
+        raise ValueError(f"Unsupported frame type: {self.frame}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fake-device", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _run(self):
+        t0 = time.perf_counter()
+        due = 0.0  # samples owed since the last rate change
+        last = t0
+        while not self._stop.is_set():
+            self._stop.wait(max(0.002, min(0.02, 1.0 / self.rate)))
+            now = time.perf_counter()
+            due += (now - last) * self.rate
+            last = now
+            n = int(due)
+            if n <= 0:
+                continue
+            due -= n
+            try:
+                if self._pending:
+                    # the pty took only part of an earlier batch; finish it before anything new
+                    self._pending = self._pending[os.write(self.master, self._pending):]
+                if self._pending:
+                    self.overruns += 1  # nobody is reading; behave like a full UART FIFO
+                    continue
+                data = self.encode(self.block(n))
+                self._pending = data[os.write(self.master, data):]
+            except BlockingIOError:
+                self.overruns += 1
+                continue
+            except OSError:
+                break
+            self.sent += n  # fully written, or queued in _pending for the next tick
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+SensorLab pipeline benchmarks.
+
+A synthetic source replays the simulated waveform in the same ~10 ms
+batches the reader thread produces, for every combination of sampling
+rate, channel count and device count in the sweep, through each stage:
+
+  parse    ASCII / binary frame decoding (bytes -> samples)
+  buffer   TieredHistory.append (RAM ring + spill files + tiers)
+  features FeatureEngine.process (ΔR/R0, stats, events, cycles)
+  render   DevicePlot.render plus an offscreen repaint (Qt, no display)
+  logger   RunLogger CSV / HDF5 (write() cost and sustained bytes/s)
+  startup  GUI cold start to the start page, first dashboard, and process
+           CPU while idle on each, sampled after a settle period
+           (offscreen Qt; one case, not swept)
+
+Each case runs in a fresh process so its peak RSS is its own. Stage costs
+are timed per batch tick (all devices), reported as p50/p99 in µs, plus
+throughput and the real-time factor (stream seconds per busy second).
+Startup and idle CPU are also checked against fixed BUDGETS; going over
+one fails the run like a regression does.
+
+Run: python bench.py --quick
+      python bench.py --quick --compare bench_baseline.json   # exit 1 on regression
+      python bench.py --quick --save bench_baseline.json      # the committed baseline is a --quick run
+
+Peak RSS is reported where the resource module exists (not on Windows).
+"""
+
+import argparse, json, os, platform, sys, tempfile, time
+import multiprocessing as mp
+import numpy as np
+
+STAGES = ("parse", "buffer", "features", "render", "logger", "startup")
+BATCH_INTERVAL = 0.01  # seconds of stream per reader batch, as in AcquisitionEngine
+
+
+# ---------- Synthetic source ----------
+def synthetic_batches(rate, channels, seconds, batch_interval=BATCH_INTERVAL, t0=1.7e9):
+    """(ts, block) batches covering `seconds` of stream at `rate` Hz."""
+    from acquisition import simulated_block
+    n = max(1, int(round(rate * seconds)))
+    t = np.arange(n) / rate
+    block = simulated_block(t, channels)
+    per = rate * batch_interval
+    edges = np.unique(np.floor(np.arange(0, n / per + 1) * per).astype(np.int64).clip(0, n))
+    return [(t0 + t[a:b], block[a:b]) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def peak_rss_mb():
+    # None where there is no resource module (Windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024.0
+
+
+def summarize(ticks, samples, seconds):
+    ticks = np.asarray(ticks) * 1e6
+    busy = ticks.sum() / 1e6
+    return {"p50_us": float(np.percentile(ticks, 50)), "p99_us": float(np.percentile(ticks, 99)),
+            "samples_per_s": samples / busy if busy else float("inf"),
+            "realtime_factor": seconds / busy if busy else float("inf")}
+
+
+# ---------- Stages ----------
+def bench_parse(rate, channels, devices, seconds, frame="binary"):
+    from acquisition import AsciiFrameParser, encode_ascii
+    from codec import BinaryFrameDecoder, encode_frames
+    batches = synthetic_batches(rate, channels, seconds)
+    payload = b"".join(encode_frames(b, crc=True) if frame == "binary" else encode_ascii(b) for _, b in batches)
+    # serial reads cut the byte stream anywhere; split it evenly into one read per batch
+    cuts = np.linspace(0, len(payload), len(batches) + 1).astype(int)
+    reads = [payload[a:b] for a, b in zip(cuts[:-1], cuts[1:])]
+    parsers = [BinaryFrameDecoder(channels, True) if frame == "binary" else AsciiFrameParser(channels)
+               for _ in range(devices)]
+    ticks, got = [], 0
+    for chunk in reads:
+        t0 = time.perf_counter()
+        for p in parsers:
+            got += len(p.feed(chunk))
+        ticks.append(time.perf_counter() - t0)
+    out = summarize(ticks, got, seconds)
+    out["bytes_per_s"] = len(payload) * devices / (np.sum(ticks) or 1e-12)
+    return out
+
+
+def bench_buffer(rate, channels, devices, seconds):
+    from history import TieredHistory
+    batches = synthetic_batches(rate, channels, seconds)
+    hists = [TieredHistory(channels, max(300, int(rate * 30))) for _ in range(devices)]
+    try:
+        ticks = []
+        for ts, block in batches:
+            t0 = time.perf_counter()
+            for h in hists:
+                h.append(ts, block)
+            ticks.append(time.perf_counter() - t0)
+    finally:
+        for h in hists:
+            h.close()
+    return summarize(ticks, sum(len(ts) for ts, _ in batches) * devices, seconds)
+
+
+def bench_features(rate, channels, devices, seconds):
+    from features import FeatureEngine
+    batches = synthetic_batches(rate, channels, seconds)
+    engines = [FeatureEngine(channels, rate, cycle_seconds=2.0) for _ in range(devices)]
+    ticks = []
+    for ts, block in batches:
+        t0 = time.perf_counter()
+        for e in engines:
+            e.process(ts, block)
+        ticks.append(time.perf_counter() - t0)
+    return summarize(ticks, sum(len(ts) for ts, _ in batches) * devices, seconds)
+
+
+def bench_render(rate, channels, devices, seconds, frames=60):
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6 import QtWidgets
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        from plots import DevicePlot
+    except ImportError as e:
+        return {"skipped": f"Qt unavailable: {e}"}
+    from history import TieredHistory
+    batches = synthetic_batches(rate, channels, seconds)
+    hists, views = [], []
+    for i in range(devices):
+        h = TieredHistory(channels, max(300, int(rate * 30)))
+        for ts, block in batches:
+            h.append(ts, block)
+        v = DevicePlot(f"dev{i + 1}", channels)
+        v.resize(1200, max(150, 900 // devices))
+        hists.append(h); views.append(v)
+    try:
+        ticks = []
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            for v, h in zip(views, hists):
+                v.dirty = True
+                v.render(h)
+                v.grab()  # paint offscreen, as a visible frame would
+            app.processEvents()
+            ticks.append(time.perf_counter() - t0)
+    finally:
+        for h in hists:
+            h.close()
+    ticks = np.asarray(ticks) * 1e3
+    return {"frame_p50_ms": float(np.percentile(ticks, 50)), "frame_p99_ms": float(np.percentile(ticks, 99)),
+            "max_fps": float(1e3 / np.percentile(ticks, 50))}
+
+
+def bench_logger(rate, channels, devices, seconds, fmt="CSV"):
+    from runlog import RunLogger
+    if fmt == "HDF5":
+        try:
+            import h5py  # noqa: F401
+        except ImportError:
+            return {"skipped": "h5py unavailable"}
+    batches = synthetic_batches(rate, channels, seconds)
+    with tempfile.TemporaryDirectory(prefix="sensorlab-bench-") as d:
+        loggers = [RunLogger(d, fmt, channels, {"sample_id": "bench", "device": f"dev{i + 1}"}, flush_interval=0.05,
+                             queue_size=len(batches) + 1).start() for i in range(devices)]
+        ticks = []
+        w0 = time.perf_counter()
+        for ts, block in batches:
+            t0 = time.perf_counter()
+            for lg in loggers:
+                lg.write(ts, block)
+            ticks.append(time.perf_counter() - t0)
+        for lg in loggers:
+            lg.stop()
+        wall = time.perf_counter() - w0
+        written = sum(lg.bytes for lg in loggers)
+        dropped = sum(lg.dropped_batches for lg in loggers)
+    out = summarize(ticks, sum(len(ts) for ts, _ in batches) * devices, seconds)
+    # sustained rate: the writer threads have to finish too, not just accept the batches
+    out.update({"bytes_per_s": written / wall, "dropped_batches": dropped})
+    return out
+
+
+def _run_loop(seconds):
+    from PyQt6 import QtCore
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def _idle_cpu(app, seconds, settle=2.0):
+    # process CPU (all threads) per wall second while the event loop sits idle, in %; the first `settle`
+    # seconds are left out so deferred work (splash, first paints, layout) is not counted as idle
+    _run_loop(settle)
+    c0, w0 = time.process_time(), time.perf_counter()
+    _run_loop(seconds)
+    return 100.0 * (time.process_time() - c0) / (time.perf_counter() - w0)
+
+
+def bench_startup(seconds):
+    t0 = time.perf_counter()
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6 import QtWidgets
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        import s
+    except ImportError as e:
+        return {"skipped": f"Qt unavailable: {e}"}
+    t_import = time.perf_counter()
+    win = s.MainWindow()
+    win.show()
+    app.processEvents()  # first event loop pass: start page up
+    t_ready = time.perf_counter()
+    idle = min(5.0, seconds)
+    out = {"import_ms": (t_import - t0) * 1e3, "startup_ms": (t_ready - t0) * 1e3,
+           "pyqtgraph_at_start": "pyqtgraph" in sys.modules, "idle_cpu_pct": _idle_cpu(app, idle)}
+    t1 = time.perf_counter()
+    win.show_dashboard()
+    app.processEvents()
+    out["dashboard_ms"] = (time.perf_counter() - t1) * 1e3
+    out["idle_dashboard_cpu_pct"] = _idle_cpu(app, idle)
+    win.close()
+    return out
+
+
+def run_case(case, seconds):
+    stage, kw = case["stage"], dict(case)
+    del kw["stage"]
+    fn = {"parse": bench_parse, "buffer": bench_buffer, "features": bench_features,
+          "render": bench_render, "logger": bench_logger, "startup": bench_startup}[stage]
+    out = fn(seconds=seconds, **kw)
+    rss = peak_rss_mb()
+    if rss is not None:
+        out["peak_rss_mb"] = rss
+    return out
+
+
+def _run_isolated(args):
+    return run_case(*args)
+
+
+# ---------- Sweep ----------
+def case_id(case):
+    if case["stage"] == "startup":
+        return "startup"
+    extra = case.get("frame") or case.get("fmt")
+    return "/".join([case["stage"]] + ([extra.lower()] if extra else []) +
+                    [f"r{case['rate']}", f"c{case['channels']}", f"d{case['devices']}"])
+
+
+def build_cases(stages, rates, channels, devices):
+    cases = []
+    for stage in stages:
+        if stage == "startup":
+            cases.append({"stage": "startup"})
+            continue
+        variants = {"parse": [{"frame": "ascii"}, {"frame": "binary"}],
+                    "logger": [{"fmt": "CSV"}, {"fmt": "HDF5"}]}.get(stage, [{}])
+        for r in rates:
+            for c in channels:
+                for d in devices:
+                    for v in variants:
+                        cases.append(dict(stage=stage, rate=r, channels=c, devices=d, **v))
+    return cases
+
+
+def machine():
+    return {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+
+def run_sweep(cases, seconds, isolate=True, out=sys.stdout):
+    results = {}
+    ctx = mp.get_context("spawn")
+    for case in cases:
+        cid = case_id(case)
+        if isolate:
+            with ctx.Pool(1) as pool:
+                r = pool.apply(_run_isolated, ((case, seconds),))
+        else:
+            r = run_case(case, seconds)
+        results[cid] = r
+        print(f"{cid:32s} {format_result(r)}", file=out, flush=True)
+    return results
+
+
+def format_result(r):
+    if "skipped" in r:
+        return "skipped: " + r["skipped"]
+    parts = []
+    for k, fmt in (("p50_us", "p50 {:.1f} µs"), ("p99_us", "p99 {:.1f} µs"), ("frame_p50_ms", "frame p50 {:.1f} ms"),
+                   ("frame_p99_ms", "p99 {:.1f} ms"), ("realtime_factor", "{:.0f}x real time"),
+                   ("bytes_per_s", "{:.2f} MB/s"), ("startup_ms", "start page {:.0f} ms"),
+                   ("dashboard_ms", "dashboard {:.0f} ms"), ("idle_cpu_pct", "idle cpu {:.2f}%"),
+                   ("idle_dashboard_cpu_pct", "{:.2f}% with dashboard"), ("peak_rss_mb", "rss {:.0f} MB")):
+        if k in r:
+            parts.append(fmt.format(r[k] / 1e6 if k == "bytes_per_s" else r[k]))
+    return ", ".join(parts)
+
+
+# ---------- Baselines ----------
+HIGHER_IS_BETTER = ("samples_per_s", "bytes_per_s", "realtime_factor", "max_fps")
+LOWER_IS_BETTER = ("p50_us", "p99_us", "frame_p50_ms", "frame_p99_ms", "peak_rss_mb", "dropped_batches",
+                   "startup_ms", "dashboard_ms")
+# absolute limits, checked on every run (idle CPU is too small to compare relatively)
+BUDGETS = {"startup_ms": 1500.0, "dashboard_ms": 1500.0, "idle_cpu_pct": 1.0, "idle_dashboard_cpu_pct": 1.0}
+
+
+def compare(results, baseline, tolerance):
+    """Regressions as (case, metric, baseline, now); tail latencies get twice the tolerance."""
+    bad = []
+    for cid, old in baseline.get("results", {}).items():
+        new = results.get(cid)
+        if new is None or "skipped" in new or "skipped" in old:
+            continue
+        for k in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            if k not in old or k not in new:
+                continue
+            tol = tolerance * (2 if "p99" in k else 1)
+            if k in HIGHER_IS_BETTER and new[k] < old[k] * (1 - tol):
+                bad.append((cid, k, old[k], new[k]))
+            elif k in LOWER_IS_BETTER and new[k] > old[k] * (1 + tol) and new[k] - old[k] > (1 if k == "dropped_batches" else 0):
+                bad.append((cid, k, old[k], new[k]))
+    return bad
+
+
+def check_budgets(results):
+    """Budget overruns as (case, metric, limit, now)."""
+    return [(cid, k, limit, r[k]) for cid, r in results.items() for k, limit in BUDGETS.items()
+            if k in r and r[k] > limit]
+
+
+def parse_list(text, cast=int):
+    return [cast(v) for v in text.split(",") if v.strip()]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="SensorLab pipeline benchmarks")
+    p.add_argument("--stages", default=",".join(STAGES), help="comma list of " + ", ".join(STAGES))
+    p.add_argument("--rates", default="1,10,50,200,1000", help="sampling rates (Hz)")
+    p.add_argument("--channels", default="4,8,64")
+    p.add_argument("--devices", default="1,4")
+    p.add_argument("--seconds", type=float, default=30.0, help="seconds of stream per case")
+    p.add_argument("--quick", action="store_true", help="small sweep: 10/200 Hz, 8 channels, 1 device, 10 s")
+    p.add_argument("--no-isolate", dest="isolate", action="store_false", help="run every case in this process")
+    p.add_argument("--save", metavar="JSON", help="write results as a baseline")
+    p.add_argument("--compare", metavar="JSON", help="fail (exit 1) when a result regresses past the tolerance")
+    p.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown (0.3 = 30%%)")
+    args = p.parse_args(argv)
+    if args.quick:
+        args.rates, args.channels, args.devices, args.seconds = "10,200", "8", "1", min(args.seconds, 10.0)
+    stages = [s for s in parse_list(args.stages, str) if s in STAGES]
+    cases = build_cases(stages, parse_list(args.rates), parse_list(args.channels), parse_list(args.devices))
+    results = run_sweep(cases, args.seconds, args.isolate)
+    report = {"machine": machine(), "seconds": args.seconds, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "results": results}
+    over = check_budgets(results)
+    for cid, k, limit, now in over:
+        print(f"OVER BUDGET {cid} {k}: {now:.4g} > {limit:g}", file=sys.stderr)
+    checked = [k for r in results.values() for k in BUDGETS if k in r]
+    if checked and not over:
+        print(f"within budget: {', '.join(f'{k} <= {BUDGETS[k]:g}' for k in checked)}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f"saved {len(results)} results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != report["machine"]:
+            print("warning: baseline was recorded on a different machine/runtime", file=sys.stderr)
+        bad = compare(results, baseline, args.tolerance)
+        for cid, k, old, new in bad:
+            print(f"REGRESSION {cid} {k}: {old:.4g} -> {new:.4g}", file=sys.stderr)
+        if bad:
+            print(f"{len(bad)} regression(s) beyond {args.tolerance:.0%} tolerance", file=sys.stderr)
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+SQLite catalog of logged runs.
+
+One row per run file (rotated parts are separate files of the same run)
+with the metadata the logger wrote into it, its time span, size, and
+per-channel summary statistics (n, mean, std, min, max). RunLogger keeps
+the row current while it writes, so searching never opens a data file;
+scan() catalogs runs logged before the catalog existed, or by another
+machine, by reading them once.
+
+The database lives next to the runs (CATALOG_NAME in log/path), in WAL
+mode so the run browser can query while loggers are writing.
+"""
+
+import json, os, sqlite3, threading, time
+import numpy as np
+
+CATALOG_NAME = "sensorlab-runs.sqlite"
+RUN_PATTERNS = (".csv", ".h5", ".hdf5")
+CYCLES_SUFFIX = ".cycles.csv"  # RunLogger's per-heater-cycle feature vectors; not a run
+
+# columns searchable by equality; everything else in the metadata stays in the JSON blob
+FIELDS = ("run", "part", "device", "port", "sample_id", "operator", "notes", "heater_profile",
+          "rate_hz", "channels", "frame", "format")
+
+LIST_COLUMNS = "id, path, " + ", ".join(FIELDS) + ", start_ts, end_ts, rows, bytes, status"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    run TEXT, part INTEGER, device TEXT, port TEXT, sample_id TEXT, operator TEXT, notes TEXT,
+    heater_profile TEXT, rate_hz REAL, channels INTEGER, frame TEXT, format TEXT,
+    start_ts REAL, end_ts REAL, rows INTEGER, bytes INTEGER,
+    status TEXT, mtime REAL, metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    channel INTEGER NOT NULL, n INTEGER, mean REAL, std REAL, min REAL, max REAL,
+    PRIMARY KEY (run_id, channel)
+);
+CREATE INDEX IF NOT EXISTS runs_sample ON runs(sample_id);
+CREATE INDEX IF NOT EXISTS runs_operator ON runs(operator);
+CREATE INDEX IF NOT EXISTS runs_profile ON runs(heater_profile);
+CREATE INDEX IF NOT EXISTS runs_start ON runs(start_ts);
+"""
+
+
+def catalog_path(directory):
+    return os.path.join(directory, CATALOG_NAME)
+
+
+class ChannelStats:
+    """Running per-channel n/mean/std/min/max, merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self, channels):
+        self.n = 0
+        self.mean = np.zeros(channels)
+        self.m2 = np.zeros(channels)
+        self.min = np.full(channels, np.inf)
+        self.max = np.full(channels, -np.inf)
+        self.t0 = self.t1 = None
+
+    def add(self, ts, block):
+        nb = len(block)
+        if not nb:
+            return
+        mb = block.mean(axis=0)
+        m2b = ((block - mb) ** 2).sum(axis=0)
+        n = self.n + nb
+        delta = mb - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2b + delta ** 2 * self.n * nb / n
+        self.n = n
+        np.minimum(self.min, block.min(axis=0), out=self.min)
+        np.maximum(self.max, block.max(axis=0), out=self.max)
+        if self.t0 is None:
+            self.t0 = float(ts[0])
+        self.t1 = float(ts[-1])
+
+    def rows(self):
+        std = np.sqrt(self.m2 / self.n) if self.n else self.m2
+        return [(c, self.n, float(self.mean[c]), float(std[c]), float(self.min[c]), float(self.max[c]))
+                for c in range(len(self.mean))] if self.n else []
+
+
+def _value(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    return v if isinstance(v, (int, float, str)) or v is None else str(v)
+
+
+def _real(v):
+    # header values are text; anything that is not a number is stored as NULL, never as text in a REAL column
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class RunCatalog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    # ---------- updates ----------
+    def record(self, path, metadata, stats=None, rows=None, size=None, status="open"):
+        """Insert or refresh one run file; metadata as written to the file header."""
+        path = os.path.abspath(path)
+        meta = {k: _value(v) for k, v in metadata.items()}
+        fmt = "HDF5" if path.endswith((".h5", ".hdf5")) else "CSV"
+        values = {k: meta.get(k) for k in FIELDS}
+        values["rate_hz"] = _real(values["rate_hz"])
+        values.update(run=meta.get("run") or _run_name(path), format=fmt)
+        values.update(path=path, status=status, metadata=json.dumps(meta, default=str),
+                      mtime=os.path.getmtime(path) if os.path.exists(path) else time.time())
+        if rows is not None:
+            values["rows"] = rows
+        if size is not None:
+            values["bytes"] = size
+        if stats is not None and stats.n:
+            values.update(start_ts=stats.t0, end_ts=stats.t1)
+        cols = list(values)
+        sql = (f"INSERT INTO runs ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+               f"ON CONFLICT(path) DO UPDATE SET {', '.join(f'{c}=excluded.{c}' for c in cols if c != 'path')}")
+        with self._lock, self.db:
+            self.db.execute(sql, [values[c] for c in cols])
+            if stats is not None:
+                run_id = self.db.execute("SELECT id FROM runs WHERE path=?", (path,)).fetchone()[0]
+                self.db.execute("DELETE FROM channel_stats WHERE run_id=?", (run_id,))
+                self.db.executemany("INSERT INTO channel_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    [(run_id,) + r for r in stats.rows()])
+
+    def index_file(self, path):
+        """Catalog an existing run file by reading it once (see replay.open_run)."""
+        from replay import open_run
+        run = open_run(path)
+        try:
+            stats = ChannelStats(run.channels)
+            for i in range(0, len(run), 1 << 18):
+                stats.add(*run.read(i, i + (1 << 18)))
+            meta = dict(run.metadata, channels=run.channels)
+            meta.setdefault("rate_hz", run.rate)
+        finally:
+            run.close()
+        self.record(path, meta, stats, stats.n, os.path.getsize(path), "complete")
+
+    def scan(self, directory, skip=()):
+        """Catalog new or changed run files in `directory`; returns (indexed, failed) paths."""
+        with self._lock:
+            known = {r[0]: r[1] for r in self.db.execute("SELECT path, mtime FROM runs")}
+        skip = {os.path.abspath(p) for p in skip}
+        indexed, failed = [], []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.abspath(os.path.join(directory, name))
+            if not name.endswith(RUN_PATTERNS) or name.endswith(CYCLES_SUFFIX) or path in skip:
+                continue
+            if path in known and known[path] >= os.path.getmtime(path):
+                continue
+            try:
+                self.index_file(path)
+                indexed.append(path)
+            except Exception:
+                failed.append(path)
+        return indexed, failed
+
+    def prune(self):
+        """Drop rows whose file is gone."""
+        with self._lock, self.db:
+            gone = [(r[0],) for r in self.db.execute("SELECT path FROM runs") if not os.path.exists(r[0])]
+            self.db.executemany("DELETE FROM runs WHERE path=?", gone)
+        return len(gone)
+
+    # ---------- queries ----------
+    def search(self, text="", since=None, until=None, limit=1000, **equals):
+        """Runs matching every filter, newest first. text matches sample, operator, notes, device or file name."""
+        where, args = [], []
+        for k, v in equals.items():
+            if k not in FIELDS:
+                raise ValueError(f"Unknown catalog field: {k}")
+            where.append(f"{k} = ?"); args.append(v)
+        if text:
+            where.append("(sample_id LIKE ? OR operator LIKE ? OR notes LIKE ? OR device LIKE ? OR path LIKE ?)")
+            args += [f"%{text}%"] * 5
+        if since is not None:
+            where.append("end_ts >= ?"); args.append(since)
+        if until is not None:
+            where.append("start_ts <= ?"); args.append(until)
+        # the metadata blob stays behind; run() fetches it for one row
+        sql = f"SELECT {LIST_COLUMNS} FROM runs" + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY start_ts DESC, path LIMIT ?"
+        with self._lock:
+            return [dict(r) for r in self.db.execute(sql, args + [limit])]
+
+    def run(self, run_id):
+        with self._lock:
+            row = self.db.execute("SELECT * FROM runs WHERE id=?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        row = dict(row)
+        row["metadata"] = json.loads(row["metadata"] or "{}")
+        return row
+
+    def channel_stats(self, run_id):
+        with self._lock:
+            return [dict(r) for r in self.db.execute(
+                "SELECT channel, n, mean, std, min, max FROM channel_stats WHERE run_id=? ORDER BY channel", (run_id,))]
+
+    def distinct(self, field):
+        # choices for filter boxes
+        if field not in FIELDS:
+            raise ValueError(f"Unknown catalog field: {field}")
+        with self._lock:
+            return [r[0] for r in self.db.execute(
+                f"SELECT DISTINCT {field} FROM runs WHERE {field} IS NOT NULL AND {field} != '' ORDER BY 1")]
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+def _run_name(path):
+    # rotated parts share their run's name: <stem>_partNNN.ext -> <stem>
+    stem = os.path.splitext(os.path.basename(path))[0]
+    head, sep, tail = stem.rpartition("_part")
+    return head if sep and tail.isdigit() else stem
@@ -0,0 +1,172 @@
+"""
+Qt-free access to SensorLab settings.
+
+The GUI persists its settings with QSettings("SensorLabCo", "SensorLabApp").
+This module reads the same native store (INI file on Linux/BSD, plist on
+macOS, registry on Windows) so headless tools share one configuration
+without importing Qt. Values come back as strings, as QSettings returns
+them from INI files; callers convert them the same way the GUI does.
+"""
+
+import os, sys
+
+ORG, APP = "SensorLabCo", "SensorLabApp"
+
+# mirrors the fallbacks used by SettingsDialog.load_settings
+DEFAULTS = {
+    "ui/theme": "Dark",
+    "ui/splash": "true",
+    "ui/derived": "false",
+    "device/baud": "115200",
+    "device/frame": "ASCII (CSV)",
+    "device/channels": "4",
+    "acq/rate": "10",
+    "acq/buffer": "300",
+    "acq/ts": "Epoch ms",
+    "acq/duration": "∞",
+    "replay/speed": "1×",
+    "export/format": "NPZ",
+    "heater/profile": "Linear",
+    "heater/max": "5.0",
+    "heater/preheat": "30",
+    "heater/period": "20",
+    "heater/custom": "",
+    "log/format": "CSV",
+    "log/path": os.path.expanduser("~"),
+    "log/auto": "false",
+    "log/rotate_mb": "0",
+    "log/rotate_min": "0",
+    "log/catalog": "true",
+    "adv/crc": "false",
+    "adv/timeout": "1000",
+    "adv/workers": "Threads",
+    "adv/metrics": "false",
+    "adv/metrics_interval": "5",
+    "inf/model": "",
+    "inf/window": "100",
+    "inf/hop": "20",
+    "inf/latency_ms": "100",
+    "inf/workers": "Thread",
+    "inf/input": "Raw",
+}
+
+DURATIONS = {"∞": None, "30s": 30, "1m": 60, "5m": 300, "10m": 600}
+
+
+def parse_duration(text):
+    # "∞"/"30s"/"1m"/... (the Duration combo) or plain seconds; None means run until stopped
+    text = str(text).strip()
+    if text in DURATIONS:
+        return DURATIONS[text]
+    if text.lower() in ("", "inf", "none", "0"):
+        return None
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text[-1:].lower() in units:
+        return float(text[:-1]) * units[text[-1].lower()]
+    return float(text)
+
+
+# ---------- Native stores ----------
+def ini_path():
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, ORG, APP + ".conf")
+
+
+def _unquote(value):
+    # QSettings INI quoting: "..." with backslash escapes
+    value = value.strip()
+    if not (len(value) >= 2 and value[0] == value[-1] == '"'):
+        return value
+    out, i, body = [], 0, value[1:-1]
+    escapes = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", '"': '"', "0": "\0"}
+    while i < len(body):
+        c = body[i]
+        if c == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            if nxt == "x":
+                j = i + 2
+                while j < len(body) and body[j] in "0123456789abcdefABCDEF":
+                    j += 1
+                out.append(chr(int(body[i + 2:j] or "0", 16)))
+                i = j
+                continue
+            out.append(escapes.get(nxt, nxt))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def read_ini(path):
+    values, group = {}, ""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return values
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            group = line[1:-1]
+            group = "" if group == "General" else group
+            continue
+        key, sep, value = line.partition("=")
+        if sep:
+            key = key.strip().replace("\\", "/")
+            values[f"{group}/{key}" if group else key] = _unquote(value)
+    return values
+
+
+def read_plist():
+    import plistlib
+    path = os.path.expanduser(f"~/Library/Preferences/com.{ORG.lower()}.{APP}.plist")
+    try:
+        with open(path, "rb") as f:
+            data = plistlib.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {k.replace(".", "/"): str(v).lower() if isinstance(v, bool) else str(v) for k, v in data.items()}
+
+
+def read_registry():
+    import winreg
+    values = {}
+    root = rf"Software\{ORG}\{APP}"
+    try:
+        top = winreg.OpenKey(winreg.HKEY_CURRENT_USER, root)
+    except OSError:
+        return values
+    with top:
+        i = 0
+        while True:
+            try:
+                group = winreg.EnumKey(top, i)
+            except OSError:
+                break
+            i += 1
+            with winreg.OpenKey(top, group) as k:
+                j = 0
+                while True:
+                    try:
+                        name, value, _ = winreg.EnumValue(k, j)
+                    except OSError:
+                        break
+                    j += 1
+                    values[f"{group}/{name}"] = str(value)
+    return values
+
+
+def read_settings():
+    """All settings as a flat {"group/key": str} dict, defaults filled in."""
+    if sys.platform == "darwin":
+        stored = read_plist()
+    elif sys.platform.startswith("win"):
+        stored = read_registry()
+    else:
+        stored = read_ini(ini_path())
+    merged = dict(DEFAULTS)
+    merged.update(stored)
+    return merged
@@ -0,0 +1,431 @@
+"""
+Concurrent multi-device acquisition.
+
+Each DevicePipeline owns an independent parse -> history -> log chain for
+one board. DeviceManager opens N of them at once, stamps every device
+against one shared monotonic clock, and drains them all from a single
+poll() call, so the GUI runs one timer no matter how many boards are
+attached. With several devices, poll() runs their pipelines side by side
+on a small thread pool (the NumPy work releases the GIL) and returns once
+all are done, so the GUI never sees a half-appended history. Devices are
+aligned only by that shared clock; nothing resamples them onto a common
+grid.
+
+Readers run as threads by default. With workers="process" each device's
+reader and parser run in their own process, which lets parsing scale
+across cores instead of sharing the GIL.
+
+With features enabled, every batch also goes through a FeatureEngine and
+the derived ΔR/R0 series gets its own history next to the raw one. An
+optional InferenceStage receives either series for live prediction.
+While a device logs, its finished heater-cycle feature vectors are written
+with the run (see RunLogger.write_cycles).
+
+A HeaterEngine, when given, is started on the manager's clock so every
+sample can be tagged with its heater phase from its timestamp alone.
+Simulated boards get the schedule itself and apply it per sample.
+
+add_replay() puts a logged run (see replay.py) where a port would be: the
+rest of the pipeline cannot tell it from a live board.
+"""
+
+import os, time, queue
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from acquisition import AcquisitionEngine, FakeDevice, SIMULATED_PORT, FRAME_ASCII
+from features import FeatureEngine
+from inference import InferenceStage
+from metrics import Timer
+from history import TieredHistory
+from runlog import RunLogger
+from heater import heater_from_metadata
+from replay import ReplaySource, open_run
+
+
+class MonotonicClock:
+    """Epoch seconds that never jump: an epoch anchor plus the system-wide monotonic clock."""
+
+    def __init__(self):
+        self.epoch0 = time.time()
+        self.mono0 = time.monotonic()
+
+    def __call__(self):
+        return self.epoch0 + (time.monotonic() - self.mono0)
+
+
+# ---------- Process-backed reader ----------
+def _reader_process(kwargs, out_q, stop_evt, stats, rate):
+    # runs in the child: an ordinary AcquisitionEngine whose batches are forwarded to the parent
+    engine = AcquisitionEngine(**kwargs)
+    try:
+        engine.start()
+    except Exception as e:
+        out_q.put(("error", repr(e)))
+        return
+    try:
+        while not stop_evt.is_set():
+            stop_evt.wait(0.01)
+            engine.rate = rate.value  # the parent may change it while running
+            batch = engine.drain()
+            if batch is not None:
+                try:
+                    out_q.put_nowait(batch)
+                except queue.Full:
+                    stats[3] += 1
+            stats[0], stats[1], stats[2] = engine.samples, engine.dropped_batches, engine.bad_frames
+            stats[4] = engine.late_samples
+            if engine.error is not None:
+                out_q.put(("error", repr(engine.error)))
+                break
+    finally:
+        engine.stop()
+
+
+class ProcessEngine:
+    """AcquisitionEngine look-alike whose reader lives in a child process."""
+
+    def __init__(self, port, baud=115200, channels=8, frame=FRAME_ASCII, rate=10,
+                 timeout_ms=1000, crc=False, queue_size=256, clock=None):
+        self.port = port
+        self.channels = int(channels)
+        self.timeout_ms = int(timeout_ms)
+        self._kwargs = dict(port=port, baud=baud, channels=channels, frame=frame, rate=rate,
+                            timeout_ms=timeout_ms, crc=crc, clock=clock)
+        self._ctx = mp.get_context("spawn")
+        self._queue = self._ctx.Queue(maxsize=queue_size)
+        self._stop = self._ctx.Event()
+        self._stats = self._ctx.Array("q", 5, lock=False)
+        self._rate = self._ctx.Value("q", max(1, int(rate)), lock=False)
+        self._proc = None
+        self.error = None
+
+    samples = property(lambda self: self._stats[0])
+    dropped_batches = property(lambda self: self._stats[1] + self._stats[3])
+    bad_frames = property(lambda self: self._stats[2])
+    late_samples = property(lambda self: self._stats[4])
+    parse_time = None  # parsing is timed in the child, not visible here
+
+    @property
+    def backlog(self):
+        try:
+            return self._queue.qsize()
+        except NotImplementedError:  # macOS multiprocessing queues
+            return None
+
+    @property
+    def rate(self):
+        return self._rate.value
+
+    @rate.setter
+    def rate(self, v):
+        # shared with the child, which picks it up on its next drain
+        self._rate.value = self._kwargs["rate"] = max(1, int(v))
+
+    @property
+    def running(self):
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._proc = self._ctx.Process(target=_reader_process, name=f"acq-{self.port}",
+                                       args=(self._kwargs, self._queue, self._stop, self._stats, self._rate), daemon=True)
+        self._proc.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._proc is not None:
+            self._proc.join(timeout=2 + self.timeout_ms / 1000.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+            self._proc = None
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item[0], str):
+                self.error = RuntimeError(item[1])
+                continue
+            items.append(item)
+        if not items:
+            return None
+        if len(items) == 1:
+            return items[0]
+        return np.concatenate([t for t, _ in items]), np.concatenate([b for _, b in items])
+
+
+# ---------- Per-device pipeline ----------
+class DevicePipeline:
+    def __init__(self, name, port, channels=8, frame=FRAME_ASCII, rate=10, baud=115200,
+                 timeout_ms=1000, crc=False):
+        self.name = name
+        self.port = port
+        self.channels = int(channels)
+        self.frame = frame
+        self.rate = int(rate)
+        self.baud = int(baud)
+        self.timeout_ms = int(timeout_ms)
+        self.crc = crc
+        self.sim = None
+        self.replay = None  # RunReader replayed instead of reading the port
+        self.speed = 1.0
+        self.replay_range = (None, None)  # run times (epoch s) to replay between
+        self.origin = None  # run time replays start from; shared so replayed devices stay in step
+        self.engine = None
+        self.history = None
+        self.derived = None
+        self.features = None
+        self.inference = None
+        self.inference_input = "raw"
+        self.heater = None
+        self.phase = None  # heater phase of the last polled batch
+        self.poll_time = Timer()
+        self.logger = None
+
+    @property
+    def error(self):
+        for part in (self.engine, self.logger, self.inference):
+            if part is not None and part.error is not None:
+                return part.error
+        return None
+
+    @property
+    def finished(self):
+        # a replay that has fed its last row and been fully drained
+        return self.replay is not None and self.engine is not None and self.engine.finished \
+            and not self.engine.backlog
+
+    def start(self, buffer=None, clock=None, workers="thread", features=None):
+        # buffer=None skips the plot history (headless logging only); features: FeatureEngine kwargs or None
+        port = self.port
+        try:
+            if self.replay is not None:
+                self.engine = ReplaySource(self.replay, self.speed, *self.replay_range)
+                self.engine.origin = self.origin
+            else:
+                if port == SIMULATED_PORT:
+                    self.sim = FakeDevice(self.channels, self.rate, self.frame, self.crc).start()
+                    port = self.sim.port
+                cls = ProcessEngine if workers == "process" else AcquisitionEngine
+                self.engine = cls(port, self.baud, self.channels, self.frame, self.rate,
+                                  self.timeout_ms, self.crc, clock=clock)
+            self.engine.start()
+        except Exception:
+            self.stop()
+            raise
+        self.features = FeatureEngine(self.channels, self.rate, **features) if features is not None else None
+        if buffer is not None:
+            for h in (self.history, self.derived):
+                if h is not None:
+                    h.close()
+            self.history = TieredHistory(self.channels, buffer)
+            self.derived = TieredHistory(self.channels, buffer) if self.features is not None else None
+
+    def set_heater(self, volts):
+        # only the simulator takes set-points; real boards drive their own heater
+        if self.sim is not None:
+            self.sim.set_heater(volts)
+
+    def set_rate(self, rate):
+        self.rate = max(1, int(rate))
+        if self.engine is not None: self.engine.rate = self.rate
+        if self.sim is not None: self.sim.set_rate(self.rate)
+        if self.features is not None: self.features.rate = float(self.rate)
+
+    def start_logging(self, directory, fmt="CSV", metadata=None, ts_format="Epoch ms",
+                      rotate_mb=0, rotate_minutes=0, catalog=None):
+        meta = dict(metadata or {}, device=self.name, port=self.port)
+        if self.heater is not None:
+            meta.update(self.heater.metadata())
+        self.logger = RunLogger(directory, fmt, self.channels, meta, ts_format,
+                                rotate_mb, rotate_minutes, catalog=catalog).start()
+        return self.logger
+
+    def start_inference(self, model_path, source="raw", **options):
+        # source "derived" feeds ΔR/R0 (needs features enabled) instead of the raw samples
+        if source == "derived" and self.features is None:
+            raise ValueError("Derived input needs feature extraction enabled")
+        self.stop_inference()
+        self.inference = InferenceStage(model_path, self.channels, **options).start()
+        self.inference_input = source
+        return self.inference
+
+    def stop_inference(self):
+        stage, self.inference = self.inference, None
+        if stage is not None:
+            stage.stop()
+        return stage
+
+    def stop_logging(self):
+        logger, self.logger = self.logger, None
+        if logger is not None:
+            logger.stop()
+        return logger
+
+    def poll(self):
+        if self.engine is None:
+            return None
+        t0 = time.perf_counter()
+        batch = self.engine.drain()
+        if batch is not None:
+            self.phase = self.heater.phase_at(batch[0]) if self.heater is not None else None
+            if self.history is not None:
+                self.history.append(*batch)
+            if self.features is not None:
+                resp = self.features.process(*batch, phase=self.phase)
+                if self.derived is not None:
+                    self.derived.append(batch[0], resp)
+            if self.inference is not None:
+                self.inference.submit(batch[0], resp if self.inference_input == "derived" else batch[1])
+            if self.logger is not None:
+                self.logger.write(*batch)
+                if self.features is not None and self.features.cycles:
+                    self.logger.write_cycles(self.features.drain_cycles(), self.features.feature_names())
+            self.poll_time.add(time.perf_counter() - t0)
+        return batch
+
+    def halt(self):
+        # stop reading but keep the logger open for what is still queued
+        if self.engine is not None:
+            self.engine.stop()
+            self.poll()  # keep whatever was read before the port closed
+            self.engine = None
+        if self.sim is not None:
+            self.sim.stop(); self.sim = None
+
+    def stop(self):
+        self.halt()
+        return self.stop_logging()
+
+    def close(self):
+        self.stop()
+        self.stop_inference()
+        for h in (self.history, self.derived):
+            if h is not None:
+                h.close()
+        self.history = self.derived = None
+        if self.replay is not None:
+            self.replay.close()
+
+
+class DeviceManager:
+    def __init__(self, workers="thread", features=None, heater=None):
+        self.workers = workers
+        self.features = features
+        self.heater = heater
+        self.pipelines = []
+        self.clock = MonotonicClock()
+        self._pool = None  # poll workers, (re)made for the current device count
+        self._pool_size = 0
+
+    def __iter__(self):
+        return iter(self.pipelines)
+
+    def __len__(self):
+        return len(self.pipelines)
+
+    @property
+    def running(self):
+        return any(p.engine is not None for p in self.pipelines)
+
+    def add(self, port, name=None, **spec):
+        name = name or f"dev{len(self.pipelines) + 1}"
+        if any(p.name == name for p in self.pipelines):
+            raise ValueError(f"Duplicate device name: {name}")
+        p = DevicePipeline(name, port, **spec)
+        self.pipelines.append(p)
+        return p
+
+    def add_replay(self, path, name=None, speed=1.0, t0=None, t1=None, **options):
+        # speed None replays as fast as the pipeline takes it; options: rate/start for raw binary captures
+        run = open_run(path, **options)
+        p = self.add(path, name, channels=run.channels, rate=max(1, round(run.rate)))
+        p.replay, p.speed, p.replay_range = run, speed, (t0, t1)
+        return p
+
+    @property
+    def finished(self):
+        return bool(self.pipelines) and all(p.finished for p in self.pipelines if p.engine is not None)
+
+    def remove(self, name):
+        for p in list(self.pipelines):
+            if p.name == name:
+                p.close()
+                self.pipelines.remove(p)
+
+    def start(self, buffer=None):
+        # all devices or none; a fresh clock so every run starts on a common timebase
+        self.clock = MonotonicClock()
+        replays = [p.replay_range[0] if p.replay_range[0] is not None else p.replay.span()[0]
+                   for p in self.pipelines if p.replay is not None and len(p.replay)]
+        started = []
+        try:
+            for p in self.pipelines:
+                # replays get their phase back from the heater schedule logged with the run
+                p.heater = heater_from_metadata(p.replay.metadata) if p.replay is not None else self.heater
+                p.origin = min(replays) if replays else None
+                p.start(buffer, self.clock, self.workers, self.features)
+                started.append(p)
+        except Exception:
+            for p in started:
+                p.stop()
+            raise
+        if self.heater is not None and any(p.replay is None for p in self.pipelines):
+            self.heater.clock = self.clock
+            self.heater.output = self.set_heater
+            self.heater.start()
+            for p in self.pipelines:
+                if p.sim is not None:
+                    p.sim.set_schedule(self.heater.setpoint_at, self.clock)
+
+    def set_heater(self, volts):
+        for p in self.pipelines:
+            p.set_heater(volts)
+
+    def stop(self):
+        # halt every reader first so all devices end at (nearly) the same instant
+        if self.heater is not None and self.heater.running:
+            self.heater.stop()
+        for p in self.pipelines:
+            p.halt()
+        return [lg for lg in (p.stop_logging() for p in self.pipelines) if lg is not None]
+
+    def close(self):
+        for p in self.pipelines:
+            p.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def poll(self):
+        # one pass over every device; returns the pipelines that got new samples
+        pipelines = list(self.pipelines)
+        if len(pipelines) < 2:
+            return [p for p in pipelines if p.poll() is not None]
+        size = min(len(pipelines), os.cpu_count() or 1)
+        if self._pool is None or self._pool_size != size:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool, self._pool_size = ThreadPoolExecutor(size, thread_name_prefix="poll"), size
+        polled = list(self._pool.map(DevicePipeline.poll, pipelines))
+        return [p for p, batch in zip(pipelines, polled) if batch is not None]
+
+    def predictions(self):
+        # (device name, [(ts, label, confidence), ...]) for devices with new predictions
+        out = [(p.name, p.inference.drain()) for p in self.pipelines if p.inference is not None]
+        return [(name, preds) for name, preds in out if preds]
+
+    def events(self):
+        # exposure/recovery events finished since the last call, as (device name, event)
+        return [(p.name, ev) for p in self.pipelines if p.features is not None for ev in p.features.drain_events()]
+
+    def errors(self):
+        errs = [(p.name, p.error) for p in self.pipelines if p.error is not None]
+        if self.heater is not None and self.heater.error is not None:
+            errs.append(("heater", self.heater.error))
+        return errs
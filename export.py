@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Batch export of logged runs into ML-ready datasets.
+
+Every run (CSV, HDF5 or binary capture; see replay.py) is converted into
+one columnar binary file plus a JSON sidecar, in parallel across a process
+pool:
+
+  <name>.npz       ts_us (int64 µs since the epoch, UTC), data (n, C),
+                   windows (int64 start rows), phase (heater phase, when
+                   the run logged its heater schedule)
+  <name>.parquet   ts (timestamp[us, UTC]), ch1..chN, phase; the window
+                   starts go to <name>.windows.npy (needs pyarrow)
+  <name>.json      run metadata, columns, rate, span, window/hop
+
+<name> is the run's file name with its extension, so run.csv and run.h5
+exported together do not overwrite each other. Rows the reader could not
+parse are left out and counted as "skipped_rows" in the sidecar.
+
+Timestamps are converted as whole arrays, never formatted row by row. The
+window index lists the first row of every `window`-sample window, `hop`
+rows apart, that does not straddle a gap in the recording, so training
+code can slice fixed-length windows straight out of `data`.
+
+Run: python export.py ~/SensorLab/runs --out ~/SensorLab/export
+      python export.py run1.csv run2.h5 --format Parquet --window 200 --hop 50 --workers 4
+"""
+
+import argparse, datetime as dt, glob, json, os, sys
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+EXPORT_FORMATS = {"NPZ": ".npz", "Parquet": ".parquet"}
+RUN_PATTERNS = ("*.csv", "*.h5", "*.hdf5")
+MAX_GAP = 4.0  # sample intervals; batch stamping jitters by a few, a longer step is a dropout
+CHUNK_ROWS = 1 << 18
+
+
+def find_runs(paths):
+    # files as given; directories contribute their logged runs (not the cycle feature sidecars)
+    from catalog import CYCLES_SUFFIX
+    runs = []
+    for path in paths:
+        if os.path.isdir(path):
+            runs += sorted(f for pat in RUN_PATTERNS for f in glob.glob(os.path.join(path, pat))
+                           if not f.endswith(CYCLES_SUFFIX))
+        else:
+            runs.append(path)
+    return runs
+
+
+def window_index(ts, rate, window, hop):
+    """Start rows of gap-free `window`-row windows, `hop` rows apart."""
+    n = len(ts)
+    if n < window or window < 1:
+        return np.empty(0, dtype=np.int64)
+    gaps = np.concatenate([[0], np.cumsum(np.diff(ts) > MAX_GAP / rate)])
+    starts = np.arange(0, n - window + 1, max(1, hop), dtype=np.int64)
+    return starts[gaps[starts + window - 1] == gaps[starts]]
+
+
+def _iso(t):
+    return dt.datetime.fromtimestamp(t, dt.timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _plain(v):
+    # sidecar-safe metadata values (HDF5 attrs come back as numpy scalars/arrays)
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def convert_run(path, out_dir, fmt="NPZ", window=100, hop=20, dtype="float64", overwrite=False, rate=None):
+    """Convert one run; returns its sidecar dict ("skipped" when a newer export with the same settings exists)."""
+    from replay import open_run
+    from heater import heater_from_metadata
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    stem = os.path.join(out_dir, os.path.basename(path))
+    out, sidecar = stem + EXPORT_FORMATS[fmt], stem + ".json"
+    if not overwrite and os.path.exists(sidecar) and os.path.exists(out) \
+            and os.path.getmtime(out) >= os.path.getmtime(path):
+        with open(sidecar, encoding="utf-8") as f:
+            info = json.load(f)
+        # only up to date if it was exported with the settings asked for now
+        wanted = {"format": fmt, "window": window, "hop": hop, "dtype": np.dtype(dtype).name}
+        if all(info.get(k) == v for k, v in wanted.items()):
+            return dict(info, skipped=True)
+    run = open_run(path, rate)
+    try:
+        n, C = len(run), run.channels
+        ts, data = np.empty(n), np.empty((n, C), dtype=dtype)
+        got = 0  # rows filled; a chunk with malformed lines comes back short
+        for i in range(0, n, CHUNK_ROWS):
+            t, block = run.read(i, i + CHUNK_ROWS)
+            ts[got:got + len(t)], data[got:got + len(t)] = t, block
+            got += len(t)
+        rate_hz, meta = run.rate, {k: _plain(v) for k, v in run.metadata.items()}
+    finally:
+        run.close()
+    skipped, n = n - got, got
+    ts, data = ts[:n], data[:n]
+    ts_us = np.round(ts * 1e6).astype(np.int64)
+    windows = window_index(ts, rate_hz, window, hop)
+    heater = heater_from_metadata(meta)
+    phase = heater.phase_at(ts).astype(np.float32) if heater is not None else None
+    columns = [f"ch{c + 1}" for c in range(C)]
+    os.makedirs(out_dir, exist_ok=True)
+    if fmt == "NPZ":
+        arrays = dict(ts_us=ts_us, data=data, windows=windows)
+        if phase is not None:
+            arrays["phase"] = phase
+        np.savez(out, **arrays)
+    else:
+        _write_parquet(out, ts_us, data, columns, phase)
+        np.save(stem + ".windows.npy", windows)
+    info = {"source": os.path.abspath(path), "file": os.path.basename(out), "format": fmt, "rows": n,
+            "skipped_rows": skipped, "channels": C, "columns": columns, "dtype": str(data.dtype), "ts_unit": "us",
+            "rate_hz": rate_hz, "start": _iso(ts[0]) if n else None, "end": _iso(ts[-1]) if n else None,
+            "window": window, "hop": hop, "windows": len(windows), "phase": phase is not None,
+            "metadata": meta, "exported": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")}
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=1, default=str)
+    return info
+
+
+def _write_parquet(path, ts_us, data, columns, phase):
+    try:
+        import pyarrow as pa, pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+    arrays = [pa.array(ts_us).cast(pa.timestamp("us", tz="UTC"))]
+    arrays += [pa.array(np.ascontiguousarray(data[:, c])) for c in range(data.shape[1])]
+    names = ["ts"] + columns
+    if phase is not None:
+        arrays.append(pa.array(phase)); names.append("phase")
+    pq.write_table(pa.Table.from_arrays(arrays, names=names), path)
+
+
+def export_runs(paths, out_dir, fmt="NPZ", window=100, hop=20, workers=None, **options):
+    """Convert runs across a process pool; yields (path, sidecar dict or exception) as each finishes."""
+    runs = find_runs(paths)
+    workers = min(len(runs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for path in runs:
+            try:
+                yield path, convert_run(path, out_dir, fmt, window, hop, **options)
+            except Exception as e:
+                yield path, e
+        return
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+        jobs = {pool.submit(convert_run, path, out_dir, fmt, window, hop, **options): path for path in runs}
+        for job in as_completed(jobs):
+            try:
+                yield jobs[job], job.result()
+            except Exception as e:
+                yield jobs[job], e
+
+
+# ---------- Loading ----------
+def load_export(path):
+    """{"ts_us", "data", "windows", "phase" (or None), "meta"} from an exported .npz/.parquet."""
+    stem = os.path.splitext(path)[0]
+    with open(stem + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        ds = {"ts_us": table.column("ts").cast("int64").to_numpy(),
+              "data": np.column_stack([table.column(c).to_numpy() for c in meta["columns"]]),
+              "windows": np.load(stem + ".windows.npy"),
+              "phase": table.column("phase").to_numpy() if meta["phase"] else None}
+    else:
+        with np.load(path) as z:
+            ds = {k: z[k] for k in ("ts_us", "data", "windows")}
+            ds["phase"] = z["phase"] if "phase" in z else None
+    ds["meta"] = meta
+    return ds
+
+
+def windows(ds, idx=None):
+    """(k, window, channels) array of the indexed windows (all of them when idx is None)."""
+    starts = ds["windows"] if idx is None else ds["windows"][idx]
+    return ds["data"][starts[:, None] + np.arange(ds["meta"]["window"])]
+
+
+def main(argv=None):
+    from config import read_settings
+    cfg = read_settings()
+    p = argparse.ArgumentParser(description="Convert logged SensorLab runs into ML-ready datasets")
+    p.add_argument("paths", nargs="+", help="run files or directories of runs")
+    p.add_argument("--out", default=None, help="output directory (default: <first directory>/export)")
+    p.add_argument("--format", choices=sorted(EXPORT_FORMATS), default=cfg["export/format"])
+    p.add_argument("--window", type=int, default=int(cfg["inf/window"]), help="window length (samples)")
+    p.add_argument("--hop", type=int, default=int(cfg["inf/hop"]), help="rows between window starts")
+    p.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    p.add_argument("--float32", action="store_true", help="store samples as float32")
+    p.add_argument("--rate", type=float, default=None, help="sampling rate of binary captures (Hz)")
+    p.add_argument("--overwrite", action="store_true", help="convert runs whose export is up to date too")
+    args = p.parse_args(argv)
+    base = args.paths[0] if os.path.isdir(args.paths[0]) else os.path.dirname(os.path.abspath(args.paths[0]))
+    out = args.out or os.path.join(base, "export")
+    failed = 0
+    for path, res in export_runs(args.paths, out, args.format, args.window, args.hop, args.workers,
+                                 dtype="float32" if args.float32 else "float64", overwrite=args.overwrite,
+                                 rate=args.rate):
+        if isinstance(res, Exception):
+            failed += 1
+            print(f"{path}: {res}", file=sys.stderr)
+        else:
+            state = "up to date" if res.get("skipped") else f"{res['rows']} rows, {res['windows']} windows"
+            print(f"{path} -> {os.path.join(out, res['file'])} ({state})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Incremental feature extraction for gas-sensor streams.
+
+FeatureEngine.process() takes each acquired (ts, block) batch and, in O(1)
+work per sample with every update vectorized across channels:
+
+- tracks a slow baseline R0 per channel (frozen while a channel is exposed)
+  and returns the derived ΔR/R0 series for plotting,
+- keeps exponentially weighted rolling mean/std of ΔR/R0,
+- detects exposure/recovery events and reports response (t90) and
+  recovery (t10) times,
+- accumulates per-heater-cycle feature vectors (mean, std, min, max,
+  slope and phase-binned mean of ΔR/R0 for every channel), laid out as
+  feature_names(); DevicePipeline logs them beside the run.
+"""
+
+import math
+from collections import deque
+import numpy as np
+
+IDLE, EXPOSED, RECOVERING = 0, 1, 2
+
+
+def ema_block(x, y0, alpha):
+    """
+    Exponential moving average over a (n, C) block: y[k] = a*y[k-1] + (1-a)*x[k].
+    Closed form per chunk (no Python loop per sample); chunks keep a**-m finite.
+    """
+    n = len(x)
+    out = np.empty_like(x, dtype=np.float64)
+    a = float(alpha)
+    if a <= 0.0:
+        out[:] = x
+        return out
+    m = max(1, min(256, int(30.0 / max(-math.log(a), 1e-12))))
+    y = np.asarray(y0, dtype=np.float64)
+    for s in range(0, n, m):
+        xs = x[s:s + m]
+        k = np.arange(1, len(xs) + 1, dtype=np.float64)[:, None]
+        pw = a ** k
+        acc = np.cumsum(xs / pw, axis=0)
+        out[s:s + m] = pw * (y + (1.0 - a) * acc)
+        y = out[s + len(xs) - 1]
+    return out
+
+
+class ExposureTrace:
+    """Bounded trace of one exposure: keeps every `stride`-th sample, halving itself when full."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.ts = np.empty(capacity)
+        self.val = np.empty(capacity)
+        self.n = 0
+        self.stride = 1
+        self._skip = 0
+
+    def extend(self, ts, val):
+        take = np.arange(self._skip, len(ts), self.stride)
+        self._skip = take[-1] + self.stride - len(ts) if len(take) else self._skip - len(ts)
+        ts, val = ts[take], val[take]
+        while len(ts):
+            k = min(self.capacity - self.n, len(ts))
+            self.ts[self.n:self.n + k] = ts[:k]
+            self.val[self.n:self.n + k] = val[:k]
+            self.n += k
+            ts, val = ts[k:], val[k:]
+            if self.n == self.capacity:
+                # full: keep every other point and halve the rate from here on
+                half = self.n // 2
+                self.ts[:half] = self.ts[0:self.n:2]
+                self.val[:half] = self.val[0:self.n:2]
+                self.n = half
+                self.stride *= 2
+                ts, val = ts[::2], val[::2]
+
+    def first_reaching(self, level):
+        hit = np.flatnonzero(np.abs(self.val[:self.n]) >= level)
+        return self.ts[hit[0]] if len(hit) else None
+
+
+class FeatureEngine:
+    stat_names = ("mean", "std", "min", "max", "slope")
+
+    def __init__(self, channels, rate, baseline_tau=60.0, smooth_tau=0.5, stats_tau=5.0,
+                 threshold=0.05, cycle_seconds=None, phase_bins=8, keep=1000):
+        self.channels = int(channels)
+        self.rate = float(rate)
+        self.baseline_tau = baseline_tau
+        self.smooth_tau = smooth_tau
+        self.stats_tau = stats_tau
+        self.threshold = threshold
+        self.cycle_seconds = cycle_seconds
+        self.phase_bins = int(phase_bins)
+        # finished results wait here until drained; the oldest go if nobody drains
+        self.events = deque(maxlen=keep)
+        self.cycles = deque(maxlen=keep)
+        self.reset()
+
+    def _alpha(self, tau):
+        return math.exp(-1.0 / (self.rate * tau)) if tau > 0 else 0.0
+
+    def reset(self):
+        C = self.channels
+        self.baseline = None
+        self.smooth = np.zeros(C)
+        self.mean = np.zeros(C)
+        self.var = np.zeros(C)
+        self.state = np.zeros(C, dtype=np.int8)
+        self.onset = np.zeros(C)
+        self.peak = np.zeros(C)
+        self.peak_ts = np.zeros(C)
+        self.recover_start = np.zeros(C)
+        self.t_resp = np.full(C, np.nan)
+        self.traces = [None] * C
+        self._cycle_start = None
+        self._cycle_index = 0
+        self._last_phase = None
+        self._clear_cycle()
+
+    def _clear_cycle(self):
+        C, B = self.channels, self.phase_bins
+        self._acc = {"n": 0, "s": np.zeros(C), "ss": np.zeros(C), "st": 0.0, "stt": 0.0, "sty": np.zeros(C),
+                     "min": np.full(C, np.inf), "max": np.full(C, -np.inf),
+                     "bin_s": np.zeros((B, C)), "bin_n": np.zeros(B)}
+
+    @property
+    def std(self):
+        return np.sqrt(np.maximum(self.var, 0.0))
+
+    def feature_names(self):
+        names = [f"ch{c + 1}_{s}" for c in range(self.channels) for s in self.stat_names]
+        names += [f"ch{c + 1}_phase{b}" for c in range(self.channels) for b in range(self.phase_bins)]
+        return names
+
+    def drain_events(self):
+        out = list(self.events)
+        self.events.clear()
+        return out
+
+    def drain_cycles(self):
+        out = list(self.cycles)
+        self.cycles.clear()
+        return out
+
+    # ---------- per batch ----------
+    def process(self, ts, block, phase=None):
+        """Update all state from one batch; returns ΔR/R0 shaped like block.
+
+        phase (optional, per sample, in [0, 1) or NaN) marks heater cycle position;
+        a wrap to a lower value closes a cycle. Without it, cycles are cut every
+        cycle_seconds.
+        """
+        ts = np.asarray(ts, dtype=np.float64)
+        x = np.asarray(block, dtype=np.float64)
+        if not len(ts):
+            return np.empty_like(x)
+        if self.baseline is None:
+            self.baseline = x[0].copy()
+            self.smooth[:] = 0.0
+        # baseline follows the signal only on channels that are idle at the start of the batch
+        idle = self.state == IDLE
+        base = np.broadcast_to(self.baseline, x.shape).copy()
+        if idle.any():
+            base[:, idle] = ema_block(x[:, idle], self.baseline[idle], self._alpha(self.baseline_tau))
+            self.baseline[idle] = base[-1, idle]
+        safe = np.where(np.abs(base) > 1e-12, base, 1e-12)
+        resp = (x - base) / safe
+        sm = ema_block(resp, self.smooth, self._alpha(self.smooth_tau))
+        self.smooth = sm[-1].copy()
+        # exponentially weighted rolling mean/variance of the response
+        a = self._alpha(self.stats_tau)
+        mean = ema_block(resp, self.mean, a)
+        self.var = ema_block((resp - mean) ** 2, self.var, a)[-1]
+        self.mean = mean[-1].copy()
+        self._events(ts, sm)
+        self._cycles(ts, resp, phase)
+        return resp
+
+    # ---------- exposure / recovery ----------
+    def _events(self, ts, sm):
+        mag = np.abs(sm)
+        # only channels that are mid-event or cross the threshold need the per-channel state machine
+        busy = (self.state != IDLE) | (mag > self.threshold).any(axis=0)
+        for c in np.flatnonzero(busy):
+            i, col = 0, mag[:, c]
+            while i < len(ts):
+                st = self.state[c]
+                if st == IDLE:
+                    hit = np.flatnonzero(col[i:] > self.threshold)
+                    if not len(hit):
+                        break
+                    i += hit[0]
+                    self.state[c] = EXPOSED
+                    self.onset[c] = ts[i]
+                    self.peak[c] = sm[i, c]
+                    self.peak_ts[c] = ts[i]
+                    self.traces[c] = ExposureTrace()
+                elif st == EXPOSED:
+                    seg = col[i:]
+                    # new peaks extend the exposure; falling below 90 % of the peak starts recovery
+                    run_max = np.maximum.accumulate(np.maximum(seg, abs(self.peak[c])))
+                    drop = np.flatnonzero(seg < 0.9 * run_max)
+                    j = i + (drop[0] if len(drop) else len(seg))
+                    if j > i:
+                        k = i + int(np.argmax(seg[:j - i]))
+                        if col[k] >= abs(self.peak[c]):
+                            self.peak[c], self.peak_ts[c] = sm[k, c], ts[k]
+                        self.traces[c].extend(ts[i:j], sm[i:j, c])
+                    if not len(drop):
+                        break
+                    self.t_resp[c] = self._t90(c)
+                    self.state[c] = RECOVERING
+                    self.recover_start[c] = ts[j]
+                    self.traces[c] = None
+                    i = j
+                else:
+                    seg = col[i:]
+                    level = max(0.1 * abs(self.peak[c]), self.threshold / 2)
+                    back = np.flatnonzero(seg >= 0.9 * abs(self.peak[c]))
+                    done = np.flatnonzero(seg < level)
+                    if len(back) and (not len(done) or back[0] < done[0]):
+                        # rose again before recovering: same exposure continues
+                        i += back[0]
+                        self.state[c] = EXPOSED
+                        self.traces[c] = ExposureTrace()
+                        continue
+                    if not len(done):
+                        break
+                    i += done[0]
+                    self.events.append({
+                        "channel": int(c), "onset": self.onset[c], "peak": float(self.peak[c]),
+                        "peak_ts": self.peak_ts[c], "response_time": float(self.t_resp[c]),
+                        "recovery_start": self.recover_start[c], "recovery_time": ts[i] - self.recover_start[c],
+                        "end": ts[i]})
+                    self.state[c] = IDLE
+
+    def _t90(self, c):
+        t = self.traces[c].first_reaching(0.9 * abs(self.peak[c])) if self.traces[c] is not None else None
+        return (t - self.onset[c]) if t is not None else np.nan
+
+    # ---------- heater cycles ----------
+    def _cycles(self, ts, resp, phase):
+        if phase is None:
+            if not self.cycle_seconds:
+                return
+            if self._cycle_start is None:
+                self._cycle_start = ts[0]
+            phase = ((ts - self._cycle_start) / self.cycle_seconds) % 1.0
+            cyc = np.floor((ts - self._cycle_start) / self.cycle_seconds)
+            cut = np.flatnonzero(np.diff(np.concatenate(([self._cycle_index], cyc))) > 0)
+            self._cycle_index = cyc[-1]
+        else:
+            # samples without a phase (heater preheat) belong to no cycle
+            phase = np.asarray(phase, dtype=np.float64)
+            ok = ~np.isnan(phase)
+            if not ok.all():
+                ts, resp, phase = ts[ok], resp[ok], phase[ok]
+                if not len(ts):
+                    return
+            prev = phase[0] if self._last_phase is None else self._last_phase
+            cut = np.flatnonzero(np.diff(np.concatenate(([prev], phase))) < 0)
+            self._last_phase = phase[-1]
+        s = 0
+        for e in list(cut) + [len(ts)]:
+            if e > s:
+                self._accumulate(ts[s:e], resp[s:e], phase[s:e])
+            if e < len(ts):
+                self._emit_cycle()
+            s = e
+
+    def _accumulate(self, ts, r, phase):
+        A = self._acc
+        if A["n"] == 0:
+            A["t0"] = ts[0]
+        t = ts - A["t0"]
+        A["n"] += len(ts)
+        A["s"] += r.sum(axis=0)
+        A["ss"] += (r * r).sum(axis=0)
+        A["st"] += t.sum()
+        A["stt"] += (t * t).sum()
+        A["sty"] += (t[:, None] * r).sum(axis=0)
+        A["min"] = np.minimum(A["min"], r.min(axis=0))
+        A["max"] = np.maximum(A["max"], r.max(axis=0))
+        b = np.minimum((phase * self.phase_bins).astype(int), self.phase_bins - 1)
+        np.add.at(A["bin_s"], b, r)
+        A["bin_n"] += np.bincount(b, minlength=self.phase_bins)
+
+    def _emit_cycle(self):
+        A = self._acc
+        n = A["n"]
+        if n < 2:
+            self._clear_cycle()
+            return
+        mean = A["s"] / n
+        std = np.sqrt(np.maximum(A["ss"] / n - mean ** 2, 0.0))
+        den = n * A["stt"] - A["st"] ** 2
+        slope = (n * A["sty"] - A["st"] * A["s"]) / den if den > 0 else np.zeros(self.channels)
+        stats = np.stack((mean, std, A["min"], A["max"], slope), axis=1).ravel()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bins = (A["bin_s"] / A["bin_n"][:, None]).T.ravel()
+        self.cycles.append({"start": A["t0"], "samples": n, "vector": np.concatenate((stats, bins))})
+        self._clear_cycle()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+SensorLab headless acquisition/logging.
+
+Runs the acquisition engine and run logger without Qt or pyqtgraph, using
+the settings saved by the GUI (config.py) unless overridden here. Prints
+throughput stats periodically and exits after --duration.
+
+Run: python headless.py --port /dev/ttyUSB0 --duration 5m
+      python headless.py --port /dev/ttyUSB0 --port /dev/ttyUSB1 --workers process
+      python headless.py --simulate 4 --rate 200 --duration 30s --no-log
+      python headless.py --replay run.csv --speed 0 --features --no-log
+"""
+
+import argparse, signal, sys, time
+
+from config import read_settings, parse_duration
+from acquisition import list_ports, SIMULATED_PORT, FRAME_ASCII, FRAME_BINARY
+from devices import DeviceManager
+from runlog import FORMATS
+from heater import HeaterEngine, PROFILES
+from metrics import MetricsSampler, MetricsLog
+from catalog import RunCatalog, catalog_path
+
+FRAMES = {"ascii": FRAME_ASCII, "binary": FRAME_BINARY}
+
+
+def build_parser(cfg):
+    p = argparse.ArgumentParser(description="SensorLab headless acquisition and logging")
+    p.add_argument("--port", action="append", help="serial port or 'Auto detect'; repeat for several devices")
+    p.add_argument("--simulate", type=int, nargs="?", const=1, default=0, metavar="N",
+                   help="add N simulated devices (default 1)")
+    p.add_argument("--replay", action="append", metavar="FILE",
+                   help="replay a logged run (CSV, HDF5 or binary capture) instead of reading ports; repeatable")
+    p.add_argument("--speed", type=float, default=1.0, help="replay speed factor; 0 = as fast as possible")
+    p.add_argument("--start", type=float, default=None, metavar="SECONDS", help="replay from this far into the run")
+    p.add_argument("--end", type=float, default=None, metavar="SECONDS", help="replay up to this far into the run")
+    p.add_argument("--workers", choices=["thread", "process"],
+                   default="process" if cfg["adv/workers"] == "Processes" else "thread",
+                   help="run each device reader in a thread or in its own process")
+    p.add_argument("--baud", type=int, default=int(cfg["device/baud"]))
+    p.add_argument("--channels", type=int, default=int(cfg["device/channels"]))
+    p.add_argument("--frame", choices=sorted(FRAMES),
+                   default="binary" if cfg["device/frame"] == FRAME_BINARY else "ascii")
+    p.add_argument("--crc", action=argparse.BooleanOptionalAction, default=cfg["adv/crc"] == "true")
+    p.add_argument("--rate", type=int, default=int(cfg["acq/rate"]), help="nominal sampling rate (Hz)")
+    p.add_argument("--timeout", type=int, default=int(cfg["adv/timeout"]), help="serial timeout (ms)")
+    p.add_argument("--duration", default=cfg["acq/duration"], help="∞, 30s, 1m, 5m, 10m or seconds")
+    p.add_argument("--log", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--log-dir", default=cfg["log/path"])
+    p.add_argument("--format", choices=sorted(FORMATS), default=cfg["log/format"])
+    p.add_argument("--ts-format", choices=["Epoch ms", "ISO 8601"], default=cfg["acq/ts"])
+    p.add_argument("--rotate-mb", type=int, default=int(cfg["log/rotate_mb"]))
+    p.add_argument("--rotate-min", type=int, default=int(cfg["log/rotate_min"]))
+    p.add_argument("--catalog", action=argparse.BooleanOptionalAction, default=cfg["log/catalog"] == "true",
+                   help="record logged runs in the run catalog of --log-dir")
+    p.add_argument("--sample-id", default="")
+    p.add_argument("--operator", default="")
+    p.add_argument("--notes", default="")
+    p.add_argument("--heater", action=argparse.BooleanOptionalAction, default=True,
+                   help="run the heater schedule and tag samples with its phase")
+    p.add_argument("--heater-profile", choices=PROFILES, default=cfg["heater/profile"])
+    p.add_argument("--heater-max", type=float, default=float(cfg["heater/max"]), help="max heater voltage (V)")
+    p.add_argument("--preheat", type=float, default=float(cfg["heater/preheat"]), help="preheat duration (s)")
+    p.add_argument("--heater-period", type=float, default=float(cfg["heater/period"]), help="heater cycle (s)")
+    p.add_argument("--heater-custom", default=cfg["heater/custom"] or None, help="custom profile file")
+    p.add_argument("--features", action=argparse.BooleanOptionalAction, default=False,
+                   help="track baselines and report exposure/recovery events")
+    p.add_argument("--cycle", type=float, default=None, metavar="SECONDS",
+                   help="cycle length for per-cycle feature vectors when the heater is off (with --features)")
+    p.add_argument("--model", default=None, help="pickled model for live prediction (.pkl)")
+    p.add_argument("--window", type=int, default=int(cfg["inf/window"]), help="model window (samples)")
+    p.add_argument("--hop", type=int, default=int(cfg["inf/hop"]), help="samples between windows")
+    p.add_argument("--latency-ms", type=int, default=int(cfg["inf/latency_ms"]), help="inference latency budget")
+    p.add_argument("--model-workers", choices=["thread", "process"],
+                   default="process" if cfg["inf/workers"] == "Process" else "thread",
+                   help="run predict() in a thread or a separate process")
+    p.add_argument("--stats-interval", type=float, default=1.0, help="seconds between stats lines")
+    p.add_argument("--metrics", metavar="FILE", default=None, help="append JSON-lines metrics snapshots to FILE")
+    p.add_argument("--metrics-interval", type=float, default=float(cfg["adv/metrics_interval"]),
+                   help="seconds between metrics snapshots")
+    return p
+
+
+def resolve_ports(args):
+    ports = [SIMULATED_PORT] * args.simulate
+    for port in args.port or ([] if ports else ["Auto detect"]):
+        if port == "Auto detect":
+            found = list_ports()
+            if not found:
+                raise RuntimeError("No serial ports found (use --simulate for the simulated device)")
+            port = found[0]
+        ports.append(port)
+    return ports
+
+
+def run(args, out=sys.stdout):
+    duration = parse_duration(args.duration)
+    frame = FRAMES[args.frame]
+    replays = args.replay or []
+    try:
+        ports = resolve_ports(args) if not replays or args.port or args.simulate else []
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    try:
+        heater = HeaterEngine(args.heater_profile, args.heater_max, args.preheat, args.heater_period,
+                              custom_path=args.heater_custom) if args.heater and ports else None
+    except (OSError, ValueError) as e:
+        print(f"Heater: {e}", file=sys.stderr)
+        return 2
+    manager = DeviceManager(args.workers, {"cycle_seconds": args.cycle} if args.features else None, heater)
+    for port in ports:
+        manager.add(port, channels=args.channels, frame=frame, rate=args.rate, baud=args.baud,
+                    timeout_ms=args.timeout, crc=args.crc)
+    try:
+        for path in replays:
+            p = manager.add_replay(path, speed=args.speed or None, rate=args.rate)
+            first = p.replay.span()[0]
+            p.replay_range = tuple(None if x is None else first + x for x in (args.start, args.end))
+            print(f"{p.name}: replaying {len(p.replay)} samples x {p.channels} channels from {path}", file=out)
+    except (OSError, ValueError, RuntimeError) as e:
+        manager.close()
+        print(f"Replay: {e}", file=sys.stderr)
+        return 2
+    catalog = sampler = metrics_log = None
+    stop = []
+    prev = {sig: signal.signal(sig, lambda *_: stop.append(1)) for sig in (signal.SIGINT, signal.SIGTERM)}
+    t0 = time.monotonic()
+    try:
+        try:
+            manager.start()
+            if args.log:
+                if args.catalog:
+                    try:
+                        catalog = RunCatalog(catalog_path(args.log_dir))
+                    except Exception as e:
+                        print(f"Run catalog disabled: {e}", file=sys.stderr)
+                meta = {"sample_id": args.sample_id, "operator": args.operator, "notes": args.notes,
+                        "heater_profile": args.heater_profile, "rate_hz": args.rate, "frame": frame}
+                for p in manager:
+                    logger = p.start_logging(args.log_dir, args.format, meta, args.ts_format,
+                                             args.rotate_mb, args.rotate_min, catalog)
+                    print(f"{p.name}: logging to {logger.path}", file=out)
+            if args.model:
+                for p in manager:
+                    p.start_inference(args.model, window=args.window, hop=args.hop, latency_ms=args.latency_ms,
+                                      workers=args.model_workers)
+            if args.metrics:
+                metrics_log = MetricsLog(args.metrics)
+                sampler = MetricsSampler(manager)
+        except Exception as e:  # bad port, unwritable log or metrics path, unloadable model...
+            print(f"Start failed: {e}", file=sys.stderr)
+            return 2
+        latest = {}
+        if sampler is not None:
+            sampler.sample()
+        t0 = last = last_metrics = time.monotonic()
+        last_samples = {p.name: 0 for p in manager}
+        while not stop:
+            time.sleep(0.05)
+            manager.poll()
+            now = time.monotonic()
+            for name, preds in manager.predictions():
+                latest[name] = preds[-1]
+            for name, ev in manager.events():
+                print(f"{name} CH{ev['channel'] + 1}: peak dR/R0={ev['peak']:+.4f} "
+                      f"response={ev['response_time']:.2f}s recovery={ev['recovery_time']:.2f}s", file=out, flush=True)
+            for name, err in manager.errors():
+                print(f"{name}: {err}", file=sys.stderr)
+                return 1
+            if now - last >= args.stats_interval:
+                for p in manager:
+                    eng = p.engine
+                    rate = (eng.samples - last_samples[p.name]) / (now - last)
+                    line = (f"[{now - t0:8.1f}s] {p.name} samples={eng.samples} rate={rate:.1f}/s "
+                            f"dropped_batches={eng.dropped_batches} bad_frames={eng.bad_frames} "
+                            f"late={eng.late_samples}")
+                    if p.logger is not None:
+                        line += f" logged={p.logger.rows} bytes={p.logger.bytes}"
+                    if p.inference is not None:
+                        lat = p.inference.latency_stats()
+                        if p.name in latest:
+                            line += f" prediction={latest[p.name][1]} confidence={latest[p.name][2]:.2f}"
+                        if lat is not None:
+                            line += f" batch_ms={lat['last'] * 1000:.1f} p99_ms={lat['p99'] * 1000:.1f}"
+                        line += f" backlog={p.inference.backlog}"
+                    print(line, file=out, flush=True)
+                    last_samples[p.name] = eng.samples
+                stats = heater.jitter_stats() if heater is not None else None
+                if stats is not None:
+                    print(f"[{now - t0:8.1f}s] heater setpoint={heater.setpoint:.2f}V ticks={stats['ticks']} "
+                          f"missed={stats['missed']} late={stats['late']} jitter_mean_us={stats['mean_us']:.0f} "
+                          f"jitter_p99_us={stats['p99_us']:.0f} jitter_max_us={stats['max_us']:.0f}", file=out, flush=True)
+                last = now
+            if metrics_log is not None and now - last_metrics >= args.metrics_interval:
+                metrics_log.write(dict(sampler.sample(), elapsed_s=now - t0))
+                last_metrics = now
+            if duration is not None and now - t0 >= duration:
+                break
+            if manager.finished:
+                print(f"[{now - t0:8.1f}s] replay finished: {sum(p.engine.samples for p in manager)} samples", file=out)
+                break
+        return 0
+    finally:
+        if metrics_log is not None:
+            metrics_log.write(dict(sampler.sample(), elapsed_s=time.monotonic() - t0))
+            metrics_log.close()
+        for logger in manager.stop():
+            print(f"{logger.metadata.get('device')}: logged {logger.rows} samples to "
+                  f"{', '.join(logger.files)}", file=out)
+            if logger.cycles:
+                print(f"{logger.metadata.get('device')}: {logger.cycles} heater-cycle feature vectors in "
+                      f"{logger.cycles_path}", file=out)
+        manager.close()
+        if catalog is not None:
+            catalog.close()
+        for sig, handler in prev.items():
+            signal.signal(sig, handler)
+
+
+def main(argv=None):
+    cfg = read_settings()
+    args = build_parser(cfg).parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
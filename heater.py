@@ -0,0 +1,181 @@
+"""
+Microheater waveform engine.
+
+Each profile is precomputed once into a lookup table covering one heater
+cycle (fraction of heater/max per LUT slot). setpoint_at() is a pure
+function of time, so a device that is handed the schedule evaluates the
+LUT per sample on its own side and never depends on host thread timing.
+A scheduler thread steps through the same table against absolute
+deadlines (coarse sleep, then a short spin) for devices that only take
+live set-points and for the displayed set-point, and records how late
+every tick fired; jitter_stats() reports missed and late ticks.
+
+Phase is a pure function of time: preheat at heater/max, then cycles of
+`period` seconds. phase_at() tags any sample timestamps with their cycle
+phase in [0, 1) (NaN during preheat) without talking to the thread.
+
+Custom profiles are text/CSV files with either one value per line (evenly
+spaced over the cycle) or "time, value" rows; values above 1 are taken as
+volts, otherwise as fractions of heater/max.
+"""
+
+import threading, time
+from collections import deque
+import numpy as np
+
+PROFILES = ("Samio", "Linear", "Custom")
+
+
+# ---------- Lookup tables ----------
+def profile_lut(profile, size=4096, custom_path=None, vmax=1.0):
+    """One cycle of set-points as fractions of heater/max, `size` slots long."""
+    phase = np.arange(size) / size
+    if profile == "Samio":
+        # smooth modulation: raised cosine from off to full and back
+        return 0.5 - 0.5 * np.cos(2 * np.pi * phase)
+    if profile == "Linear":
+        # triangular ramp up for half a cycle, down for the other half
+        return 1.0 - np.abs(2.0 * phase - 1.0)
+    if profile == "Custom":
+        if not custom_path:
+            raise ValueError("Custom heater profile needs a profile file")
+        return load_custom(custom_path, size, vmax)
+    raise ValueError(f"Unknown heater profile: {profile}")
+
+
+def load_custom(path, size=4096, vmax=1.0):
+    rows = np.atleast_2d(np.loadtxt(path, delimiter=",", comments="#", ndmin=2))
+    if rows.shape[1] >= 2:
+        t, v = rows[:, 0], rows[:, 1]
+        t = (t - t[0]) / (t[-1] - t[0]) if t[-1] > t[0] else np.linspace(0, 1, len(t))
+    else:
+        v = rows[:, 0]
+        t = np.arange(len(v)) / len(v)
+    if v.max() > 1.0:
+        v = v / vmax
+    # the cycle wraps: interpolate through the first point again at phase 1
+    lut = np.interp(np.arange(size) / size, np.append(t, 1.0), np.append(v, v[0]))
+    return np.clip(lut, 0.0, 1.0)
+
+
+# ---------- Scheduler ----------
+class HeaterEngine:
+    spin = 0.0002  # final stretch before a deadline spent spinning instead of sleeping
+
+    def __init__(self, profile="Linear", vmax=5.0, preheat=30, period=20.0, step_hz=100,
+                 custom_path=None, lut_size=4096, output=None, clock=time.time):
+        self.profile = profile
+        self.vmax = float(vmax)
+        self.preheat = float(preheat)
+        self.period = float(period)
+        self.step_hz = float(step_hz)
+        self.lut = profile_lut(profile, lut_size, custom_path, self.vmax) * self.vmax
+        self.output = output  # callable(volts) that applies a set-point, or None
+        self.clock = clock
+        self.t0 = None  # clock() at start; phase and set-points are referenced to it
+        self.setpoint = 0.0
+        self.ticks = 0
+        self.missed = 0  # deadlines skipped after a stall longer than a step
+        self.late = 0    # ticks that fired more than half a step after their deadline
+        self.jitter = deque(maxlen=4096)  # seconds each tick fired after its deadline
+        self.error = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def phase_at(self, ts):
+        """Cycle phase in [0, 1) for clock timestamps; NaN before start and during preheat."""
+        ts = np.asarray(ts, dtype=np.float64)
+        if self.t0 is None:
+            return np.full(ts.shape, np.nan)
+        cyc = (ts - self.t0 - self.preheat) / self.period
+        return np.where(cyc >= 0, cyc % 1.0, np.nan)
+
+    def setpoint_at(self, ts):
+        """Heater volts the schedule asks for at clock timestamps (0 before start)."""
+        ts = np.asarray(ts, dtype=np.float64)
+        if self.t0 is None:
+            return np.zeros(ts.shape)
+        phase = self.phase_at(ts)
+        idx = np.nan_to_num(phase * len(self.lut)).astype(np.int64) % len(self.lut)
+        pre = ts - self.t0
+        return np.where(np.isnan(phase), np.where((pre >= 0) & (pre < self.preheat), self.vmax, 0.0), self.lut[idx])
+
+    def start(self, t0=None):
+        self.t0 = self.clock() if t0 is None else t0
+        self.ticks = self.missed = self.late = 0
+        self.jitter.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="heater", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._apply(0.0)
+
+    def _apply(self, volts):
+        self.setpoint = volts
+        if self.output is not None:
+            self.output(volts)
+
+    def _run(self):
+        # deadlines are on perf_counter; the clock offset maps them back to sample timestamps
+        step = 1.0 / self.step_hz
+        base = time.perf_counter()
+        offset = self.clock() - base
+        k = 0
+        try:
+            while not self._stop.is_set():
+                deadline = base + k * step
+                remaining = deadline - time.perf_counter()
+                if remaining > self.spin:
+                    if self._stop.wait(remaining - self.spin):
+                        break
+                while time.perf_counter() < deadline:
+                    pass
+                now = time.perf_counter()
+                self._apply(float(self.setpoint_at(deadline + offset)))
+                self.jitter.append(now - deadline)
+                self.ticks += 1
+                if now - deadline > step / 2:
+                    self.late += 1
+                # a stall longer than a step skips the ticks it covered instead of bursting them
+                late = int((now - deadline) / step)
+                self.missed += late
+                k += 1 + late
+        except Exception as e:
+            self.error = e
+
+    def jitter_stats(self):
+        if not self.jitter:
+            return None
+        j = np.fromiter(self.jitter, dtype=np.float64) * 1e6
+        return {"ticks": self.ticks, "missed": self.missed, "late": self.late, "mean_us": float(j.mean()),
+                "p99_us": float(np.percentile(j, 99)), "max_us": float(j.max())}
+
+    def metadata(self):
+        # enough to recompute every sample's phase from its timestamp after the run
+        return {"heater_profile": self.profile, "heater_max_v": self.vmax, "heater_preheat_s": self.preheat,
+                "heater_period_s": self.period, "heater_t0": f"{self.t0:.6f}" if self.t0 is not None else ""}
+
+
+def heater_from_metadata(meta):
+    """A stopped HeaterEngine whose phase_at() reproduces a logged run's schedule, or None."""
+    try:
+        t0 = float(meta["heater_t0"])
+        preheat, period = float(meta["heater_preheat_s"]), float(meta["heater_period_s"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # phase only needs the timing; a custom profile's file may not be around any more
+    profile = meta.get("heater_profile")
+    engine = HeaterEngine(profile if profile in ("Samio", "Linear") else "Linear",
+                          float(meta.get("heater_max_v", 5.0)), preheat, period)
+    engine.t0 = t0
+    return engine
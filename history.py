@@ -0,0 +1,186 @@
+"""
+Multi-resolution run history.
+
+The newest samples stay at full resolution in RAM (a RingBuffer). Every
+sample is also written through to memory-mapped spill files, and cascading
+aggregate tiers (min/max per bucket, `fanout` times coarser per level)
+are computed as data arrives and spilled the same way. A query for any
+time range reads either raw samples or the coarsest tier that still gives
+enough points, so scrolling back over a multi-hour run touches a few pages
+of the spill files and RAM stays bounded by the ring size.
+"""
+
+import os, shutil, tempfile
+import numpy as np
+
+from ringbuffer import RingBuffer
+from lod import envelope_decimate, minmax_decimate, visible_slice
+
+
+class SpillArray:
+    """Append-only (n, cols) array backed by a growable memory-mapped file."""
+
+    grow_max = 1 << 22  # rows added per remap once the file is large
+
+    def __init__(self, path, cols, dtype, capacity=1 << 16):
+        self.path = path
+        self.cols = int(cols)
+        self.dtype = np.dtype(dtype)
+        self.n = 0
+        self.capacity = 0
+        self._map = None
+        open(path, "wb").close()
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        if self._map is not None:
+            # Windows refuses to resize a file that is still mapped: unmap, grow, map again
+            self._map.flush()
+            self._map._mmap.close()
+            self._map = None
+        os.truncate(self.path, capacity * self.cols * self.dtype.itemsize)
+        self._map = np.memmap(self.path, self.dtype, "r+", shape=(capacity, self.cols))
+        self.capacity = capacity
+
+    def append(self, rows):
+        rows = np.asarray(rows).reshape(-1, self.cols)
+        need = self.n + len(rows)
+        if need > self.capacity:
+            self._grow(max(need, self.capacity + min(self.capacity, self.grow_max)))
+        self._map[self.n:need] = rows
+        self.n = need
+
+    def __len__(self):
+        return self.n
+
+    # rows()/column() are views into the current mapping: valid until an append grows the file
+    def rows(self, i0=0, i1=None):
+        return self._map[i0:self.n if i1 is None else min(i1, self.n)]
+
+    def column(self, j=0):
+        return self._map[:self.n, j]
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+
+
+class AggregateTier:
+    """Buckets of `size` raw samples: ts of the first sample, then min and max per channel."""
+
+    def __init__(self, directory, level, channels, fanout):
+        self.level = level
+        self.channels = channels
+        self.fanout = fanout
+        self.size = fanout ** (level + 1)
+        self.ts = SpillArray(os.path.join(directory, f"tier{level}_ts.bin"), 1, np.float64)
+        self.agg = SpillArray(os.path.join(directory, f"tier{level}_agg.bin"), 2 * channels, np.float32)
+        self._pending = None
+
+    def add(self, ts, mn, mx):
+        # consume finer rows, emit (and spill) the completed buckets for the next level
+        if self._pending is not None:
+            ts, mn, mx = (np.concatenate((p, a)) for p, a in zip(self._pending, (ts, mn, mx)))
+        f, C = self.fanout, self.channels
+        k = len(ts) // f * f
+        self._pending = (ts[k:], mn[k:], mx[k:]) if k < len(ts) else None
+        if not k:
+            return None
+        b = k // f
+        bts = ts[:k:f]
+        bmn = mn[:k].reshape(b, f, C).min(axis=1)
+        bmx = mx[:k].reshape(b, f, C).max(axis=1)
+        self.ts.append(bts)
+        self.agg.append(np.hstack((bmn, bmx)))
+        return bts, bmn, bmx
+
+    def close(self):
+        self.ts.close()
+        self.agg.close()
+
+
+class TieredHistory:
+    def __init__(self, channels, ram_points, directory=None, fanout=16, levels=4):
+        self.channels = int(channels)
+        self.recent = RingBuffer(self.channels, ram_points)
+        self._own_dir = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="sensorlab-history-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.raw_ts = SpillArray(os.path.join(self.directory, "raw_ts.bin"), 1, np.float64)
+        self.raw = SpillArray(os.path.join(self.directory, "raw.bin"), self.channels, np.float32)
+        self.tiers = [AggregateTier(self.directory, k, self.channels, fanout) for k in range(levels)]
+
+    def __len__(self):
+        return len(self.raw_ts)
+
+    def span(self):
+        if not len(self):
+            return None
+        ts = self.raw_ts.column()
+        return float(ts[0]), float(ts[-1])
+
+    def append(self, ts, block):
+        ts = np.asarray(ts, dtype=np.float64)
+        block = np.asarray(block, dtype=np.float64)
+        if not len(ts):
+            return
+        self.recent.extend(ts, block)
+        self.raw_ts.append(ts)
+        self.raw.append(block)
+        rows = (ts, block, block)
+        for tier in self.tiers:
+            rows = tier.add(*rows)
+            if rows is None:
+                break
+
+    def query(self, t0, t1, max_points):
+        """(x, y) for [t0, t1] with y shaped (channels, m) and m <= about max_points."""
+        buckets = max(1, int(max_points) // 2)
+        i0, i1 = visible_slice(self.raw_ts.column(), t0, t1)
+        if i1 - i0 <= 2 * buckets:
+            return self._raw(i0, i1)
+        # coarsest tier that still has enough buckets in view; finer data is cut down to fit
+        tier = None
+        for t in self.tiers:
+            b0, b1 = visible_slice(t.ts.column(), t0, t1)
+            if b1 - b0 < buckets:
+                break
+            tier = t
+        if tier is None:
+            return minmax_decimate(*self._raw(i0, i1), buckets)
+        # samples after the last complete bucket are not in the tier yet; they get their share of buckets
+        j0 = max(i0, len(tier.ts) * tier.size)
+        tail = -(-buckets * (i1 - j0) // (i1 - i0)) if j0 < i1 else 0
+        b0, b1 = visible_slice(tier.ts.column(), t0, t1)
+        x = tier.ts.column()[b0:b1]
+        agg = tier.agg.rows(b0, b1)
+        C = self.channels
+        xs, ys = envelope_decimate(x, agg[:, :C].T, agg[:, C:].T, max(1, buckets - tail))
+        ys = ys.astype(np.float64)
+        if tail:
+            tx, ty = minmax_decimate(*self._raw(j0, i1), tail)
+            xs, ys = np.concatenate((xs, tx)), np.concatenate((ys, ty), axis=1)
+        return xs, ys
+
+    def raw_range(self, t0, t1):
+        # full-resolution samples in [t0, t1]
+        i0 = int(np.searchsorted(self.raw_ts.column(), t0, side="left"))
+        i1 = int(np.searchsorted(self.raw_ts.column(), t1, side="right"))
+        return self._raw(i0, i1)
+
+    def _raw(self, i0, i1):
+        # RAM ring when the range is recent enough, otherwise the spill file
+        n, r = len(self), len(self.recent)
+        if i0 >= n - r:
+            ts, data = self.recent.view()
+            o = n - r
+            return ts[i0 - o:i1 - o], data[:, i0 - o:i1 - o]
+        # copies: the caller may keep them past the next append, which can remap the file
+        return np.array(self.raw_ts.column()[i0:i1]), np.array(self.raw.rows(i0, i1).T)
+
+    def close(self):
+        for a in [self.raw_ts, self.raw] + [t for tier in self.tiers for t in (tier.ts, tier.agg)]:
+            a.close()
+        if self._own_dir:
+            shutil.rmtree(self.directory, ignore_errors=True)
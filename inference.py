@@ -0,0 +1,212 @@
+"""
+Real-time model inference off the GUI thread.
+
+InferenceStage cuts sliding windows from a device's live stream, gathers
+them into micro-batches and runs the model's predict() in a worker thread
+or a process pool. A batch is dispatched when it is full or when waiting
+longer would push its oldest window past the latency budget, so light
+models answer within the budget and heavy ones still get large batches
+when the stream backs up.
+
+Models are anything pickled with a scikit-learn style predict() (joblib
+dumps load too). Each window is passed as one row: the (window, channels)
+samples flattened time-major. predict_proba(), when present, gives the
+confidence; regressors report NaN confidence.
+"""
+
+import pickle, queue, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing as mp
+import numpy as np
+
+
+def load_model(path):
+    try:
+        import joblib
+    except ImportError:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return joblib.load(path)
+
+
+def predict_batch(model, X):
+    """(labels, confidence) for the rows of X."""
+    if hasattr(model, "predict_proba"):
+        proba = np.asarray(model.predict_proba(X))
+        best = proba.argmax(axis=1)
+        classes = getattr(model, "classes_", None)
+        labels = np.asarray(classes)[best] if classes is not None else best
+        return labels, proba[np.arange(len(best)), best]
+    labels = np.asarray(model.predict(X))
+    return labels, np.full(len(labels), np.nan)
+
+
+# process pool workers load the model once, in their initializer
+_worker_model = None
+
+
+def _init_worker(path):
+    global _worker_model
+    _worker_model = load_model(path)
+
+
+def _predict_in_worker(X):
+    return predict_batch(_worker_model, X)
+
+
+class SlidingWindows:
+    """Cuts (window, channels) windows every `hop` samples from a stream of (ts, block) batches."""
+
+    def __init__(self, channels, window, hop):
+        self.channels = int(channels)
+        self.window = int(window)
+        self.hop = max(1, int(hop))
+        self._ts = np.empty(0)
+        self._data = np.empty((0, self.channels))
+        self._next = self.window  # samples needed in the tail before the next window ends
+
+    def push(self, ts, block):
+        """(end timestamps (k,), windows (k, window * channels)) completed by this batch."""
+        self._ts = np.concatenate((self._ts, ts))
+        self._data = np.concatenate((self._data, np.asarray(block, dtype=np.float64)))
+        ends = np.arange(self._next, len(self._ts) + 1, self.hop)
+        if len(ends):
+            starts = ends - self.window
+            view = np.lib.stride_tricks.sliding_window_view(self._data, self.window, axis=0)
+            # view[i] is (channels, window) for samples i..i+window; rows are time-major
+            wins = view[starts].transpose(0, 2, 1).reshape(len(ends), -1)
+            out = self._ts[ends - 1], np.ascontiguousarray(wins)
+            self._next = ends[-1] + self.hop
+        else:
+            out = np.empty(0), np.empty((0, self.window * self.channels))
+        # keep only what future windows can still use
+        keep = max(0, min(len(self._ts), len(self._ts) - (self._next - self.window)))
+        cut = len(self._ts) - keep
+        self._ts, self._data = self._ts[cut:], self._data[cut:]
+        self._next -= cut
+        return out
+
+
+class InferenceStage:
+    def __init__(self, model_path, channels, window=100, hop=20, latency_ms=100, max_batch=64,
+                 workers="thread", queue_size=1024):
+        self.model_path = model_path
+        self.windows = SlidingWindows(channels, window, hop)
+        self.budget = latency_ms / 1000.0
+        self.max_batch = int(max_batch)
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._results = deque(maxlen=queue_size)
+        self.latencies = deque(maxlen=256)  # per-batch seconds, oldest window queued -> result
+        self._predict_time = 0.0  # running estimate of one predict() call
+        self._in_flight = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self.batches = 0
+        self.predictions = 0
+        self.dropped_windows = 0
+        self.error = None
+        if workers == "process":
+            self._pool = ProcessPoolExecutor(1, mp_context=mp.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(model_path,))
+            self.model = None
+        else:
+            self.model = load_model(model_path)
+            self._pool = ThreadPoolExecutor(1, thread_name_prefix="inference")
+        n = getattr(self.model, "n_features_in_", None)
+        if n is not None and n != window * channels:
+            self._pool.shutdown(wait=False)
+            raise ValueError(f"Model expects {n} features, a window gives {window} x {channels} = {window * channels}")
+
+    @property
+    def backlog(self):
+        # windows waiting for a batch plus windows being predicted
+        return self._queue.qsize() + self._in_flight
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, ts, block):
+        # never blocks the caller: when the model cannot keep up the oldest windows go
+        end_ts, wins = self.windows.push(ts, block)
+        now = time.monotonic()
+        for t, w in zip(end_ts, wins):
+            try:
+                self._queue.put_nowait((now, t, w))
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped_windows += 1
+                except queue.Empty:
+                    pass
+                self._queue.put_nowait((now, t, w))
+
+    def drain(self):
+        """Finished predictions as (ts, label, confidence) tuples, oldest first."""
+        out = []
+        while self._results:
+            out.append(self._results.popleft())
+        return out
+
+    def latency_stats(self):
+        if not self.latencies:
+            return None
+        lat = np.fromiter(self.latencies, dtype=np.float64)
+        return {"last": float(lat[-1]), "p50": float(np.percentile(lat, 50)), "p99": float(np.percentile(lat, 99))}
+
+    # ---------- batcher thread ----------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            batch = [first]
+            # hold the batch open while the oldest window can still make its deadline
+            deadline = first[0] + max(0.0, self.budget - self._predict_time)
+            while len(batch) < self.max_batch:
+                wait = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        X = np.stack([w for _, _, w in batch])
+        self._in_flight = len(batch)
+        t0 = time.monotonic()
+        try:
+            if self.model is not None:
+                fut = self._pool.submit(predict_batch, self.model, X)
+            else:
+                fut = self._pool.submit(_predict_in_worker, X)
+            labels, conf = fut.result()
+        except Exception as e:
+            self.error = e
+            self._stop.set()
+            return
+        finally:
+            self._in_flight = 0
+        done = time.monotonic()
+        self._predict_time = 0.8 * self._predict_time + 0.2 * (done - t0) if self.batches else done - t0
+        self.latencies.append(done - batch[0][0])
+        self.batches += 1
+        self.predictions += len(batch)
+        for (_, t, _), label, c in zip(batch, labels, conf):
+            self._results.append((t, label, float(c)))
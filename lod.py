@@ -0,0 +1,42 @@
+"""
+Level-of-detail helpers for the live plot.
+
+Curves are drawn with at most two points per horizontal pixel: each bucket
+of samples is replaced by its min and max, so spikes survive decimation.
+When the visible range holds fewer samples than that, the raw store slice
+is used as-is.
+"""
+
+import numpy as np
+
+
+def visible_slice(x, x0, x1):
+    # index range covering [x0, x1] of sorted x, plus one point either side
+    i0 = max(int(np.searchsorted(x, x0, side="left")) - 1, 0)
+    i1 = min(int(np.searchsorted(x, x1, side="right")) + 1, len(x))
+    return i0, i1
+
+
+def minmax_decimate(x, y, buckets):
+    """
+    x: sorted (n,), y: (n,) or (channels, n). Returns (x2, y2) with two points
+    (min, max) per bucket, or the inputs untouched if they already fit.
+    """
+    if len(x) <= 2 * max(1, int(buckets)):
+        return x, y
+    return envelope_decimate(x, y, y, buckets)
+
+
+def envelope_decimate(x, lo, hi, buckets):
+    # merge consecutive (lo, hi) envelopes into at most `buckets` interleaved min/max pairs
+    n = len(x)
+    one_d = lo.ndim == 1
+    lo2 = lo[None, :] if one_d else lo
+    hi2 = hi[None, :] if one_d else hi
+    b = min(n, max(1, int(buckets)))
+    idx = np.arange(b) * n // b  # bucket starts, sizes differ by at most one sample
+    out_y = np.empty((lo2.shape[0], 2 * len(idx)), dtype=np.result_type(lo2, hi2))
+    out_y[:, 0::2] = np.minimum.reduceat(lo2, idx, axis=1)
+    out_y[:, 1::2] = np.maximum.reduceat(hi2, idx, axis=1)
+    out_x = np.repeat(x[idx], 2)
+    return out_x, (out_y[0] if one_d else out_y)
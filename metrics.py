@@ -0,0 +1,124 @@
+"""
+Pipeline instrumentation.
+
+The hot paths only bump counters they already keep (samples, dropped
+batches, ...) and store durations into fixed-size Timer rings, which is a
+perf_counter() pair and one array store per call. Nothing is aggregated
+until somebody asks: MetricsSampler.sample() turns counter deltas into
+rates and timer rings into percentiles, for the status bar, the
+diagnostics panel or a periodic JSON-lines metrics file.
+"""
+
+import json, os, time
+import numpy as np
+
+
+class Timer:
+    """Ring of the last `size` durations (seconds); add() never allocates."""
+
+    def __init__(self, size=1024):
+        self.values = np.zeros(size)
+        self.size = size
+        self.n = 0
+
+    def add(self, seconds):
+        self.values[self.n % self.size] = seconds
+        self.n += 1
+
+    def stats(self):
+        # milliseconds over the retained window, or None before the first sample
+        k = min(self.n, self.size)
+        if not k:
+            return None
+        v = self.values[:k] * 1e3
+        return {"count": self.n, "p50_ms": float(np.percentile(v, 50)), "p99_ms": float(np.percentile(v, 99)),
+                "max_ms": float(v.max())}
+
+
+class MetricsSampler:
+    """Snapshots of a DeviceManager (plus any extra Timers), with rates from the previous snapshot."""
+
+    def __init__(self, manager, timers=None):
+        self.manager = manager
+        self.timers = dict(timers or {})
+        self._prev = {}
+        self._prev_t = None
+
+    def _rate(self, key, value, dt):
+        prev = self._prev.get(key)
+        self._prev[key] = value
+        return (value - prev) / dt if prev is not None and dt >= 0.1 and value >= prev else None
+
+    def sample(self):
+        now = time.monotonic()
+        dt = now - self._prev_t if self._prev_t is not None else 0.0
+        self._prev_t = now
+        devices = {}
+        for p in self.manager:
+            eng = p.engine
+            d = {"port": p.port, "running": eng is not None}
+            if eng is not None:
+                d.update(samples=eng.samples, rate_hz=self._rate((p.name, "samples"), eng.samples, dt),
+                         nominal_hz=p.rate, dropped_batches=eng.dropped_batches, bad_frames=eng.bad_frames,
+                         late_samples=eng.late_samples, read_queue=eng.backlog,
+                         parse=eng.parse_time.stats() if eng.parse_time is not None else None)
+            d["poll"] = p.poll_time.stats()
+            lg = p.logger
+            if lg is not None:
+                d["logger"] = {"rows": lg.rows, "bytes": lg.bytes,
+                               "bytes_per_s": self._rate((p.name, "bytes"), lg.bytes, dt),
+                               "queue": lg.queue.qsize(), "dropped_batches": lg.dropped_batches,
+                               "write": lg.write_time.stats()}
+            st = p.inference
+            if st is not None:
+                d["inference"] = {"backlog": st.backlog, "batches": st.batches,
+                                  "dropped_windows": st.dropped_windows, "latency": st.latency_stats()}
+            devices[p.name] = d
+        snap = {"time": time.time(), "devices": devices,
+                "timers": {name: t.stats() for name, t in self.timers.items()}}
+        heater = getattr(self.manager, "heater", None)
+        if heater is not None and heater.running:
+            snap["heater"] = dict(heater.jitter_stats() or {}, setpoint_v=heater.setpoint)
+        return snap
+
+
+def summary(snap):
+    """Totals across devices for one-line displays."""
+    devs = [d for d in snap["devices"].values() if d.get("running")]
+    rates = [d["rate_hz"] for d in devs if d.get("rate_hz") is not None]
+    return {"devices": len(devs), "rate_hz": min(rates) if rates else None,
+            "dropped": sum(d["dropped_batches"] for d in devs),
+            "bad_frames": sum(d["bad_frames"] for d in devs),
+            "late": sum(d["late_samples"] for d in devs),
+            "logging": sum(1 for d in snap["devices"].values() if "logger" in d),
+            "log_dropped": sum(d["logger"]["dropped_batches"] for d in snap["devices"].values() if "logger" in d)}
+
+
+def flatten(snap, prefix=""):
+    """{"devices.dev1.rate_hz": 200.0, ...} for tables and diffing."""
+    out = {}
+    for k, v in snap.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(flatten(v, key + "."))
+        else:
+            out[key] = v
+    return out
+
+
+class MetricsLog:
+    """Appends one JSON snapshot per line."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, snap):
+        self._f.write(json.dumps(snap, default=float) + "\n")
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
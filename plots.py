@@ -0,0 +1,49 @@
+"""
+Plot widgets for the dashboard.
+
+Kept apart from s.py so pyqtgraph, the heaviest import in the app, is only
+loaded when the dashboard is first built.
+"""
+
+import pyqtgraph as pg
+
+from lod import minmax_decimate
+
+CHANNEL_COLORS = ['#1f77b4','#ff7f0e','#2ca02c','#d62728','#9467bd','#8c564b','#e377c2','#7f7f7f']
+
+class DevicePlot(pg.PlotWidget):
+    """One channel group: the curves of a single device, drawn from its run history."""
+
+    def __init__(self, title, channels):
+        super().__init__(title=title, axisItems={"bottom": pg.DateAxisItem()})
+        self.showGrid(x=True,y=True)
+        self.addLegend()
+        self.curves = []
+        for i in range(channels):
+            color = CHANNEL_COLORS[i] if i < len(CHANNEL_COLORS) else pg.intColor(i, channels)
+            # 1 px pens: wide pens take Qt's slow stroking path on dense curves
+            self.curves.append(self.plot([], [], pen=pg.mkPen(color, width=1), name=f"CH{i+1}"))
+        self.dirty = False
+        self.getViewBox().sigXRangeChanged.connect(self.on_range_changed)
+
+    def on_range_changed(self, *args):
+        # manual or linked pan/zoom needs a fresh query; auto-ranging does not
+        if not self.getViewBox().autoRangeEnabled()[0]:
+            self.dirty = True
+
+    def render(self, history):
+        # at most two points per pixel of the visible x range; full resolution once zoomed in far enough
+        if not self.dirty or history is None or not len(history):
+            return
+        self.dirty = False
+        # live view follows the RAM ring; a manual range can reach anywhere in the run history
+        vb = self.getViewBox()
+        px = max(100, int(vb.width()))
+        if vb.autoRangeEnabled()[0]:
+            x, y = minmax_decimate(*history.recent.view(), px)
+        else:
+            (x0, x1), _ = vb.viewRange()
+            x, y = history.query(x0, x1, 2 * px)
+        for i, curve in enumerate(self.curves):
+            if i < len(y):
+                curve.setData(x, y[i], skipFiniteCheck=True)
@@ -0,0 +1,425 @@
+"""
+Replay of logged runs.
+
+open_run() memory-maps a run written by RunLogger (CSV or HDF5) or a raw
+capture of binary device frames, and indexes it by timestamp so any time
+range is reached without reading the whole file:
+
+- CSV: one pass over the mapped bytes records the offset and timestamp of
+  every `index_every`-th line; it is cached beside the run as
+  <run>.idx.npz, so reopening is instant. Reads parse only the lines asked
+  for; a malformed line still occupies its row, so it is left out of the
+  result without shifting the rows after it.
+- HDF5: rows are positional and the ts column is monotonic, so lookups
+  bisect it with single-row reads.
+- Binary frames: fixed-length records mapped as a structured array; row i
+  is at i * frame length and its time is start + i / rate. Every read
+  checks the sync word, channel count, flags and CRC of its frames and
+  raises on a damaged capture instead of returning shifted samples.
+
+ReplaySource looks like an AcquisitionEngine (start/stop/drain and the
+same counters), so a replayed run flows through the usual DevicePipeline
+into history, plots, features, inference and logging, at 1x, Nx or as
+fast as the pipeline takes it. Samples keep their original timestamps.
+An unpaced replay hands over at most `drain_rows` rows per drain(), so a
+GUI poll never chews through a whole run at once.
+"""
+
+import os, queue, threading, time
+import numpy as np
+
+from codec import HEADER_LEN, FLAG_CRC, SYNC, crc16_rows, frame_length
+from metrics import Timer
+
+RUN_FILTERS = "Runs (*.csv *.h5 *.hdf5 *.bin);;All files (*)"
+
+
+def _fill_forward(ts):
+    # NaN (malformed) timestamps take the last good one, so the array stays sorted for searchsorted
+    if not np.isnan(ts).any():
+        return ts
+    out = np.fmax.accumulate(ts)
+    out[np.isnan(out)] = -np.inf
+    return out
+
+
+def open_run(path, rate=None, start=None):
+    """Reader for a logged run; rate/start (epoch s) only apply to binary captures."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".h5", ".hdf5"):
+        return Hdf5Run(path)
+    if ext in (".bin", ".raw"):
+        return BinaryRun(path, rate, start)
+    return CsvRun(path)
+
+
+class RunReader:
+    """Common lookups; subclasses provide rows, channels, metadata, ts_at() and read()."""
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def rate(self):
+        # nominal rate from the run's metadata, else estimated from its span
+        try:
+            return float(self.metadata["rate_hz"])
+        except (KeyError, ValueError):
+            t0, t1 = self.span()
+            return (self.rows - 1) / (t1 - t0) if self.rows > 1 and t1 > t0 else 10.0
+
+    def span(self):
+        return (self.ts_at(0), self.ts_at(self.rows - 1)) if self.rows else (0.0, 0.0)
+
+    def locate(self, t):
+        """First row with ts >= t (bisection over ts_at)."""
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts_at(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_range(self, t0, t1):
+        return self.read(self.locate(t0), self.locate(np.nextafter(t1, np.inf)))
+
+    def close(self):
+        pass
+
+
+# ---------- CSV ----------
+class CsvRun(RunReader):
+    index_every = 4096
+    scan_bytes = 64 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self.mm = np.memmap(path, np.uint8, "r")
+        self.metadata = {}
+        off = 0
+        while off < len(self.mm):
+            end = self._line_end(off)
+            line = bytes(self.mm[off:end]).decode("utf-8", "replace").rstrip("\r")
+            off = end + 1
+            if line.startswith("#"):
+                key, sep, value = line[1:].partition(":")
+                if sep:
+                    self.metadata[key.strip()] = value.strip()
+                continue
+            self.columns = line.split(",")
+            break
+        self.channels = len(self.columns) - 1
+        self.data0 = off
+        self.bad_frames = 0
+        first = bytes(self.mm[off:off + 64]).split(b",", 1)[0]
+        self.iso = b"T" in first or b"-" in first[1:]
+        self._load_index()
+
+    def _line_end(self, off):
+        hit = np.flatnonzero(self.mm[off:off + (1 << 16)] == 10)
+        return off + int(hit[0]) if len(hit) else len(self.mm)
+
+    # ---------- index ----------
+    def _load_index(self):
+        st = os.stat(self.path)
+        key = np.array([st.st_size, st.st_mtime_ns, self.index_every], dtype=np.int64)
+        cache = self.path + ".idx.npz"
+        try:
+            with np.load(cache) as z:
+                if np.array_equal(z["key"], key):
+                    self.idx_off, self.idx_ts, self.rows = z["off"], z["ts"], int(z["rows"])
+                    return
+        except (OSError, KeyError, ValueError):
+            pass
+        self._build_index()
+        try:
+            np.savez(cache, key=key, off=self.idx_off, ts=self.idx_ts, rows=self.rows)
+        except OSError:
+            pass  # read-only location: index again next time
+
+    def _build_index(self):
+        # newline positions window by window; only every K-th line start is kept
+        K, size = self.index_every, len(self.mm)
+        starts, line = [np.array([self.data0])], 1  # line numbers of the next start found
+        for w in range(self.data0, size, self.scan_bytes):
+            nl = np.flatnonzero(self.mm[w:w + self.scan_bytes] == 10) + w + 1
+            keep = (line + np.arange(len(nl))) % K == 0
+            starts.append(nl[keep])
+            line += len(nl)
+        rows = line - 1  # newline-terminated data lines; a torn last line is ignored
+        offs = np.concatenate(starts)
+        offs = offs[offs < size]
+        self.rows = max(0, rows)
+        self.idx_off = offs[:(self.rows + K - 1) // K] if self.rows else offs[:0]
+        self.idx_ts = _fill_forward(np.array([self._first_ts(o) for o in self.idx_off], dtype=np.float64))
+
+    def _first_ts(self, off):
+        field = bytes(self.mm[off:off + 64]).split(b",", 1)[0]
+        try:
+            return self._parse_ts([field])[0]
+        except ValueError:
+            return np.nan  # malformed line at a block start
+
+    def _parse_ts(self, fields):
+        if self.iso:
+            text = np.array([f.decode().rstrip("Z") for f in fields], dtype="datetime64[us]")
+            return text.astype(np.int64) / 1e6
+        return np.array(fields, dtype=np.float64) / 1000.0  # epoch ms
+
+    # ---------- reads ----------
+    def ts_at(self, i):
+        ts, _ = self.read(i, i + 1)
+        return float(ts[0])
+
+    def locate(self, t):
+        b = max(0, int(np.searchsorted(self.idx_ts, t, side="right")) - 1)
+        ts, _ = self._rows(b * self.index_every, min(self.rows, (b + 1) * self.index_every))
+        return b * self.index_every + int(np.searchsorted(_fill_forward(ts), t, side="left"))
+
+    def read(self, i0, i1):
+        """(ts, block (n, channels)) for rows [i0, i1); malformed lines are left out."""
+        ts, block = self._rows(i0, i1)
+        ok = ~np.isnan(ts)
+        if ok.all():
+            return ts, block
+        self.bad_frames += int(len(ok) - ok.sum())
+        return ts[ok], block[ok]
+
+    def _rows(self, i0, i1):
+        # one entry per line in [i0, i1), NaN ts where the line is malformed
+        i0, i1 = max(0, i0), min(self.rows, i1)
+        if i1 <= i0:
+            return np.empty(0), np.empty((0, self.channels))
+        K = self.index_every
+        b0, b1 = i0 // K, (i1 - 1) // K + 1
+        a = int(self.idx_off[b0])
+        z = int(self.idx_off[b1]) if b1 < len(self.idx_off) else len(self.mm)
+        ts, block = self._parse(bytes(self.mm[a:z]))
+        return ts[i0 - b0 * K:i1 - b0 * K], block[i0 - b0 * K:i1 - b0 * K]
+
+    def _parse(self, buf):
+        lines = buf.replace(b"\r", b"").split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()  # text after the last newline is a torn line, not a row
+        C = self.channels
+        ts, block = np.full(len(lines), np.nan), np.full((len(lines), C), np.nan)
+        good = [i for i, ln in enumerate(lines) if ln.count(b",") == C]
+        if good:
+            fields = [lines[i].split(b",", 1) for i in good]
+            try:
+                ts[good] = self._parse_ts([f[0] for f in fields])
+                block[good] = np.array(b",".join(f[1] for f in fields).split(b","), dtype=np.float64).reshape(-1, C)
+            except ValueError:
+                # only when a batch holds a malformed number somewhere
+                ts[good] = np.nan
+                for i, (t, values) in zip(good, fields):
+                    try:
+                        row = np.array(values.split(b","), dtype=np.float64)
+                        ts[i], block[i] = self._parse_ts([t])[0], row
+                    except ValueError:
+                        pass
+        return ts, block
+
+    def close(self):
+        self.mm = None
+
+
+# ---------- HDF5 ----------
+class Hdf5Run(RunReader):
+    def __init__(self, path):
+        try:
+            import h5py
+        except ImportError:
+            raise RuntimeError("h5py is required to open HDF5 runs (pip install h5py)")
+        self.path = path
+        self.f = h5py.File(path, "r")
+        self.ds = self.f["data"]
+        self.rows = self.ds.shape[0]
+        self.channels = self.ds.shape[1] - 1
+        self.metadata = {k: (v.decode() if isinstance(v, bytes) else v) for k, v in self.f.attrs.items()}
+        self.bad_frames = 0
+
+    def ts_at(self, i):
+        return float(self.ds[i, 0])
+
+    def read(self, i0, i1):
+        i0, i1 = max(0, i0), min(self.rows, i1)
+        if i1 <= i0:
+            return np.empty(0), np.empty((0, self.channels))
+        rows = self.ds[i0:i1]
+        return rows[:, 0], rows[:, 1:]
+
+    def close(self):
+        self.f.close()
+
+
+# ---------- Binary frame capture ----------
+class BinaryRun(RunReader):
+    def __init__(self, path, rate=None, start=None):
+        self.path = path
+        raw = np.memmap(path, np.uint8, "r")
+        if len(raw) < HEADER_LEN or bytes(raw[:2]) != SYNC:
+            raise ValueError(f"{path}: not a capture of SensorLab binary frames")
+        self.channels = int(raw[4])
+        crc = bool(raw[5] & FLAG_CRC)
+        L = frame_length(self.channels, crc)
+        fields = [("sync", "u1", 2), ("seq", "<u2"), ("nch", "u1"), ("flags", "u1"), ("v", "<f4", (self.channels,))]
+        if crc:
+            fields.append(("crc", "<u2"))
+        self.rows = len(raw) // L
+        self.frames = np.memmap(path, np.dtype(fields), "r", shape=(self.rows,))
+        self._raw = raw[:self.rows * L].reshape(self.rows, L)
+        self._crc = crc
+        self.bad_frames = 0
+        self._rate = float(rate or 10.0)
+        self.start = start if start is not None else os.path.getmtime(path) - self.rows / self._rate
+        self.metadata = {"rate_hz": self._rate, "frame": "Binary", "crc": crc}
+
+    def ts_at(self, i):
+        return self.start + i / self._rate
+
+    def locate(self, t):
+        return int(min(self.rows, max(0, np.ceil((t - self.start) * self._rate - 1e-9))))
+
+    def read(self, i0, i1):
+        i0, i1 = max(0, i0), min(self.rows, i1)
+        if i1 <= i0:
+            return np.empty(0), np.empty((0, self.channels))
+        self._check(i0, i1)
+        return self.start + np.arange(i0, i1) / self._rate, self.frames["v"][i0:i1].astype(np.float64)
+
+    def _check(self, i0, i1):
+        # rows are positional: one stray byte would shift every later frame, so refuse instead
+        f = self._raw[i0:i1]
+        ok = (f[:, 0] == 0xA5) & (f[:, 1] == 0x5A) & (f[:, 4] == self.channels) \
+            & ((f[:, 5] & FLAG_CRC) == (FLAG_CRC if self._crc else 0))
+        if self._crc:
+            ok &= crc16_rows(f[:, 2:-2]) == (f[:, -2].astype(np.uint16) | (f[:, -1].astype(np.uint16) << 8))
+        if not ok.all():
+            i = i0 + int(np.argmin(ok))
+            self.bad_frames += 1
+            raise ValueError(f"{self.path}: damaged frame at row {i} (byte {i * self._raw.shape[1]}); "
+                             "the capture is not a clean sequence of frames")
+
+    def close(self):
+        self.frames = self._raw = None
+
+
+# ---------- Replay source ----------
+class ReplaySource:
+    """AcquisitionEngine stand-in that feeds a run's rows at `speed`x (None = as fast as possible)."""
+
+    batch_interval = 0.01
+    max_rows = 4096     # per batch when unpaced
+    drain_rows = 8192   # per drain(); the rest waits for the next poll
+
+    def __init__(self, run, speed=1.0, t0=None, t1=None, queue_size=64):
+        self.run = run
+        self.port = run.path
+        self.channels = run.channels
+        self.rate = run.rate
+        self.speed = speed or None
+        self.range = (t0, t1)
+        self.origin = None  # run time that maps to the start of playback; shared by replays started together
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.samples = 0
+        self.dropped_batches = 0
+        self.late_samples = 0
+        self.parse_time = Timer()
+        self.finished = False
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def bad_frames(self):
+        return self.run.bad_frames
+
+    @property
+    def backlog(self):
+        return self.queue.qsize()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self.finished = False
+        self._thread = threading.Thread(target=self._run, name=f"replay-{os.path.basename(self.port)}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def drain(self):
+        items, rows = [], 0
+        while rows < self.drain_rows:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            rows += len(items[-1][0])
+        if not items:
+            return None
+        if len(items) == 1:
+            return items[0]
+        return np.concatenate([t for t, _ in items]), np.concatenate([b for _, b in items])
+
+    def _push(self, ts, block):
+        # blocking: a replay waits for the pipeline instead of dropping
+        while not self._stop.is_set():
+            try:
+                self.queue.put((ts, block), timeout=0.1)
+                self.samples += len(ts)
+                return
+            except queue.Full:
+                continue
+
+    def _read(self, i0, i1):
+        t = time.perf_counter()
+        out = self.run.read(i0, i1)
+        self.parse_time.add(time.perf_counter() - t)
+        return out
+
+    def _run(self):
+        run = self.run
+        t0, t1 = self.range
+        i = run.locate(t0) if t0 is not None else 0
+        end = run.locate(np.nextafter(t1, np.inf)) if t1 is not None else run.rows
+        try:
+            if self.speed is None:
+                while i < end and not self._stop.is_set():
+                    j = min(end, i + self.max_rows)
+                    self._push(*self._read(i, j))
+                    i = j
+                return
+            origin = self.origin if self.origin is not None else run.ts_at(i) if i < end else 0.0
+            wall0 = time.perf_counter()
+            chunk = max(1, int(self.rate * self.speed * self.batch_interval * 4))
+            ts, block = np.empty(0), np.empty((0, self.channels))
+            while not self._stop.is_set():
+                if not len(ts):
+                    if i >= end:
+                        break
+                    j = min(end, i + chunk)
+                    ts, block = self._read(i, j)
+                    i = j
+                    continue
+                due = origin + (time.perf_counter() - wall0) * self.speed
+                k = int(np.searchsorted(ts, due, side="right"))
+                if k:
+                    self._push(ts[:k], block[:k])
+                    ts, block = ts[k:], block[k:]
+                if not len(ts) and i < end:
+                    continue
+                self._stop.wait(self.batch_interval)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
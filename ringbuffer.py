@@ -0,0 +1,100 @@
+"""
+Preallocated multi-channel ring buffer for the live plot.
+
+Every sample is written twice (at slot i and i + capacity), so the newest
+`len(buf)` points of each channel are always one contiguous slice of the
+backing array. Curves get zero-copy views instead of freshly built lists.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, channels, capacity, dtype=np.float64):
+        self.channels = int(channels)
+        self.capacity = max(1, int(capacity))
+        self.dtype = np.dtype(dtype)
+        self._alloc()
+
+    def _alloc(self):
+        # channel-major so each channel's window is a contiguous row slice
+        self.ts = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.data = np.zeros((self.channels, 2 * self.capacity), dtype=self.dtype)
+        self.head = 0  # next write slot, always in [0, capacity)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, t, values):
+        # single sample: values has one entry per channel
+        i = self.head
+        j = i + self.capacity
+        self.ts[i] = self.ts[j] = t
+        self.data[:, i] = values
+        self.data[:, j] = values
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def extend(self, ts, block):
+        # block of samples: ts shape (n,), block shape (n, channels)
+        ts = np.asarray(ts, dtype=np.float64)
+        block = np.asarray(block, dtype=self.dtype)
+        n = len(ts)
+        if n == 0:
+            return
+        cap = self.capacity
+        if n > cap:
+            ts, block, n = ts[-cap:], block[-cap:], cap
+        first = min(n, cap - self.head)
+        self._write(self.head, ts[:first], block[:first])
+        if first < n:
+            self._write(0, ts[first:], block[first:])
+        self.head = (self.head + n) % cap
+        self.count = min(self.count + n, cap)
+
+    def _write(self, i, ts, block):
+        n = len(ts)
+        j = i + self.capacity
+        self.ts[i:i + n] = ts
+        self.ts[j:j + n] = ts
+        self.data[:, i:i + n] = block.T
+        self.data[:, j:j + n] = block.T
+
+    def _window(self):
+        end = self.head + self.capacity
+        return end - self.count, end
+
+    def timestamps(self):
+        s, e = self._window()
+        return self.ts[s:e]
+
+    def channel(self, i):
+        s, e = self._window()
+        return self.data[i, s:e]
+
+    def view(self):
+        # (ts, data) with data shaped (channels, n); no copies are made
+        s, e = self._window()
+        return self.ts[s:e], self.data[:, s:e]
+
+    def latest(self):
+        if not self.count:
+            return None, None
+        k = self.head - 1 + self.capacity
+        return self.ts[k], self.data[:, k]
+
+    def resize(self, capacity):
+        capacity = max(1, int(capacity))
+        if capacity == self.capacity:
+            return
+        ts, data = self.view()
+        keep = min(len(ts), capacity)
+        ts, block = ts[len(ts) - keep:].copy(), data[:, data.shape[1] - keep:].T.copy()
+        self.capacity = capacity
+        self._alloc()
+        self.extend(ts, block)
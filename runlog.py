@@ -0,0 +1,312 @@
+"""
+Streaming run logger.
+
+Acquisition hands sample blocks to RunLogger.write(); a writer thread drains
+them, batches rows into chunks and appends them to a CSV file or to a
+resizable, chunked HDF5 dataset. Files rotate by size or age, so a long run
+never sits in memory and the GUI never waits on the disk.
+
+With a RunCatalog attached, every file's metadata, span and per-channel
+statistics are kept current in the catalog as it is written.
+
+Per-heater-cycle feature vectors handed to write_cycles() go to one
+<run>.cycles.csv beside the data files (start, samples, then one column
+per feature), written by the same thread.
+
+h5py is only imported when HDF5 output is requested.
+"""
+
+import os, io, time, queue, threading
+import datetime as dt
+from collections import deque
+import numpy as np
+
+from metrics import Timer
+from catalog import CYCLES_SUFFIX, ChannelStats
+
+FORMATS = {"CSV": ".csv", "HDF5": ".h5"}
+
+
+def format_timestamps(ts, ts_format="Epoch ms"):
+    # vectorized; ts are epoch seconds
+    ts = np.asarray(ts, dtype=np.float64)
+    if ts_format == "ISO 8601":
+        us = np.round(ts * 1e6).astype("datetime64[us]")
+        return np.datetime_as_string(us, unit="ms", timezone="UTC")
+    return np.char.mod("%.3f", ts * 1000.0)
+
+
+def run_basename(metadata, when=None):
+    when = when or time.time()
+    name = str(metadata.get("sample_id") or "run")
+    if metadata.get("device"):
+        name += "_" + str(metadata["device"])
+    stem = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    return f"{stem}_{dt.datetime.fromtimestamp(when).strftime('%Y%m%d-%H%M%S')}"
+
+
+# ---------- Sinks ----------
+class CsvSink:
+    def __init__(self, path, channels, metadata, ts_format="Epoch ms", mode="w"):
+        # mode "x" refuses to replace an existing file (FileExistsError)
+        self.path = path
+        self.channels = channels
+        self.ts_format = ts_format
+        self.f = open(path, mode, buffering=1 << 20, newline="")
+        self.f.write("# SensorLab run\n")
+        for k, v in metadata.items():
+            self.f.write(f"# {k}: {str(v).replace(chr(10), ' ')}\n")
+        self.f.write("ts," + ",".join(f"ch{i + 1}" for i in range(channels)) + "\n")
+
+    def write(self, ts, block):
+        # one formatted chunk, one write call
+        buf = io.StringIO()
+        np.savetxt(buf, block, fmt="%.6f", delimiter=",")
+        lines = buf.getvalue().splitlines()
+        stamps = format_timestamps(ts, self.ts_format)
+        self.f.write("\n".join(f"{t},{ln}" for t, ln in zip(stamps, lines)) + "\n")
+
+    def size(self):
+        return self.f.tell()
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class Hdf5Sink:
+    chunk_rows = 4096
+
+    def __init__(self, path, channels, metadata, ts_format="Epoch ms", mode="w"):
+        try:
+            import h5py
+        except ImportError:
+            raise RuntimeError("h5py is required for HDF5 logging (pip install h5py)")
+        self.path = path
+        self.channels = channels
+        self.f = h5py.File(path, mode)
+        self.ds = self.f.create_dataset("data", shape=(0, channels + 1), maxshape=(None, channels + 1),
+                                        chunks=(self.chunk_rows, channels + 1), dtype="f8")
+        self.ds.attrs["columns"] = ["ts"] + [f"ch{i + 1}" for i in range(channels)]
+        self.ds.attrs["ts_unit"] = "epoch s"
+        for k, v in metadata.items():
+            self.f.attrs[k] = v if isinstance(v, (int, float)) else str(v)
+        self.rows = 0
+
+    def write(self, ts, block):
+        n = len(ts)
+        self.ds.resize(self.rows + n, axis=0)
+        self.ds[self.rows:self.rows + n, 0] = ts
+        self.ds[self.rows:self.rows + n, 1:] = block
+        self.rows += n
+
+    def size(self):
+        return self.rows * (self.channels + 1) * 8
+
+    def flush(self):
+        # without this nothing reaches a readable state on disk until close
+        self.f.flush()
+
+    def close(self):
+        self.f.flush()
+        self.f.close()
+
+
+def open_sink(path, fmt, channels, metadata, ts_format="Epoch ms", mode="w"):
+    if fmt == "HDF5":
+        return Hdf5Sink(path, channels, metadata, ts_format, mode)
+    return CsvSink(path, channels, metadata, ts_format, mode)
+
+
+def write_run(path, fmt, ts, block, metadata, ts_format="Epoch ms"):
+    # synchronous one-shot export of an in-memory block
+    sink = open_sink(path, fmt, block.shape[1], metadata, ts_format)
+    try:
+        if len(ts):
+            sink.write(ts, block)
+    finally:
+        sink.close()
+
+
+# ---------- Logger ----------
+class RunLogger:
+    def __init__(self, directory, fmt="CSV", channels=8, metadata=None, ts_format="Epoch ms",
+                 rotate_mb=0, rotate_minutes=0, chunk_rows=2048, flush_interval=0.5, queue_size=4096,
+                 catalog=None, catalog_interval=5.0):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported log format: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        self.channels = int(channels)
+        self.metadata = dict(metadata or {})
+        self.ts_format = ts_format
+        self.rotate_bytes = int(rotate_mb * 1e6)
+        self.rotate_seconds = rotate_minutes * 60
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.basename = run_basename(self.metadata)
+        self.files = []
+        self.rows = 0
+        self.bytes = 0
+        self.dropped_batches = 0
+        self.write_time = Timer()  # per chunk written by the writer thread
+        self.catalog = catalog
+        self.catalog_interval = catalog_interval
+        self.catalog_error = None  # cataloging is best effort; the data files come first
+        self.cycles = 0  # feature vectors written to cycles_path
+        self.cycles_path = None
+        self.error = None
+        self._sink = None
+        self._cycle_file = None
+        self._cycle_queue = deque()  # (columns, cycle) waiting for the writer
+        self._opened = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def path(self):
+        return self.files[-1] if self.files else None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._open_next()  # fail in the caller if the first file can't be created
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="run-logger", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, ts, block):
+        # never blocks the caller; a full queue means the disk is far behind
+        try:
+            self.queue.put_nowait((ts, block))
+        except queue.Full:
+            self.dropped_batches += 1
+
+    def write_cycles(self, cycles, columns):
+        # FeatureEngine.drain_cycles() output; columns are its feature_names()
+        self._cycle_queue.extend((columns, c) for c in cycles)
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.queue.put_nowait(None)  # wake the writer instead of waiting out its poll
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _open_next(self):
+        part = len(self.files) + 1
+        suffix = f"_part{part:03d}" if part > 1 else ""
+        meta = dict(self.metadata, part=part, channels=self.channels,
+                    started=dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"))
+        base, n = self.basename, 1
+        while True:
+            # names only resolve to the second; a run restarted within it gets a counter, never an overwrite
+            path = os.path.join(self.directory, self.basename + suffix + FORMATS[self.fmt])
+            try:
+                self._sink = open_sink(path, self.fmt, self.channels, meta, self.ts_format, mode="x")
+                break
+            except FileExistsError:
+                if part > 1:
+                    raise
+                n += 1
+                self.basename = f"{base}_{n}"
+        self._opened = self._cataloged = time.monotonic()
+        self._file_meta, self._file_stats = meta, ChannelStats(self.channels)
+        self.files.append(path)
+        self._catalog("open")
+
+    def _catalog(self, status):
+        if self.catalog is None or self.catalog_error is not None:
+            return
+        try:
+            size = self._sink.size() if status == "open" else os.path.getsize(self.path)
+            self.catalog.record(self.path, self._file_meta, self._file_stats, self._file_stats.n, size, status)
+        except Exception as e:
+            self.catalog_error = e
+        self._cataloged = time.monotonic()
+
+    def _rotate_due(self):
+        if self.rotate_bytes and self._sink.size() >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.monotonic() - self._opened >= self.rotate_seconds
+
+    def _run(self):
+        pending, rows = [], 0
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=0.05 if self._stop.is_set() else self.flush_interval)
+                    if item is not None:
+                        pending.append(item)
+                        rows += len(item[0])
+                except queue.Empty:
+                    item = None
+                stopping = self._stop.is_set() and item is None
+                due = time.monotonic() - last_flush >= self.flush_interval
+                if pending and (rows >= self.chunk_rows or due or stopping):
+                    self._flush(pending)
+                    pending, rows = [], 0
+                    last_flush = time.monotonic()
+                if self._cycle_queue:
+                    self._write_cycles()
+                if stopping:
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            if self._sink is not None:
+                try:
+                    self._sink.close()
+                    self._catalog("complete")
+                except Exception:
+                    pass
+            if self._cycle_file is not None:
+                self._cycle_file.close()
+                self._cycle_file = None
+
+    def _flush(self, pending):
+        ts = np.concatenate([t for t, _ in pending])
+        block = np.concatenate([b for _, b in pending])
+        if self._sink is None:
+            self._open_next()
+        before = self._sink.size()
+        t0 = time.perf_counter()
+        self._sink.write(ts, block)
+        self.write_time.add(time.perf_counter() - t0)
+        self.rows += len(ts)
+        self.bytes += self._sink.size() - before
+        self._file_stats.add(ts, block)
+        self._sink.flush()  # bounds what a crash can lose to one chunk
+        if self._rotate_due():
+            # the next part is opened lazily so a stop right after rotating leaves no empty file
+            self._sink.close()
+            self._sink = None
+            self._catalog("complete")
+        elif time.monotonic() - self._cataloged >= self.catalog_interval:
+            self._catalog("open")
+
+    def _write_cycles(self):
+        items = []
+        while self._cycle_queue:
+            items.append(self._cycle_queue.popleft())
+        if self._cycle_file is None:
+            # one file for the whole run, rotated parts included; opened on the first finished cycle
+            self.cycles_path = os.path.join(self.directory, self.basename + CYCLES_SUFFIX)
+            self._cycle_file = open(self.cycles_path, "x", newline="")
+            self._cycle_file.write("start,samples," + ",".join(items[0][0]) + "\n")
+        starts = format_timestamps([c["start"] for _, c in items], self.ts_format)
+        self._cycle_file.write("".join(f"{t},{c['samples']}," + ",".join(f"{v:.6g}" for v in c["vector"]) + "\n"
+                                       for t, (_, c) in zip(starts, items)))
+        self._cycle_file.flush()
+        self.cycles += len(items)
@@ -1,16 +1,20 @@
 #!/usr/bin/env python3
 """
 SensorLab UI v1.1 - Adds a persistent Settings dialog (General / Device / Logging / Heater / Advanced)
-Requirements: PyQt6, pyqtgraph
-Run: pip install PyQt6 pyqtgraph
+Requirements: PyQt6, pyqtgraph, numpy
+Run: pip install PyQt6 pyqtgraph numpy
       python sensorlab_ui_with_settings.py
 """
 
-import sys, os, math
+import sys, os, time, threading
 from PyQt6 import QtWidgets, QtCore, QtGui
-import pyqtgraph as pg
+
+# pipeline modules (numpy, sqlite3, multiprocessing...) are imported where they are first used,
+# so only Qt loads before the start page is up
 
 APP_NAME = "SensorLab"
+RENDER_FPS = 30
+REPLAY_SPEEDS = {"1×": 1.0, "10×": 10.0, "100×": 100.0, "Max": None}
 
 # ---------- Stylesheets (dark and light) ----------
 DARK_STYLE = """
@@ -55,24 +59,8 @@ class SplashScreen(QtWidgets.QWidget):
         label.setStyleSheet("font-size:42px; font-weight:900; color:white;")
         sub = QtWidgets.QLabel("Multi-channel Material Sensor Interface")
         sub.setStyleSheet("color:gray; font-size:14px;")
-        self.progress = QtWidgets.QProgressBar()
-        self.progress.setRange(0,100); self.progress.setValue(0)
-        self.progress.setTextVisible(False)
-        self.progress.setFixedWidth(300)
         layout.addWidget(label)
         layout.addWidget(sub)
-        layout.addSpacing(40)
-        layout.addWidget(self.progress)
-        self.timer = QtCore.QTimer(); self.timer.timeout.connect(self.step)
-        self.timer.start(30)
-        self.value = 0
-
-    def step(self):
-        self.value += 2
-        self.progress.setValue(self.value)
-        if self.value >= 100:
-            self.timer.stop()
-            self.close()
 
 # ---------- Settings Dialog ----------
 class SettingsDialog(QtWidgets.QDialog):
@@ -86,6 +74,7 @@ class SettingsDialog(QtWidgets.QDialog):
         self.load_settings()
 
     def init_ui(self):
+        from export import EXPORT_FORMATS
         layout = QtWidgets.QVBoxLayout(self)
         tabs = QtWidgets.QTabWidget()
         layout.addWidget(tabs)
@@ -111,7 +100,7 @@ class SettingsDialog(QtWidgets.QDialog):
         # Sampling tab
         s = QtWidgets.QWidget(); sl = QtWidgets.QFormLayout(s)
         self.default_rate = QtWidgets.QSpinBox(); self.default_rate.setRange(1,200); self.default_rate.setValue(10)
-        self.buffer_spin = QtWidgets.QSpinBox(); self.buffer_spin.setRange(50,5000); self.buffer_spin.setValue(300)
+        self.buffer_spin = QtWidgets.QSpinBox(); self.buffer_spin.setRange(50,1000000); self.buffer_spin.setValue(300)
         self.ts_format = QtWidgets.QComboBox(); self.ts_format.addItems(["Epoch ms","ISO 8601"])
         sl.addRow("Default sampling rate (Hz)", self.default_rate)
         sl.addRow("Plot buffer size (points)", self.buffer_spin)
@@ -123,9 +112,15 @@ class SettingsDialog(QtWidgets.QDialog):
         self.heater_profile = QtWidgets.QComboBox(); self.heater_profile.addItems(["Samio","Linear","Custom"])
         self.heater_max = QtWidgets.QDoubleSpinBox(); self.heater_max.setRange(0.1,20.0); self.heater_max.setValue(5.0)
         self.preheat_spin = QtWidgets.QSpinBox(); self.preheat_spin.setRange(0,600); self.preheat_spin.setValue(30)
+        self.period_spin = QtWidgets.QDoubleSpinBox(); self.period_spin.setRange(0.1,3600.0); self.period_spin.setValue(20.0)
+        self.custom_path = QtWidgets.QLineEdit(); btn_custom = QtWidgets.QPushButton("Browse")
+        btn_custom.clicked.connect(self.browse_custom)
         hl.addRow("Profile", self.heater_profile)
         hl.addRow("Max heater voltage (V)", self.heater_max)
         hl.addRow("Preheat duration (s)", self.preheat_spin)
+        hl.addRow("Cycle period (s)", self.period_spin)
+        row = QtWidgets.QHBoxLayout(); row.addWidget(self.custom_path); row.addWidget(btn_custom)
+        hl.addRow("Custom profile file", row)
         tabs.addTab(h, "Heater")
 
         # Logging tab
@@ -134,20 +129,48 @@ class SettingsDialog(QtWidgets.QDialog):
         self.default_path = QtWidgets.QLineEdit(); btn_browse = QtWidgets.QPushButton("Browse")
         btn_browse.clicked.connect(self.browse_path)
         self.auto_log = QtWidgets.QCheckBox("Auto-log on connect")
+        self.rotate_mb = QtWidgets.QSpinBox(); self.rotate_mb.setRange(0,100000); self.rotate_mb.setSpecialValueText("Off")
+        self.rotate_min = QtWidgets.QSpinBox(); self.rotate_min.setRange(0,10080); self.rotate_min.setSpecialValueText("Off")
         lgl.addRow("Default save format", self.save_format)
         row = QtWidgets.QHBoxLayout(); row.addWidget(self.default_path); row.addWidget(btn_browse)
         lgl.addRow("Default save directory", row)
         lgl.addRow(self.auto_log)
+        self.catalog_chk = QtWidgets.QCheckBox("Record runs in the run catalog")
+        lgl.addRow(self.catalog_chk)
+        lgl.addRow("Rotate file after (MB)", self.rotate_mb)
+        lgl.addRow("Rotate file after (min)", self.rotate_min)
+        self.export_format = QtWidgets.QComboBox(); self.export_format.addItems(list(EXPORT_FORMATS))
+        lgl.addRow("Dataset export format", self.export_format)
         tabs.addTab(lg, "Logging")
 
         # Advanced
         a = QtWidgets.QWidget(); al = QtWidgets.QFormLayout(a)
         self.crc_chk = QtWidgets.QCheckBox("Enable CRC for binary frames")
         self.timeout_spin = QtWidgets.QSpinBox(); self.timeout_spin.setRange(1,5000); self.timeout_spin.setValue(1000)
+        self.workers_combo = QtWidgets.QComboBox(); self.workers_combo.addItems(["Threads","Processes"])
         al.addRow(self.crc_chk)
         al.addRow("Serial timeout (ms)", self.timeout_spin)
+        al.addRow("Device readers", self.workers_combo)
+        self.metrics_chk = QtWidgets.QCheckBox("Write metrics log (save directory)")
+        self.metrics_interval = QtWidgets.QSpinBox(); self.metrics_interval.setRange(1,3600); self.metrics_interval.setValue(5)
+        al.addRow(self.metrics_chk)
+        al.addRow("Metrics interval (s)", self.metrics_interval)
         tabs.addTab(a, "Advanced")
 
+        # Inference
+        m = QtWidgets.QWidget(); ml = QtWidgets.QFormLayout(m)
+        self.inf_window = QtWidgets.QSpinBox(); self.inf_window.setRange(1,100000); self.inf_window.setValue(100)
+        self.inf_hop = QtWidgets.QSpinBox(); self.inf_hop.setRange(1,100000); self.inf_hop.setValue(20)
+        self.inf_latency = QtWidgets.QSpinBox(); self.inf_latency.setRange(1,10000); self.inf_latency.setValue(100)
+        self.inf_workers = QtWidgets.QComboBox(); self.inf_workers.addItems(["Thread","Process"])
+        self.inf_input = QtWidgets.QComboBox(); self.inf_input.addItems(["Raw","ΔR/R₀"])
+        ml.addRow("Window (samples)", self.inf_window)
+        ml.addRow("Hop (samples)", self.inf_hop)
+        ml.addRow("Latency budget (ms)", self.inf_latency)
+        ml.addRow("Run model in", self.inf_workers)
+        ml.addRow("Model input", self.inf_input)
+        tabs.addTab(m, "Inference")
+
         # Buttons
         btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Save | QtWidgets.QDialogButtonBox.StandardButton.Cancel)
         btns.accepted.connect(self.save_settings)
@@ -159,6 +182,12 @@ class SettingsDialog(QtWidgets.QDialog):
         if d:
             self.default_path.setText(d)
 
+    def browse_custom(self):
+        f, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Select custom heater profile", os.path.expanduser("~"),
+                                                     "Profiles (*.csv *.txt);;All files (*)")
+        if f:
+            self.custom_path.setText(f)
+
     def load_settings(self):
         # General
         theme = self._qs.value("ui/theme", "Dark")
@@ -176,13 +205,28 @@ class SettingsDialog(QtWidgets.QDialog):
         self.heater_profile.setCurrentText(self._qs.value("heater/profile", "Linear"))
         self.heater_max.setValue(float(self._qs.value("heater/max", 5.0)))
         self.preheat_spin.setValue(int(self._qs.value("heater/preheat", 30)))
+        self.period_spin.setValue(float(self._qs.value("heater/period", 20.0)))
+        self.custom_path.setText(self._qs.value("heater/custom", ""))
         # Logging
         self.save_format.setCurrentText(self._qs.value("log/format", "CSV"))
         self.default_path.setText(self._qs.value("log/path", os.path.expanduser("~")))
         self.auto_log.setChecked(self._qs.value("log/auto", "false") == "true")
+        self.catalog_chk.setChecked(self._qs.value("log/catalog", "true") == "true")
+        self.rotate_mb.setValue(int(self._qs.value("log/rotate_mb", 0)))
+        self.rotate_min.setValue(int(self._qs.value("log/rotate_min", 0)))
+        self.export_format.setCurrentText(self._qs.value("export/format", "NPZ"))
         # Advanced
         self.crc_chk.setChecked(self._qs.value("adv/crc", "false") == "true")
         self.timeout_spin.setValue(int(self._qs.value("adv/timeout", 1000)))
+        self.workers_combo.setCurrentText(self._qs.value("adv/workers", "Threads"))
+        self.metrics_chk.setChecked(self._qs.value("adv/metrics", "false") == "true")
+        self.metrics_interval.setValue(int(self._qs.value("adv/metrics_interval", 5)))
+        # Inference
+        self.inf_window.setValue(int(self._qs.value("inf/window", 100)))
+        self.inf_hop.setValue(int(self._qs.value("inf/hop", 20)))
+        self.inf_latency.setValue(int(self._qs.value("inf/latency_ms", 100)))
+        self.inf_workers.setCurrentText(self._qs.value("inf/workers", "Thread"))
+        self.inf_input.setCurrentText(self._qs.value("inf/input", "Raw"))
 
     def save_settings(self):
         # store values
@@ -197,13 +241,137 @@ class SettingsDialog(QtWidgets.QDialog):
         self._qs.setValue("heater/profile", self.heater_profile.currentText())
         self._qs.setValue("heater/max", float(self.heater_max.value()))
         self._qs.setValue("heater/preheat", int(self.preheat_spin.value()))
+        self._qs.setValue("heater/period", float(self.period_spin.value()))
+        self._qs.setValue("heater/custom", self.custom_path.text())
         self._qs.setValue("log/format", self.save_format.currentText())
         self._qs.setValue("log/path", self.default_path.text())
         self._qs.setValue("log/auto", "true" if self.auto_log.isChecked() else "false")
+        self._qs.setValue("log/catalog", "true" if self.catalog_chk.isChecked() else "false")
+        self._qs.setValue("log/rotate_mb", int(self.rotate_mb.value()))
+        self._qs.setValue("log/rotate_min", int(self.rotate_min.value()))
+        self._qs.setValue("export/format", self.export_format.currentText())
         self._qs.setValue("adv/crc", "true" if self.crc_chk.isChecked() else "false")
         self._qs.setValue("adv/timeout", int(self.timeout_spin.value()))
+        self._qs.setValue("adv/workers", self.workers_combo.currentText())
+        self._qs.setValue("adv/metrics", "true" if self.metrics_chk.isChecked() else "false")
+        self._qs.setValue("adv/metrics_interval", int(self.metrics_interval.value()))
+        self._qs.setValue("inf/window", int(self.inf_window.value()))
+        self._qs.setValue("inf/hop", int(self.inf_hop.value()))
+        self._qs.setValue("inf/latency_ms", int(self.inf_latency.value()))
+        self._qs.setValue("inf/workers", self.inf_workers.currentText())
+        self._qs.setValue("inf/input", self.inf_input.currentText())
         self.accept()
 
+# ---------- Run browser ----------
+class RunBrowser(QtWidgets.QDialog):
+    """Searchable list of cataloged runs; every keystroke is one indexed query, no data file is opened."""
+
+    COLUMNS = ["Started", "Sample ID", "Operator", "Profile", "Device", "Rate (Hz)", "Ch", "Duration", "Rows", "Status", "File"]
+    scanned = QtCore.pyqtSignal(int, int)
+    replay_requested = QtCore.pyqtSignal(list)
+
+    def __init__(self, catalog, directory, busy=(), parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run Browser")
+        self.resize(1000, 560)
+        self.catalog, self.directory, self.busy = catalog, directory, busy
+        self.rows = []
+        v = QtWidgets.QVBoxLayout(self)
+        bar = QtWidgets.QHBoxLayout()
+        self.search = QtWidgets.QLineEdit(); self.search.setPlaceholderText("Search sample, operator, notes, device, file…")
+        self.profile = QtWidgets.QComboBox(); self.operator = QtWidgets.QComboBox()
+        bar.addWidget(self.search, 1)
+        bar.addWidget(QtWidgets.QLabel("Profile")); bar.addWidget(self.profile)
+        bar.addWidget(QtWidgets.QLabel("Operator")); bar.addWidget(self.operator)
+        v.addLayout(bar)
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS)); self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True); self.table.verticalHeader().setVisible(False)
+        v.addWidget(self.table, 3)
+        self.details = QtWidgets.QTableWidget(0, 6); self.details.setHorizontalHeaderLabels(["Channel", "n", "Mean", "Std", "Min", "Max"])
+        self.details.verticalHeader().setVisible(False); self.details.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.notes = QtWidgets.QLabel(""); self.notes.setWordWrap(True)
+        v.addWidget(self.notes); v.addWidget(self.details, 2)
+        row = QtWidgets.QHBoxLayout()
+        self.count = QtWidgets.QLabel(""); self.count.setStyleSheet("color:gray;")
+        self.btn_scan = QtWidgets.QPushButton("Rescan Folder"); btn_replay = QtWidgets.QPushButton("Replay Selected")
+        btn_close = QtWidgets.QPushButton("Close")
+        row.addWidget(self.count, 1); row.addWidget(self.btn_scan); row.addWidget(btn_replay); row.addWidget(btn_close)
+        v.addLayout(row)
+
+        self.search.textChanged.connect(self.refresh)
+        self.profile.currentTextChanged.connect(self.refresh)
+        self.operator.currentTextChanged.connect(self.refresh)
+        self.table.itemSelectionChanged.connect(self.show_details)
+        self.btn_scan.clicked.connect(self.rescan)
+        btn_replay.clicked.connect(self.replay_selected)
+        btn_close.clicked.connect(self.close)
+        self.scanned.connect(self.on_scanned)
+        self.fill_filters()
+        self.refresh()
+
+    def fill_filters(self):
+        for box, field in ((self.profile, "heater_profile"), (self.operator, "operator")):
+            current = box.currentText()
+            box.blockSignals(True)
+            box.clear(); box.addItem("Any"); box.addItems([str(x) for x in self.catalog.distinct(field)])
+            box.setCurrentText(current or "Any")
+            box.blockSignals(False)
+
+    def refresh(self, *_):
+        filters = {f: box.currentText() for f, box in (("heater_profile", self.profile), ("operator", self.operator))
+                   if box.currentText() not in ("", "Any")}
+        t0 = time.perf_counter()
+        self.rows = self.catalog.search(self.search.text().strip(), **filters)
+        ms = (time.perf_counter() - t0) * 1000
+        self.table.setRowCount(len(self.rows))
+        for i, r in enumerate(self.rows):
+            start, end = r["start_ts"], r["end_ts"]
+            cells = [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start)) if start else "",
+                     r["sample_id"], r["operator"], r["heater_profile"], r["device"],
+                     f"{r['rate_hz']:g}" if isinstance(r["rate_hz"], (int, float)) else str(r["rate_hz"] or ""), r["channels"],
+                     f"{end - start:.1f} s" if start and end else "", r["rows"], r["status"], os.path.basename(r["path"])]
+            for j, cell in enumerate(cells):
+                self.table.setItem(i, j, QtWidgets.QTableWidgetItem("" if cell is None else str(cell)))
+        self.count.setText(f"{len(self.rows)} of {len(self.catalog)} runs · {ms:.1f} ms")
+
+    def selected(self):
+        return [self.rows[i] for i in sorted({ix.row() for ix in self.table.selectedIndexes()}) if i < len(self.rows)]
+
+    def show_details(self):
+        sel = self.selected()
+        stats = self.catalog.channel_stats(sel[0]["id"]) if sel else []
+        self.notes.setText(f"Notes: {sel[0]['notes']}" if sel and sel[0]["notes"] else "")
+        self.details.setRowCount(len(stats))
+        for i, st in enumerate(stats):
+            cells = [f"CH{st['channel'] + 1}", st["n"]] + [f"{st[k]:.6g}" for k in ("mean", "std", "min", "max")]
+            for j, cell in enumerate(cells):
+                self.details.setItem(i, j, QtWidgets.QTableWidgetItem(str(cell)))
+
+    def rescan(self):
+        # reads every new or changed file once; off the GUI thread
+        self.btn_scan.setEnabled(False)
+        self.count.setText("Scanning…")
+
+        def work():
+            indexed, failed = self.catalog.scan(self.directory, self.busy)
+            self.catalog.prune()
+            self.scanned.emit(len(indexed), len(failed))
+        threading.Thread(target=work, name="catalog-scan", daemon=True).start()
+
+    def on_scanned(self, indexed, failed):
+        self.btn_scan.setEnabled(True)
+        self.fill_filters()
+        self.refresh()
+        if indexed or failed:
+            self.count.setText(self.count.text() + f" · {indexed} added" + (f", {failed} unreadable" if failed else ""))
+
+    def replay_selected(self):
+        paths = [r["path"] for r in self.selected() if os.path.exists(r["path"])]
+        if paths:
+            self.replay_requested.emit(paths)
+
 # ---------- Start Page ----------
 class StartPage(QtWidgets.QWidget):
     start_requested = QtCore.pyqtSignal()
@@ -228,13 +396,29 @@ class StartPage(QtWidgets.QWidget):
 
 # ---------- Main Dashboard ----------
 class MainDashboard(QtWidgets.QWidget):
+    message = QtCore.pyqtSignal(str)
+    acquisition_changed = QtCore.pyqtSignal(bool)
+    stats = QtCore.pyqtSignal(dict)  # one metrics snapshot per second while acquiring
+
     def __init__(self):
+        from devices import DeviceManager
+        from metrics import Timer
         super().__init__()
         self._qs = app_settings()
+        self.devices = DeviceManager()
+        self.views = []
+        self.derived_views = []
+        self.logging = False
+        self._started, self._run_for = 0.0, None
+        self.render_time = Timer()
+        self.sampler, self.metrics_log, self._stats_ticks = None, None, 0
+        self.catalog = None  # RunCatalog of the current log directory, opened on first use
         self.init_ui()
         self.load_settings()
 
     def init_ui(self):
+        from acquisition import list_ports, SIMULATED_PORT
+        from heater import PROFILES
         layout = QtWidgets.QHBoxLayout(self)
 
         # Left Control Panel
@@ -246,35 +430,40 @@ class MainDashboard(QtWidgets.QWidget):
         self.btn_connect = QtWidgets.QPushButton("Connect Device")
         l.addWidget(self.btn_connect)
         l.addWidget(QtWidgets.QLabel("Port"))
-        self.port = QtWidgets.QComboBox(); self.port.addItem("Auto detect")
+        self.port = QtWidgets.QComboBox(); self.port.addItem("Auto detect"); self.port.addItem(SIMULATED_PORT)
+        self.port.addItems(list_ports())
         l.addWidget(self.port)
+        # devices opened together on connect; empty means just the selected port
+        self.device_list = QtWidgets.QListWidget(); self.device_list.setMaximumHeight(90)
+        btn_add = QtWidgets.QPushButton("Add"); btn_remove = QtWidgets.QPushButton("Remove")
+        row = QtWidgets.QHBoxLayout(); row.addWidget(btn_add); row.addWidget(btn_remove)
+        l.addLayout(row)
+        l.addWidget(self.device_list)
         l.addWidget(QtWidgets.QLabel("Sampling Rate"))
         self.rate = QtWidgets.QSpinBox(); self.rate.setRange(1,200); self.rate.setValue(10)
         l.addWidget(self.rate)
         l.addWidget(QtWidgets.QLabel("Duration"))
         self.duration = QtWidgets.QComboBox(); self.duration.addItems(["∞","30s","1m","5m","10m"])
         l.addWidget(self.duration)
+        l.addWidget(QtWidgets.QLabel("Replay Speed"))
+        self.speed = QtWidgets.QComboBox(); self.speed.addItems(list(REPLAY_SPEEDS))
+        l.addWidget(self.speed)
         l.addWidget(QtWidgets.QLabel("Microheater"))
-        self.heat = QtWidgets.QComboBox(); self.heat.addItems(["Samio","Linear","Custom"])
+        self.heat = QtWidgets.QComboBox(); self.heat.addItems(PROFILES)
         l.addWidget(self.heat)
+        self.heater_status = QtWidgets.QLabel(""); self.heater_status.setStyleSheet("color:gray;")
+        l.addWidget(self.heater_status)
+        self.show_derived = QtWidgets.QCheckBox("Show ΔR/R₀")
+        l.addWidget(self.show_derived)
         l.addStretch(1)
+        self.whole_btn = QtWidgets.QPushButton("View Whole Run")
+        l.addWidget(self.whole_btn)
         self.save_btn = QtWidgets.QPushButton("Save Data")
         l.addWidget(self.save_btn)
 
-        # Center plot
+        # Center plots: one channel group per device, time axes linked
         center = QtWidgets.QFrame()
-        c = QtWidgets.QVBoxLayout(center)
-        self.plot = pg.PlotWidget(title="Live Sensor Data")
-        self.plot.showGrid(x=True,y=True)
-        self.plot.addLegend()
-        c.addWidget(self.plot)
-
-        # Create curves placeholder
-        self.curves = []
-        colors = ['#1f77b4','#ff7f0e','#2ca02c','#d62728','#9467bd','#8c564b','#e377c2','#7f7f7f']
-        for i in range(8):
-            curve = self.plot.plot([], [], pen=pg.mkPen(colors[i], width=2), name=f"CH{i+1}")
-            self.curves.append(curve)
+        self.plots_layout = QtWidgets.QVBoxLayout(center)
 
         # Right metadata panel
         right = QtWidgets.QFrame(); right.setObjectName("meta_panel"); right.setFixedWidth(260)
@@ -284,21 +473,42 @@ class MainDashboard(QtWidgets.QWidget):
         r.addWidget(QtWidgets.QLabel("Sample ID")); r.addWidget(self.sample_id)
         r.addWidget(QtWidgets.QLabel("Operator")); r.addWidget(self.operator)
         r.addWidget(QtWidgets.QLabel("Notes")); r.addWidget(self.notes)
-        self.log = QtWidgets.QCheckBox("Logging ON"); self.log.setChecked(True)
-        r.addWidget(self.log); r.addStretch(1)
+        self.log = QtWidgets.QCheckBox("Logging ON")
+        r.addWidget(self.log)
+        r.addWidget(QtWidgets.QLabel("Model", objectName="title"))
+        self.model_btn = QtWidgets.QPushButton("Load Model…")
+        self.model_name = QtWidgets.QLabel("No model"); self.model_name.setWordWrap(True)
+        self.prediction = QtWidgets.QLabel("—"); self.prediction.setStyleSheet("font-size:16px; font-weight:700;")
+        self.inf_stats = QtWidgets.QLabel(""); self.inf_stats.setStyleSheet("color:gray;")
+        r.addWidget(self.model_btn); r.addWidget(self.model_name)
+        r.addWidget(self.prediction); r.addWidget(self.inf_stats)
+        r.addStretch(1)
 
         layout.addWidget(left)
         layout.addWidget(center, 1)
         layout.addWidget(right)
 
-        # plotting timer
-        self.t = 0.0
+        # one acquisition timer drains every device; one render timer repaints them all at a fixed frame rate
         self.timer = QtCore.QTimer(); self.timer.timeout.connect(self.update_plot)
-        self.timer.start(int(1000 / max(1, int(self.rate.value()))))
+        self.timer.setInterval(20)
+        self.render_timer = QtCore.QTimer(); self.render_timer.timeout.connect(self.render)
+        self.render_timer.setInterval(int(1000 / RENDER_FPS))
+        self.stats_timer = QtCore.QTimer(); self.stats_timer.timeout.connect(self.sample_stats)
+        self.stats_timer.setInterval(1000)
 
         # wire some controls
+        self.btn_connect.clicked.connect(self.toggle_connection)
+        btn_add.clicked.connect(self.add_device)
+        btn_remove.clicked.connect(lambda: self.device_list.takeItem(self.device_list.currentRow()))
         self.rate.valueChanged.connect(self.on_rate_change)
-        self.save_btn.clicked.connect(self.fake_save)
+        self.duration.currentTextChanged.connect(lambda v: self._qs.setValue("acq/duration", v))
+        self.speed.currentTextChanged.connect(lambda v: self._qs.setValue("replay/speed", v))
+        self.heat.currentTextChanged.connect(lambda v: self._qs.setValue("heater/profile", v))
+        self.log.toggled.connect(self.on_log_toggled)
+        self.show_derived.toggled.connect(self.on_derived_toggled)
+        self.whole_btn.clicked.connect(self.view_whole_run)
+        self.save_btn.clicked.connect(self.save_snapshot)
+        self.model_btn.clicked.connect(self.choose_model)
 
     def load_settings(self):
         # apply persisted defaults where sensible
@@ -306,55 +516,382 @@ class MainDashboard(QtWidgets.QWidget):
             rate = int(self._qs.value("acq/rate", 10))
             self.rate.setValue(rate)
             buf = int(self._qs.value("acq/buffer", 300))
-            # NOTE: buffer used when implementing real plotting logic
-            channels = int(self._qs.value("device/channels", 4))
-            # shrink visible curves if channels==4
-            for i, c in enumerate(self.curves):
-                c.setVisible(i < channels)
+            for p in self.devices:
+                if p.history is not None: p.history.recent.resize(buf)
+            self.show_derived.setChecked(self._qs.value("ui/derived", "false") == "true")
+            model = self._qs.value("inf/model", "")
+            self.model_name.setText(os.path.basename(model) if model else "No model")
+            if not self.devices.running:
+                self.build_views()
             # heater profile
             profile = self._qs.value("heater/profile", "Linear")
             idx = self.heat.findText(profile)
             if idx >= 0: self.heat.setCurrentIndex(idx)
+            idx = self.duration.findText(self._qs.value("acq/duration", "∞"))
+            if idx >= 0: self.duration.setCurrentIndex(idx)
+            idx = self.speed.findText(self._qs.value("replay/speed", "1×"))
+            if idx >= 0: self.speed.setCurrentIndex(idx)
+            if not self.devices.running:
+                self.log.setChecked(self._qs.value("log/auto", "false") == "true")
         except Exception:
             pass
 
+    def build_views(self):
+        from plots import DevicePlot  # pyqtgraph loads with the first dashboard, not at startup
+        # one plot per device (plus its ΔR/R₀ plot when shown); a single placeholder while nothing is connected
+        for v in self.views + self.derived_views:
+            self.plots_layout.removeWidget(v); v.deleteLater()
+        self.views, self.derived_views = [], []
+        groups = [(f"{p.name} — {p.port}", p.channels) for p in self.devices]
+        if not groups:
+            groups = [("Live Sensor Data", int(self._qs.value("device/channels", 4)))]
+        derived = self.show_derived.isChecked()
+        for title, channels in groups:
+            pair = [DevicePlot(title, channels)] + ([DevicePlot(f"{title} — ΔR/R₀", channels)] if derived else [])
+            for view in pair:
+                if self.views:
+                    view.setXLink(self.views[0])
+                self.plots_layout.addWidget(view)
+            self.views.append(pair[0])
+            self.derived_views.extend(pair[1:])
+
+    def on_derived_toggled(self, on):
+        self._qs.setValue("ui/derived", "true" if on else "false")
+        self.build_views()
+        for v in self.views + self.derived_views:
+            v.dirty = True
+
+    def add_device(self):
+        self.device_list.addItem(self.port.currentText())
+
     def on_rate_change(self, v):
-        # adjust timer interval
+        # nominal rate for batch timestamps; simulated devices follow it too
         if v <= 0: v = 1
-        self.timer.setInterval(int(1000 / v))
+        for p in self.devices:
+            p.set_rate(v)
+
+    def toggle_connection(self):
+        if not self.devices.running:
+            self.connect_device()
+        else:
+            self.disconnect_device()
+
+    def selected_ports(self):
+        from acquisition import list_ports, SIMULATED_PORT
+        ports = [self.device_list.item(i).text() for i in range(self.device_list.count())]
+        ports = ports or [self.port.currentText()]
+        found = [p for p in list_ports() if p not in ports]
+        # each "Auto detect" entry takes the next free port; the simulator only when picked explicitly
+        out = []
+        for p in ports:
+            if p == "Auto detect":
+                if not found:
+                    raise RuntimeError(f"No serial ports found (pick \"{SIMULATED_PORT}\" to run without hardware)")
+                p = found.pop(0)
+            out.append(p)
+        return out
+
+    def connect_device(self):
+        from config import parse_duration
+        from devices import DeviceManager
+        from heater import HeaterEngine
+        qs = self._qs
+        try:
+            ports = self.selected_ports()
+        except RuntimeError as e:
+            QtWidgets.QMessageBox.warning(self, "Connect", str(e))
+            return
+        self.devices.close()
+        workers = "process" if qs.value("adv/workers", "Threads") == "Processes" else "thread"
+        # feature extraction always runs so the ΔR/R₀ plots can be shown mid-run
+        try:
+            heater = HeaterEngine(self.heat.currentText(), float(qs.value("heater/max", 5.0)),
+                                  float(qs.value("heater/preheat", 30)), float(qs.value("heater/period", 20.0)),
+                                  custom_path=qs.value("heater/custom", "") or None)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Heater", f"Heater profile unavailable, running without it:\n{e}")
+            heater = None
+        self.devices = DeviceManager(workers, features={}, heater=heater)
+        for port in ports:
+            self.devices.add(port, channels=int(qs.value("device/channels", 4)),
+                             frame=qs.value("device/frame", "ASCII (CSV)"), rate=self.rate.value(),
+                             baud=int(qs.value("device/baud", 115200)), timeout_ms=int(qs.value("adv/timeout", 1000)),
+                             crc=qs.value("adv/crc", "false") == "true")
+        try:
+            self.devices.start(int(qs.value("acq/buffer", 300)))
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Connect", f"Could not open device:\n{e}")
+            return
+        self._run_for = parse_duration(self.duration.currentText())
+        self.begin_run("Connected to " + ", ".join(p.port for p in self.devices))
+
+    def open_runs(self, paths):
+        # replay logged runs through the live pipeline; one device per file, in step on the runs' own time
+        from devices import DeviceManager
+        qs = self._qs
+        if self.devices.running:
+            self.disconnect_device()
+        self.devices.close()
+        workers = "process" if qs.value("adv/workers", "Threads") == "Processes" else "thread"
+        self.devices = DeviceManager(workers, features={})
+        try:
+            for path in paths:
+                self.devices.add_replay(path, speed=REPLAY_SPEEDS[self.speed.currentText()])
+            self.devices.start(int(qs.value("acq/buffer", 300)))
+        except Exception as e:
+            self.devices.close(); self.devices = DeviceManager()
+            self.build_views()
+            QtWidgets.QMessageBox.warning(self, "Open Run", f"Could not open run:\n{e}")
+            return
+        self._run_for = None
+        # a replay is not logged again unless asked for with the Logging checkbox
+        self.begin_run(f"Replaying {', '.join(os.path.basename(p) for p in paths)} at {self.speed.currentText()}", log=False)
+
+    def begin_run(self, text, log=True):
+        self.build_views()
+        self._started = time.monotonic()
+        self.start_metrics()
+        self.timer.start(); self.render_timer.start(); self.stats_timer.start()
+        self.acquisition_changed.emit(True)
+        self.btn_connect.setText("Disconnect")
+        self.message.emit(text)
+        self.start_inference()
+        qs = self._qs
+        if not log:
+            self.log.setChecked(False)
+        elif qs.value("log/auto", "false") == "true" and not self.log.isChecked():
+            self.log.setChecked(True)  # starts the loggers via on_log_toggled
+        elif self.log.isChecked():
+            self.start_logging()
+
+    def disconnect_device(self):
+        self.timer.stop(); self.render_timer.stop(); self.stats_timer.stop()
+        if self.sampler is not None:
+            self.sample_stats(final=True)  # final counts, before the loggers go
+        self.stop_inference()
+        self.devices.stop()
+        self.logging = False
+        self.stop_metrics()
+        self.btn_connect.setText("Connect Device")
+        self.message.emit("Disconnected")
+        self.acquisition_changed.emit(False)
 
     def update_plot(self):
-        # simulated data
-        self.t += 0.1
-        for i, curve in enumerate(self.curves):
-            x, y = curve.getData()
-            x = x.tolist() if x is not None else []
-            y = y.tolist() if y is not None else []
-            if len(x) > 500: x, y = x[-500:], y[-500:]
-            x.append(self.t)
-            y.append(math.sin(self.t*(0.25 + i*0.06)) + i*0.2)
-            curve.setData(x, y)
-
-    def fake_save(self):
-        # save to CSV or HDF5 per settings (demo CSV only)
+        for p in self.devices.poll():
+            i = self.devices.pipelines.index(p)
+            self.views[i].dirty = True
+            if i < len(self.derived_views): self.derived_views[i].dirty = True
+        self.show_predictions()
+        self.show_heater()
+        for name, ev in self.devices.events():
+            self.message.emit(f"{name} CH{ev['channel'] + 1}: peak ΔR/R₀ {ev['peak']:+.3f}, "
+                              f"response {ev['response_time']:.1f} s, recovery {ev['recovery_time']:.1f} s")
+        for name, err in self.devices.errors():
+            stage = next((p.inference for p in self.devices if p.name == name), None)
+            if stage is not None and stage.error is err:
+                self.stop_inference()
+                self.message.emit(f"Inference stopped ({name}): {err}")
+                continue
+            if self.logging and any(p.logger is not None and p.logger.error is err for p in self.devices):
+                self.stop_logging()
+                self.message.emit(f"Logging stopped ({name}): {err}")
+                continue
+            self.disconnect_device()
+            self.message.emit(f"Device error ({name}): {err}")
+            return
+        if self.devices.finished:
+            self.disconnect_device()
+            self.message.emit(f"Replay finished after {time.monotonic() - self._started:.1f} s")
+            return
+        if self._run_for is not None and time.monotonic() - self._started >= self._run_for:
+            self.disconnect_device()
+            self.message.emit(f"Acquisition finished after {self.duration.currentText()}")
+
+    def show_heater(self):
+        heater = self.devices.heater
+        if heater is None or not heater.running:
+            return
+        stats = heater.jitter_stats()
+        phase = heater.phase_at(heater.clock())
+        text = f"{heater.setpoint:.2f} V · " + ("preheat" if phase != phase else f"phase {phase:.2f}")
+        if stats is not None:
+            text += f"\njitter p99 {stats['p99_us']:.0f} µs, missed {stats['missed']}, late {stats['late']}"
+        self.heater_status.setText(text)
+
+    # ---------- inference ----------
+    def choose_model(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load model", self._qs.value("log/path", os.path.expanduser("~")),
+                                                        "Pickled models (*.pkl *.joblib);;All files (*)")
+        if not path:
+            return
+        self._qs.setValue("inf/model", path)
+        if self.devices.running:
+            self.start_inference()
+        else:
+            self.model_name.setText(os.path.basename(path))
+
+    def start_inference(self):
+        qs = self._qs
+        path = qs.value("inf/model", "")
+        if not path:
+            return
+        self.model_name.setText(os.path.basename(path))
+        options = dict(window=int(qs.value("inf/window", 100)), hop=int(qs.value("inf/hop", 20)),
+                       latency_ms=int(qs.value("inf/latency_ms", 100)),
+                       workers="process" if qs.value("inf/workers", "Thread") == "Process" else "thread")
+        source = "derived" if qs.value("inf/input", "Raw") == "ΔR/R₀" else "raw"
+        try:
+            for p in self.devices:
+                p.start_inference(path, source, **options)
+        except Exception as e:
+            self.stop_inference()
+            QtWidgets.QMessageBox.warning(self, "Model", f"Could not start inference:\n{e}")
+
+    def stop_inference(self):
+        for p in self.devices:
+            p.stop_inference()
+
+    def show_predictions(self):
+        # newest prediction per device; latency and backlog summed over all devices
+        preds = self.devices.predictions()
+        if preds:
+            lines = []
+            for name, items in preds:
+                _, label, conf = items[-1]
+                lines.append(f"{name}: {label}" + ("" if conf != conf else f"  ({conf:.0%})"))
+            self.prediction.setText("\n".join(lines))
+        stages = [p.inference for p in self.devices if p.inference is not None]
+        stats = [st.latency_stats() for st in stages]
+        stats = [x for x in stats if x is not None]
+        if stats:
+            self.inf_stats.setText(f"batch latency {max(x['last'] for x in stats) * 1000:.0f} ms "
+                                   f"(p99 {max(x['p99'] for x in stats) * 1000:.0f} ms), "
+                                   f"backlog {sum(st.backlog for st in stages)}")
+
+    def view_whole_run(self):
+        spans = [p.history.span() for p in self.devices if p.history is not None]
+        spans = [s for s in spans if s is not None]
+        if not spans or not self.views: return
+        self.views[0].getViewBox().setXRange(min(s[0] for s in spans), max(s[1] for s in spans), padding=0.01)
+
+    def render(self):
+        t0 = time.perf_counter()
+        for view, p in zip(self.views, self.devices):
+            view.render(p.history)
+        for view, p in zip(self.derived_views, self.devices):
+            view.render(p.derived)
+        self.render_time.add(time.perf_counter() - t0)
+
+    # ---------- metrics ----------
+    def start_metrics(self):
+        from metrics import Timer, MetricsSampler, MetricsLog
+        qs = self._qs
+        self.render_time = Timer()
+        self.sampler = MetricsSampler(self.devices, {"render": self.render_time})
+        self.sampler.sample()  # baseline for the first rates
+        self._stats_ticks = 0
+        if qs.value("adv/metrics", "false") == "true":
+            name = f"sensorlab-metrics-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+            try:
+                self.metrics_log = MetricsLog(os.path.join(qs.value("log/path", os.path.expanduser("~")), name))
+            except OSError as e:
+                self.message.emit(f"Metrics log disabled: {e}")
+
+    def stop_metrics(self):
+        if self.metrics_log is not None:
+            self.metrics_log.close(); self.metrics_log = None
+        self.sampler = None
+
+    def sample_stats(self, final=False):
+        snap = self.sampler.sample()
+        snap["elapsed_s"] = time.monotonic() - self._started
+        self._stats_ticks += 1
+        every = max(1, int(self._qs.value("adv/metrics_interval", 5)))
+        if self.metrics_log is not None and (final or self._stats_ticks % every == 0):
+            self.metrics_log.write(snap)
+        self.stats.emit(snap)
+
+    def run_metadata(self):
+        return {"sample_id": self.sample_id.text(), "operator": self.operator.text(),
+                "notes": self.notes.toPlainText(), "heater_profile": self.heat.currentText(),
+                "rate_hz": int(self.rate.value()), "frame": self._qs.value("device/frame", "ASCII (CSV)")}
+
+    def on_log_toggled(self, on):
+        if not self.devices.running:
+            return
+        if on:
+            self.start_logging()
+        else:
+            self.stop_logging()
+
+    def run_catalog(self):
+        from catalog import RunCatalog, catalog_path
+        path = catalog_path(self._qs.value("log/path", os.path.expanduser("~")))
+        if self.catalog is None or self.catalog.path != path:
+            if self.catalog is not None and not self.logging:
+                self.catalog.close()
+            try:
+                self.catalog = RunCatalog(path)
+            except Exception as e:
+                self.catalog = None
+                self.message.emit(f"Run catalog unavailable: {e}")
+        return self.catalog
+
+    def start_logging(self):
+        if self.logging:
+            return
+        qs = self._qs
+        catalog = self.run_catalog() if qs.value("log/catalog", "true") == "true" else None
+        try:
+            for p in self.devices:
+                p.start_logging(qs.value("log/path", os.path.expanduser("~")), qs.value("log/format", "CSV"),
+                                self.run_metadata(), qs.value("acq/ts", "Epoch ms"),
+                                int(qs.value("log/rotate_mb", 0)), int(qs.value("log/rotate_min", 0)), catalog)
+        except Exception as e:
+            for p in self.devices: p.stop_logging()
+            self.log.setChecked(False)
+            QtWidgets.QMessageBox.warning(self, "Logging", f"Could not start logging:\n{e}")
+            return
+        self.logging = True
+        self.message.emit("Logging to " + ", ".join(p.logger.path for p in self.devices))
+
+    def stop_logging(self):
+        if not self.logging:
+            return
+        self.logging = False
+        loggers = [lg for lg in (p.stop_logging() for p in self.devices) if lg is not None]
+        self.message.emit(f"Logged {sum(lg.rows for lg in loggers)} samples to {sum(len(lg.files) for lg in loggers)} file(s)")
+
+    def save_snapshot(self):
+        # export what is currently buffered, in the configured format; one file per device
+        from runlog import FORMATS, write_run
         fmt = self._qs.value("log/format", "CSV")
         default_dir = self._qs.value("log/path", os.path.expanduser("~"))
-        fname, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save data", os.path.join(default_dir, "sensor_run.csv"), "CSV Files (*.csv);;All Files (*)")
+        ext = FORMATS.get(fmt, ".csv")
+        filters = "CSV Files (*.csv);;HDF5 Files (*.h5 *.hdf5);;All Files (*)"
+        fname, chosen = QtWidgets.QFileDialog.getSaveFileName(self, "Save data", os.path.join(default_dir, "sensor_run" + ext), filters)
         if not fname: return
-        # write demo CSV
-        with open(fname, 'w') as f:
-            f.write("# SensorLab demo export\n")
-            f.write(f"# Sample: {self.sample_id.text()}\n")
-            f.write("ts,ch1,ch2,ch3,ch4,ch5,ch6,ch7,ch8\n")
-            for i in range(300):
-                t = i * 0.1
-                vals = [math.sin(t*0.5 + c*0.3) + c*0.1 for c in range(8)]
-                line = ",".join([f"{t:.3f}"] + [f"{v:.6f}" for v in vals])
-                f.write(line + "\n")
-        QtWidgets.QMessageBox.information(self, "Saved", f"Saved demo CSV to:\n{fname}")
+        if chosen.startswith("HDF5") or fname.endswith((".h5", ".hdf5")): fmt = "HDF5"
+        elif chosen.startswith("CSV") or fname.endswith(".csv"): fmt = "CSV"
+        pipelines = [p for p in self.devices if p.history is not None]
+        stem, ext = os.path.splitext(fname)
+        saved, total = [], 0
+        try:
+            for p in pipelines:
+                path = fname if len(pipelines) == 1 else f"{stem}_{p.name}{ext}"
+                ts, data = p.history.recent.view()
+                write_run(path, fmt, ts, data.T, dict(self.run_metadata(), device=p.name, port=p.port),
+                          self._qs.value("acq/ts", "Epoch ms"))
+                saved.append(path); total += len(ts)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Save", f"Could not save:\n{e}")
+            return
+        QtWidgets.QMessageBox.information(self, "Saved", f"Saved {total} samples to:\n" + "\n".join(saved))
 
 # ---------- Main Window ----------
 class MainWindow(QtWidgets.QMainWindow):
+    message = QtCore.pyqtSignal(str)  # status text, safe to emit from worker threads
+
     def __init__(self):
         super().__init__()
         self._qs = app_settings()
@@ -362,9 +899,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.resize(1200, 760)
         self.stack = QtWidgets.QStackedWidget()
         self.start = StartPage()
-        self.dashboard = MainDashboard()
+        self.dashboard = None  # built on first use (see show_dashboard); nothing runs behind the start page
         self.stack.addWidget(self.start)
-        self.stack.addWidget(self.dashboard)
         self.setCentralWidget(self.stack)
 
         # menu
@@ -377,10 +913,27 @@ class MainWindow(QtWidgets.QMainWindow):
         action_settings = QtGui.QAction("Settings", self)
         action_settings.triggered.connect(self.open_settings)
         file_menu.addAction(action_settings)
+        action_open = QtGui.QAction("Open Run…", self)
+        action_open.triggered.connect(self.open_run)
+        file_menu.addAction(action_open)
+        action_export = QtGui.QAction("Export Runs as Dataset…", self)
+        action_export.triggered.connect(self.export_runs)
+        file_menu.addAction(action_export)
+        action_browser = QtGui.QAction("Run Browser…", self)
+        action_browser.triggered.connect(self.open_run_browser)
+        file_menu.addAction(action_browser)
         # theme toggle
         act_theme = QtGui.QAction("Toggle Light/Dark", self)
         act_theme.triggered.connect(self.toggle_theme)
         view_menu.addAction(act_theme)
+        # diagnostics: every metric of the last snapshot; only filled while visible
+        self.diag = QtWidgets.QDockWidget("Diagnostics", self); self.diag.setObjectName("diagnostics")
+        self.diag_table = QtWidgets.QTableWidget(0, 2); self.diag_table.setHorizontalHeaderLabels(["Metric", "Value"])
+        self.diag_table.horizontalHeader().setStretchLastSection(True); self.diag_table.verticalHeader().setVisible(False)
+        self.diag.setWidget(self.diag_table)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.RightDockWidgetArea, self.diag)
+        self.diag.hide()
+        view_menu.addAction(self.diag.toggleViewAction())
 
         # statusbar
         self.status = QtWidgets.QStatusBar(); self.setStatusBar(self.status)
@@ -388,29 +941,154 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status_left = QtWidgets.QLabel("00:00:00"); self.status.addPermanentWidget(self.status_left)
         self.status_mid = QtWidgets.QLabel("10 Hz"); self.status.addPermanentWidget(self.status_mid)
         self.status_right = QtWidgets.QLabel("Logging ON"); self.status.addPermanentWidget(self.status_right)
+        self.show_idle_status()
 
         # wiring
-        self.start.start_requested.connect(lambda: self.stack.setCurrentWidget(self.dashboard))
+        self.start.start_requested.connect(self.show_dashboard)
         self.start.settings_requested.connect(self.open_settings)
+        self.message.connect(self.status.showMessage)
 
         # apply settings (theme)
         self.apply_theme_from_settings()
 
-        # show splash if enabled
+        # the splash is built on the first event-loop pass, once the start page is up, so it never delays startup
         if self._qs.value("ui/splash", "true") == "true":
-            splash = SplashScreen(self)
-            splash.show()
-            QtCore.QTimer.singleShot(1200, splash.close)
-            QtCore.QTimer.singleShot(1200, lambda: self.stack.setCurrentWidget(self.start))
+            QtCore.QTimer.singleShot(0, self.show_splash)
+        self.stack.setCurrentWidget(self.start)
+
+    def show_splash(self):
+        splash = SplashScreen(self)
+        splash.setGeometry(self.rect())
+        splash.show()
+        QtCore.QTimer.singleShot(1200, splash.deleteLater)
+
+    def ensure_dashboard(self):
+        if self.dashboard is None:
+            self.dashboard = MainDashboard()
+            self.stack.addWidget(self.dashboard)
+            self.dashboard.message.connect(self.status.showMessage)
+            self.dashboard.stats.connect(self.show_stats)
+            for sig in (self.dashboard.acquisition_changed, self.dashboard.log.toggled, self.dashboard.rate.valueChanged):
+                sig.connect(self.show_idle_status)
+            self.show_idle_status()
+        return self.dashboard
+
+    def show_dashboard(self):
+        self.stack.setCurrentWidget(self.ensure_dashboard())
+        return self.dashboard
+
+    def open_run(self):
+        from replay import RUN_FILTERS
+        paths, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Open run", self._qs.value("log/path", os.path.expanduser("~")),
+                                                          RUN_FILTERS)
+        if paths:
+            self.show_dashboard().open_runs(paths)
+
+    def logging_files(self):
+        # files loggers are still writing
+        if self.dashboard is None:
+            return []
+        return [f for p in self.dashboard.devices if p.logger is not None for f in p.logger.files]
+
+    def open_run_browser(self):
+        catalog = self.ensure_dashboard().run_catalog()
+        if catalog is None:
+            return
+        browser = RunBrowser(catalog, self._qs.value("log/path", os.path.expanduser("~")), self.logging_files(), self)
+        browser.replay_requested.connect(lambda paths: self.show_dashboard().open_runs(paths))
+        if not len(catalog):
+            browser.rescan()  # first visit: catalog what is already in the folder
+        browser.show()
+
+    def export_runs(self):
+        from export import export_runs, find_runs
+        qs = self._qs
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Export runs", qs.value("log/path", os.path.expanduser("~")))
+        if not directory:
+            return
+        # runs still being written are left for the next export
+        busy = {os.path.abspath(f) for f in self.logging_files()}
+        runs = [f for f in find_runs([directory]) if os.path.abspath(f) not in busy]
+        out = os.path.join(directory, "export")
+        fmt, window, hop = qs.value("export/format", "NPZ"), int(qs.value("inf/window", 100)), int(qs.value("inf/hop", 20))
+        message = self.message
+
+        def work():
+            done, failed = 0, 0
+            for path, res in export_runs(runs, out, fmt, window, hop):
+                if isinstance(res, Exception):
+                    failed += 1
+                    message.emit(f"Export failed for {os.path.basename(path)}: {res}")
+                else:
+                    done += 1
+                    message.emit(f"Exported {done}/{len(runs)}: {res['file']}")
+            message.emit(f"Exported {done} run(s) to {out}" + (f", {failed} failed" if failed else ""))
+        message.emit(f"Exporting {len(runs)} run(s) from {directory}…")
+        threading.Thread(target=work, name="export", daemon=True).start()
+
+    def closeEvent(self, event):
+        if self.dashboard is not None:
+            self.dashboard.disconnect_device()
+            self.dashboard.devices.close()
+            if self.dashboard.catalog is not None:
+                self.dashboard.catalog.close()
+        super().closeEvent(event)
+
+    def show_idle_status(self, *_):
+        # nominal values until a run reports measured ones; the elapsed time of the last run stays
+        d = self.dashboard
+        if d is None:
+            # no dashboard yet: what it will start with
+            rate, log = self._qs.value("acq/rate", 10), self._qs.value("log/auto", "false") == "true"
+        elif d.devices.running:
+            return
         else:
-            self.stack.setCurrentWidget(self.start)
+            rate, log = d.rate.value(), d.log.isChecked()
+        self.status_mid.setText(f"{rate} Hz")
+        self.status_right.setText("Logging ON" if log else "Logging OFF")
+
+    def show_stats(self, snap):
+        from metrics import summary
+        s = summary(snap)
+        secs = int(snap.get("elapsed_s", 0))
+        self.status_left.setText(f"{secs // 3600:02d}:{secs // 60 % 60:02d}:{secs % 60:02d}")
+        mid = f"{s['rate_hz']:.0f} Hz" if s["rate_hz"] is not None else f"{self.dashboard.rate.value()} Hz"
+        if s["devices"] > 1:
+            mid += f" × {s['devices']}"
+        lost = s["dropped"] + s["bad_frames"]
+        if lost or s["late"]:
+            mid += f" · {lost} lost, {s['late']} late"
+        self.status_mid.setText(mid)
+        right = f"Logging ON ({s['logging']})" if s["logging"] > 1 else ("Logging ON" if s["logging"] else "Logging OFF")
+        if s["log_dropped"]:
+            right += f" · {s['log_dropped']} dropped"
+        self.status_right.setText(right)
+        if self.diag.isVisible():
+            self.fill_diagnostics(snap)
+
+    def fill_diagnostics(self, snap):
+        from metrics import flatten
+        rows = [(k, v) for k, v in flatten(snap).items() if k != "time"]
+        t = self.diag_table
+        t.setRowCount(len(rows))
+        for i, (k, v) in enumerate(rows):
+            text = f"{v:.3f}" if isinstance(v, float) else ("—" if v is None else str(v))
+            for j, cell in enumerate((k, text)):
+                item = t.item(i, j)
+                if item is None:
+                    t.setItem(i, j, QtWidgets.QTableWidgetItem(cell))
+                else:
+                    item.setText(cell)
 
     def open_settings(self):
         dlg = SettingsDialog(self)
         if dlg.exec():  # saved
             # reapply theme and some important settings to dashboard
             self.apply_theme_from_settings()
-            self.dashboard.load_settings()
+            if self.dashboard is not None:
+                self.dashboard.load_settings()
+            else:
+                self.show_idle_status()
 
     def apply_theme_from_settings(self):
         theme = self._qs.value("ui/theme", "Dark")
@@ -0,0 +1,144 @@
+import os, sys, time
+
+import numpy as np
+import pytest
+
+from acquisition import (AcquisitionEngine, AsciiFrameParser, FakeDevice, FRAME_ASCII, FRAME_BINARY,
+                         encode_ascii)
+from codec import BinaryFrameDecoder
+
+posix = pytest.mark.skipif(not sys.platform.startswith(("linux", "darwin")), reason="needs a POSIX pty")
+
+
+# ---------- ASCII parsing ----------
+def test_ascii_parses_complete_lines_and_keeps_tail():
+    p = AsciiFrameParser(3)
+    out = p.feed(b"1,2,3\n4,5,6\n7,8")
+    assert np.array_equal(out, [[1, 2, 3], [4, 5, 6]])
+    out = p.feed(b",9\r\n")
+    assert np.array_equal(out, [[7, 8, 9]])
+    assert p.bad_frames == 0
+
+
+def test_ascii_counts_bad_lines():
+    p = AsciiFrameParser(3)
+    out = p.feed(b"1,2,3\n1,2\n\n4,5,6,7\n8,9,10\n")
+    assert np.array_equal(out, [[1, 2, 3], [8, 9, 10]])
+    assert p.bad_frames == 2
+
+
+def test_ascii_skips_malformed_numbers():
+    p = AsciiFrameParser(2)
+    out = p.feed(b"1,2\n3,x\n5,6\n")
+    assert np.array_equal(out, [[1, 2], [5, 6]])
+    assert p.bad_frames == 1
+
+
+def test_ascii_waits_for_newline_and_drops_runaway_garbage():
+    p = AsciiFrameParser(2)
+    assert p.feed(b"1,").shape == (0, 2)
+    assert np.array_equal(p.feed(b"2\n"), [[1, 2]])
+    p.feed(b"x" * (p.max_tail + 1))
+    assert p.feed(b"3,4\n").tolist() == [[3, 4]]
+
+
+def test_ascii_round_trip():
+    block = np.random.default_rng(0).random((50, 4))
+    out = AsciiFrameParser(4).feed(encode_ascii(block))
+    assert np.allclose(out, block, atol=1e-6)
+
+
+# ---------- Engine internals (no port needed) ----------
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def engine(**kw):
+    return AcquisitionEngine("unused", channels=2, rate=100, clock=kw.pop("clock", FakeClock()), **kw)
+
+
+def test_stamp_spreads_batch_at_nominal_rate():
+    eng = engine()
+    ts = eng._stamp(5)
+    assert np.allclose(np.diff(ts), 0.01)
+    assert ts[-1] == pytest.approx(1000.0)
+
+
+def test_stamp_is_monotonic_and_tolerates_jitter():
+    clock = FakeClock()
+    eng = engine(clock=clock)
+    first = eng._stamp(10)
+    clock.t += 0.095  # next batch read a little early: overlaps by half a period
+    second = eng._stamp(10)
+    assert second[0] > first[-1]
+    assert np.all(np.diff(np.concatenate([first, second])) > 0)
+    assert eng.late_samples == 0
+
+
+def test_stamp_counts_samples_more_than_a_period_behind():
+    clock = FakeClock()
+    eng = engine(clock=clock)
+    eng._stamp(10)
+    clock.t += 0.05  # 10 samples in half their duration: the reader had stalled
+    ts = eng._stamp(10)
+    assert ts[0] > 1000.0
+    # unshifted stamps 999.96 .. 1000.05; 999.96, .97 and .98 are more than a period behind 1000.0
+    assert eng.late_samples == 3
+
+
+def test_full_queue_drops_oldest_batch():
+    eng = engine(queue_size=2)
+    for k in range(3):
+        eng._push(np.array([float(k)]), np.full((1, 2), k))
+    assert eng.dropped_batches == 1
+    assert eng.samples == 3
+    ts, block = eng.drain()
+    assert ts.tolist() == [1.0, 2.0]
+    assert eng.drain() is None
+
+
+# ---------- Simulated device ----------
+@posix
+@pytest.mark.parametrize("frame, crc", [(FRAME_ASCII, False), (FRAME_BINARY, True)])
+def test_fake_device_round_trip(frame, crc):
+    pytest.importorskip("serial")
+    dev = FakeDevice(channels=4, rate=500, frame=frame, crc=crc).start()
+    eng = AcquisitionEngine(dev.port, channels=4, frame=frame, rate=500, timeout_ms=100, crc=crc)
+    try:
+        eng.start()
+        time.sleep(0.5)
+    finally:
+        eng.stop()
+        dev.stop()
+    ts, block = eng.drain()
+    assert block.shape == (len(ts), 4) and len(ts) > 50
+    assert np.all(np.diff(ts) > 0)
+    assert eng.bad_frames == 0 and eng.error is None
+    if frame == FRAME_BINARY:
+        assert eng.parser.resyncs == 0 and eng.parser.dropped == 0
+
+
+@posix
+def test_fake_device_never_cuts_frames_when_the_reader_stalls():
+    # nobody reads for a while: the pty fills up and writes go through in pieces
+    dev = FakeDevice(channels=8, rate=20000, frame=FRAME_BINARY, crc=True).start()
+    os.set_blocking(dev.slave, False)
+    try:
+        time.sleep(0.4)
+        dec = BinaryFrameDecoder(8, True)
+        got = 0
+        deadline = time.monotonic() + 0.6
+        while time.monotonic() < deadline:
+            try:
+                got += len(dec.feed(os.read(dev.slave, 1 << 16)))
+            except BlockingIOError:
+                time.sleep(0.005)
+    finally:
+        dev.stop()
+    assert dev.overruns > 0
+    assert got > 0
+    assert dec.crc_errors == 0 and dec.resyncs == 0 and dec.dropped == 0
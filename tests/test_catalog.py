@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+from catalog import ChannelStats, RunCatalog
+from runlog import write_run
+
+
+def test_channel_stats_merge_matches_numpy():
+    rng = np.random.default_rng(8)
+    data = rng.normal(5.0, 2.0, (1000, 3))
+    ts = np.arange(1000.0)
+    stats = ChannelStats(3)
+    for i0, i1 in [(0, 1), (1, 10), (10, 500), (500, 500), (500, 1000)]:
+        stats.add(ts[i0:i1], data[i0:i1])
+    rows = stats.rows()
+    assert stats.n == 1000 and (stats.t0, stats.t1) == (0.0, 999.0)
+    assert [r[0] for r in rows] == [0, 1, 2] and all(r[1] == 1000 for r in rows)
+    assert np.allclose([r[2] for r in rows], data.mean(axis=0))
+    assert np.allclose([r[3] for r in rows], data.std(axis=0))
+    assert [r[4] for r in rows] == data.min(axis=0).tolist() and [r[5] for r in rows] == data.max(axis=0).tolist()
+    assert ChannelStats(3).rows() == []
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    cat = RunCatalog(str(tmp_path / "runs.sqlite"))
+    yield cat
+    cat.close()
+
+
+def record(cat, path, t0, **meta):
+    stats = ChannelStats(2)
+    stats.add(t0 + np.arange(10.0), np.full((10, 2), 1.5))
+    path.write_text("")
+    cat.record(str(path), dict({"rate_hz": 100, "channels": 2}, **meta), stats, stats.n, 123, "complete")
+
+
+def test_record_and_search(tmp_path, catalog):
+    record(catalog, tmp_path / "a.csv", 1000.0, sample_id="ZnO-1", operator="ana", heater_profile="Linear")
+    record(catalog, tmp_path / "b_part002.h5", 2000.0, sample_id="SnO2-7", operator="bo", notes="ethanol 50 ppm")
+    record(catalog, tmp_path / "c.csv", 3000.0, sample_id="ZnO-2", operator="bo", heater_profile="Samio")
+    assert len(catalog) == 3
+    assert [r["sample_id"] for r in catalog.search()] == ["ZnO-2", "SnO2-7", "ZnO-1"]  # newest first
+    assert [r["sample_id"] for r in catalog.search("zno")] == ["ZnO-2", "ZnO-1"]
+    assert [r["sample_id"] for r in catalog.search("ethanol")] == ["SnO2-7"]
+    assert [r["sample_id"] for r in catalog.search(operator="bo", heater_profile="Samio")] == ["ZnO-2"]
+    assert [r["sample_id"] for r in catalog.search(since=1500.0, until=2500.0)] == ["SnO2-7"]
+    assert catalog.distinct("operator") == ["ana", "bo"]
+    with pytest.raises(ValueError):
+        catalog.search(colour="red")
+    part = catalog.search("SnO2")[0]
+    assert part["run"] == "b" and part["format"] == "HDF5" and part["rows"] == 10
+    assert catalog.run(part["id"])["metadata"]["notes"] == "ethanol 50 ppm"
+    assert [s["mean"] for s in catalog.channel_stats(part["id"])] == [1.5, 1.5]
+
+
+def test_record_refreshes_an_existing_row(tmp_path, catalog):
+    record(catalog, tmp_path / "a.csv", 1000.0, sample_id="s1", notes="first")
+    record(catalog, tmp_path / "a.csv", 1000.0, sample_id="s1", notes="second")
+    assert len(catalog) == 1 and catalog.search()[0]["notes"] == "second"
+
+
+def test_scan_indexes_runs_logged_elsewhere(tmp_path, catalog):
+    write_run(str(tmp_path / "old.csv"), "CSV", 1000.0 + np.arange(20) / 10, np.ones((20, 2)),
+              {"sample_id": "legacy", "rate_hz": 10})
+    (tmp_path / "old.cycles.csv").write_text("start,samples\n")
+    indexed, failed = catalog.scan(str(tmp_path))
+    assert [os.path.basename(p) for p in indexed] == ["old.csv"] and failed == []
+    row = catalog.search("legacy")[0]
+    assert row["rows"] == 20 and row["rate_hz"] == 10.0
+    assert catalog.scan(str(tmp_path)) == ([], [])  # unchanged files are skipped
+
+
+def test_rate_is_stored_as_a_number_or_null(tmp_path, catalog):
+    record(catalog, tmp_path / "a.csv", 1000.0, sample_id="a", rate_hz="200")
+    record(catalog, tmp_path / "b.csv", 2000.0, sample_id="b", rate_hz="fast")
+    record(catalog, tmp_path / "c.csv", 3000.0, sample_id="c", rate_hz=None)
+    assert {r["sample_id"]: r["rate_hz"] for r in catalog.search()} == {"a": 200.0, "b": None, "c": None}
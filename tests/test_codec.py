@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import codec
+from codec import (BinaryFrameDecoder, BinaryFrameEncoder, SMALL_FRAMES, crc16, crc16_rows, encode_frames,
+                   frame_length)
+
+CHANNELS = 4
+
+
+def block(n, seed=0):
+    return np.random.default_rng(seed).random((n, CHANNELS)).astype(np.float32)
+
+
+def feed_all(dec, data, chunk):
+    out = [dec.feed(data[i:i + chunk]) for i in range(0, len(data), chunk)]
+    return np.concatenate(out) if out else np.empty((0, CHANNELS))
+
+
+# small chunks take the per-frame byte path, large ones the vectorized path
+CHUNKS = [1, frame_length(CHANNELS, True) * 2, frame_length(CHANNELS, True) * SMALL_FRAMES * 4]
+
+
+def test_crc_check_value():
+    assert crc16(b"12345678") == 0xA12B
+    rows = np.frombuffer(b"12345678" * 3, dtype=np.uint8).reshape(3, 8)
+    assert list(crc16_rows(rows)) == [0xA12B] * 3
+
+
+@pytest.mark.parametrize("crc", [False, True])
+@pytest.mark.parametrize("chunk", CHUNKS)
+def test_round_trip(crc, chunk):
+    b = block(200)
+    dec = BinaryFrameDecoder(CHANNELS, crc)
+    got = feed_all(dec, encode_frames(b, crc=crc), chunk)
+    assert np.array_equal(got, b.astype(np.float64))
+    assert (dec.frames, dec.dropped, dec.crc_errors, dec.resyncs) == (200, 0, 0, 0)
+
+
+@pytest.mark.parametrize("chunk", CHUNKS)
+def test_resync_after_garbage(chunk):
+    b = block(100)
+    head, tail = encode_frames(b[:40], crc=True), encode_frames(b[40:], seq0=40, crc=True)
+    garbage = b"\x00\xa5\x5a\x13\xa5" * 7
+    dec = BinaryFrameDecoder(CHANNELS, True)
+    got = feed_all(dec, head + garbage + tail, chunk)
+    assert np.array_equal(got, b.astype(np.float64))
+    assert dec.resyncs >= 1
+    assert dec.skipped_bytes == len(garbage)
+    assert dec.dropped == 0
+
+
+@pytest.mark.parametrize("chunk", CHUNKS)
+def test_crc_error_drops_frame(chunk):
+    b = block(50)
+    L = frame_length(CHANNELS, True)
+    data = bytearray(encode_frames(b, crc=True))
+    data[10 * L + 8] ^= 0xFF  # corrupt a value byte of frame 10
+    dec = BinaryFrameDecoder(CHANNELS, True)
+    got = feed_all(dec, bytes(data), chunk)
+    assert dec.crc_errors == 1
+    assert dec.bad_frames == 1
+    assert len(got) == 49
+    assert np.array_equal(got, np.delete(b, 10, axis=0).astype(np.float64))
+    assert dec.dropped == 1  # the sequence counter shows the missing frame
+
+
+@pytest.mark.parametrize("chunk", CHUNKS)
+def test_sequence_gaps_count_dropped(chunk):
+    b = block(30)
+    data = encode_frames(b[:10], seq0=0xFFF8) + encode_frames(b[10:20], seq0=5) + encode_frames(b[20:], seq0=20)
+    dec = BinaryFrameDecoder(CHANNELS)
+    got = feed_all(dec, data, chunk)
+    assert len(got) == 30
+    # 0xFFF8..0x0001 wraps, then 5 (2, 3, 4 missing), 5..14, then 20 (15..19 missing)
+    assert dec.dropped == 3 + 5
+
+
+def test_encoder_continues_sequence():
+    enc = BinaryFrameEncoder(crc=True)
+    b = block(20)
+    data = enc.encode(b[:7]) + enc.encode(b[7:])
+    dec = BinaryFrameDecoder(CHANNELS, True)
+    assert len(dec.feed(data)) == 20
+    assert dec.dropped == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_byte_and_vector_paths_agree(seed, monkeypatch):
+    rng = np.random.default_rng(seed)
+    data = bytearray(encode_frames(block(300, seed), crc=True))
+    for i in rng.integers(0, len(data), 20):
+        data[i] = rng.integers(0, 256)
+    results = []
+    for small_frames in (10 ** 6, 0):
+        monkeypatch.setattr(codec, "SMALL_FRAMES", small_frames)
+        dec = BinaryFrameDecoder(CHANNELS, True)
+        got = feed_all(dec, bytes(data), 500)
+        results.append((got, dec.frames, dec.dropped, dec.crc_errors, dec.resyncs, dec.skipped_bytes))
+    (a, *counts_a), (b, *counts_b) = results
+    assert np.array_equal(a, b)
+    assert counts_a == counts_b
@@ -0,0 +1,59 @@
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from acquisition import FakeDevice, SIMULATED_PORT
+from devices import DeviceManager, ProcessEngine
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith(("linux", "darwin")),
+                                reason="the simulated device needs a POSIX pseudo-terminal")
+
+
+def wait_for(cond, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_poll_runs_every_device_and_reports_the_ones_with_data():
+    manager = DeviceManager(features={"cycle_seconds": 1.0})
+    for _ in range(3):
+        manager.add(SIMULATED_PORT, channels=4, rate=200)
+    manager.start(buffer=2000)
+    seen = set()
+    try:
+        assert wait_for(lambda: seen.update(p.name for p in manager.poll()) or len(seen) == 3)
+        assert all(p.history.raw_range(0, np.inf)[1].shape[0] == 4 for p in manager)
+        assert all(len(p.derived.raw_range(0, np.inf)[0]) for p in manager)
+    finally:
+        manager.stop()
+        manager.close()
+
+
+def test_process_engine_rate_reaches_the_child():
+    dev = FakeDevice(channels=2, rate=100).start()
+    engine = ProcessEngine(dev.port, channels=2, rate=100, timeout_ms=200)
+    engine.start()
+    try:
+        assert wait_for(lambda: engine.samples > 50, timeout=20)
+        engine.rate = 25
+        engine.drain()
+        got = []
+
+        def spread_at_new_rate():
+            batch = engine.drain()
+            if batch is not None:
+                got.append(np.diff(batch[0]))
+            # timestamps inside a batch are spread back at the engine's nominal rate
+            return any(len(d) and np.isclose(np.median(d), 1 / 25, rtol=0.01) for d in got)
+
+        assert wait_for(spread_at_new_rate)
+        assert engine.rate == 25
+    finally:
+        engine.stop()
+        dev.stop()
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pytest
+
+from export import convert_run, export_runs, find_runs, load_export, window_index, windows
+from runlog import write_run
+
+RATE = 100.0
+
+
+def make_run(path, n=500, channels=3, gap_at=None, fmt=None):
+    ts = 1_700_000_000.0 + np.arange(n) / RATE
+    if gap_at is not None:
+        ts[gap_at:] += 1.0  # a dropout of 100 samples
+    block = np.random.default_rng(1).random((n, channels)).round(6)
+    fmt = fmt or ("HDF5" if str(path).endswith(".h5") else "CSV")
+    write_run(str(path), fmt, ts, block, {"rate_hz": RATE})
+    return ts, block
+
+
+def test_window_index_respects_hop_and_gaps():
+    ts = np.arange(100) / RATE
+    assert window_index(ts, RATE, 30, 20).tolist() == [0, 20, 40, 60]
+    ts[50:] += 1.0
+    # windows straddling the gap between rows 49 and 50 are left out
+    assert window_index(ts, RATE, 30, 10).tolist() == [0, 10, 20, 50, 60, 70]
+    assert len(window_index(ts[:10], RATE, 30, 10)) == 0
+
+
+def test_round_trip_values_and_windows(tmp_path):
+    ts, block = make_run(tmp_path / "run.csv", gap_at=250)
+    info = convert_run(str(tmp_path / "run.csv"), str(tmp_path / "out"), window=50, hop=25)
+    assert info["rows"] == 500 and info["skipped_rows"] == 0
+    ds = load_export(str(tmp_path / "out" / info["file"]))
+    assert np.array_equal(ds["ts_us"], np.round(ts * 1e6).astype(np.int64))
+    assert np.allclose(ds["data"], block, atol=1e-6)
+    assert ds["windows"].tolist() == [0, 25, 50, 75, 100, 125, 150, 175, 200, 250, 275, 300, 325, 350, 375,
+                                      400, 425, 450]
+    w = windows(ds, [0, 9])
+    assert w.shape == (2, 50, 3)
+    assert np.allclose(w[1], block[250:300], atol=1e-6)
+
+
+def test_malformed_rows_are_dropped_not_left_uninitialized(tmp_path):
+    path = tmp_path / "run.csv"
+    ts, block = make_run(path, n=50)
+    lines = path.read_bytes().split(b"\n")
+    header = sum(1 for ln in lines if ln.startswith(b"#")) + 1
+    lines[header + 10] = b"garbage"
+    path.write_bytes(b"\n".join(lines))
+    info = convert_run(str(path), str(tmp_path / "out"), window=10, hop=10)
+    ds = load_export(str(tmp_path / "out" / info["file"]))
+    assert info["rows"] == 49 and info["skipped_rows"] == 1
+    assert np.allclose(ds["data"], np.delete(block, 10, axis=0), atol=1e-6)
+
+
+def test_same_stem_runs_do_not_collide(tmp_path):
+    pytest.importorskip("h5py")
+    make_run(tmp_path / "run.csv")
+    make_run(tmp_path / "run.h5", n=300)
+    results = dict(export_runs([str(tmp_path)], str(tmp_path / "out"), workers=1))
+    assert all(not isinstance(r, Exception) for r in results.values())
+    assert sorted(r["rows"] for r in results.values()) == [300, 500]
+    assert len({r["file"] for r in results.values()}) == 2
+
+
+def test_reexports_when_settings_change(tmp_path):
+    make_run(tmp_path / "run.csv")
+    out = str(tmp_path / "out")
+    convert_run(str(tmp_path / "run.csv"), out, window=100, hop=20)
+    assert convert_run(str(tmp_path / "run.csv"), out, window=100, hop=20).get("skipped")
+    info = convert_run(str(tmp_path / "run.csv"), out, window=50, hop=10)
+    assert not info.get("skipped")
+    assert load_export(os.path.join(out, info["file"]))["windows"][:3].tolist() == [0, 10, 20]
+
+
+def test_find_runs_skips_cycle_sidecars(tmp_path):
+    make_run(tmp_path / "run.csv")
+    (tmp_path / "run.cycles.csv").write_text("start,samples\n")
+    assert find_runs([str(tmp_path)]) == [str(tmp_path / "run.csv")]
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from features import FeatureEngine, ema_block
+from runlog import RunLogger
+
+RATE = 100.0
+
+
+@pytest.mark.parametrize("alpha", [0.0, 0.5, 0.99, 0.9999])
+def test_ema_block_matches_per_sample_loop(alpha):
+    x = np.random.default_rng(5).normal(size=(1000, 3))
+    y0 = np.array([1.0, -2.0, 0.5])
+    want, y = np.empty_like(x), y0.copy()
+    for k in range(len(x)):
+        y = alpha * y + (1 - alpha) * x[k]
+        want[k] = y
+    assert np.allclose(ema_block(x, y0, alpha), want, rtol=1e-9, atol=1e-12)
+
+
+def test_exposure_event_timing():
+    # channel 1 steps from 1.0 to 1.2 for 5 s; channel 2 stays flat
+    n = int(12 * RATE)
+    ts = 1000.0 + np.arange(n) / RATE
+    x = np.ones((n, 2))
+    x[200:700, 0] = 1.2
+    eng = FeatureEngine(2, RATE, smooth_tau=0.5, threshold=0.05)
+    for s in range(0, n, 10):
+        eng.process(ts[s:s + 10], x[s:s + 10])
+    events = eng.drain_events()
+    assert len(events) == 1 and eng.drain_events() == []
+    ev = events[0]
+    assert ev["channel"] == 0
+    assert ev["peak"] == pytest.approx(0.2, rel=0.01)
+    # first-order smoothing: onset at 25 % of the step, t90 at 90 %, recovery start at 90 % of the peak,
+    # recovered below half the threshold (larger than 10 % of this peak)
+    assert ev["onset"] == pytest.approx(ts[200] + 0.5 * np.log(4 / 3), abs=0.02)
+    assert ev["response_time"] == pytest.approx(0.5 * np.log(10) - 0.5 * np.log(4 / 3), abs=0.03)
+    assert ev["recovery_start"] == pytest.approx(ts[700] + 0.5 * np.log(1 / 0.9), abs=0.02)
+    assert ev["end"] == pytest.approx(ts[700] + 0.5 * np.log(8), abs=0.02)
+
+
+def test_cycle_vector_layout():
+    n, C, B = 350, 2, 4
+    ts = 50.0 + np.arange(n) / RATE
+    phase = (np.arange(n) % 100) / 100.0  # 1 s cycles
+    x = 1.0 + np.random.default_rng(6).normal(0, 0.01, (n, C)) + np.linspace(0, 0.1, n)[:, None]
+    eng = FeatureEngine(C, RATE, phase_bins=B)
+    resp = eng.process(ts, x, phase)
+    cycles = eng.drain_cycles()
+    assert [c["samples"] for c in cycles] == [100, 100, 100]
+    names = eng.feature_names()
+    assert len(names) == C * (5 + B)
+    assert names[:6] == ["ch1_mean", "ch1_std", "ch1_min", "ch1_max", "ch1_slope", "ch2_mean"]
+    assert names[C * 5:C * 5 + B + 1] == ["ch1_phase0", "ch1_phase1", "ch1_phase2", "ch1_phase3", "ch2_phase0"]
+    c = cycles[1]
+    assert c["start"] == ts[100]
+    r, t = resp[100:200], ts[100:200] - ts[100]
+    v = dict(zip(names, c["vector"]))
+    for ch in range(C):
+        assert v[f"ch{ch + 1}_mean"] == pytest.approx(r[:, ch].mean())
+        assert v[f"ch{ch + 1}_std"] == pytest.approx(r[:, ch].std())
+        assert v[f"ch{ch + 1}_min"] == r[:, ch].min() and v[f"ch{ch + 1}_max"] == r[:, ch].max()
+        assert v[f"ch{ch + 1}_slope"] == pytest.approx(np.polyfit(t, r[:, ch], 1)[0])
+        for b in range(B):
+            assert v[f"ch{ch + 1}_phase{b}"] == pytest.approx(r[25 * b:25 * (b + 1), ch].mean())
+
+
+def test_cycles_are_logged_beside_the_run(tmp_path):
+    eng = FeatureEngine(2, RATE, cycle_seconds=1.0, phase_bins=2)
+    ts = 10.0 + np.arange(250) / RATE
+    x = np.ones((250, 2)) + np.arange(250)[:, None] * 1e-3
+    logger = RunLogger(str(tmp_path), "CSV", 2, {"device": "dev1"}, flush_interval=0.05).start()
+    logger.write(ts, x)
+    eng.process(ts, x)
+    logger.write_cycles(eng.drain_cycles(), eng.feature_names())
+    logger.stop()
+    assert logger.error is None and logger.cycles == 2
+    assert logger.cycles_path == logger.files[0][:-len(".csv")] + ".cycles.csv"
+    rows = np.loadtxt(logger.cycles_path, delimiter=",", skiprows=1)
+    with open(logger.cycles_path) as f:
+        assert f.readline().strip().split(",") == ["start", "samples"] + eng.feature_names()
+    assert rows.shape == (2, 2 + len(eng.feature_names()))
+    assert rows[:, 0].tolist() == [10000.0, 11000.0]  # epoch ms, like the run file
+    assert rows[:, 1].tolist() == [100, 100]
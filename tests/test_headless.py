@@ -0,0 +1,35 @@
+import io
+import json
+
+import numpy as np
+
+import headless
+from config import read_settings
+from runlog import write_run
+
+
+def run(*argv):
+    out = io.StringIO()
+    code = headless.run(headless.build_parser(read_settings()).parse_args(list(argv)), out=out)
+    return code, out.getvalue()
+
+
+def make_run(path, n=300):
+    write_run(str(path), "CSV", 1_700_000_000.0 + np.arange(n) / 100.0, np.ones((n, 2)), {"rate_hz": 100})
+
+
+def test_replay_with_metrics_log(tmp_path):
+    make_run(tmp_path / "run.csv")
+    metrics = tmp_path / "metrics.jsonl"
+    code, out = run("--replay", str(tmp_path / "run.csv"), "--speed", "0", "--no-log", "--metrics", str(metrics))
+    assert code == 0 and "replay finished: 300 samples" in out
+    snaps = [json.loads(ln) for ln in metrics.read_text().splitlines()]
+    assert snaps and "elapsed_s" in snaps[-1]
+
+
+def test_unwritable_metrics_log_is_a_start_failure(tmp_path, capsys):
+    make_run(tmp_path / "run.csv")
+    # a directory where the metrics file should go
+    code, _ = run("--replay", str(tmp_path / "run.csv"), "--speed", "0", "--no-log", "--metrics", str(tmp_path))
+    assert code == 2
+    assert "Start failed" in capsys.readouterr().err
@@ -0,0 +1,82 @@
+import sys
+
+import numpy as np
+import pytest
+
+from heater import HeaterEngine, load_custom, profile_lut
+
+
+@pytest.mark.parametrize("profile", ["Samio", "Linear"])
+def test_profile_lut_spans_one_cycle(profile):
+    lut = profile_lut(profile, 64)
+    assert lut.shape == (64,)
+    assert lut.min() == pytest.approx(0.0) and lut.max() == pytest.approx(1.0)
+    assert lut[0] == pytest.approx(0.0) and lut[32] == pytest.approx(1.0)
+
+
+def test_profile_lut_rejects_unknown_and_missing_custom():
+    with pytest.raises(ValueError):
+        profile_lut("Sawtooth")
+    with pytest.raises(ValueError):
+        profile_lut("Custom")
+
+
+def test_load_custom_values_in_volts(tmp_path):
+    path = tmp_path / "profile.csv"
+    path.write_text("# volts\n0\n2.5\n5\n2.5\n")
+    lut = load_custom(str(path), size=8, vmax=5.0)
+    # evenly spaced points, wrapping back to the first at the end of the cycle
+    assert np.allclose(lut, [0, 0.25, 0.5, 0.75, 1.0, 0.75, 0.5, 0.25])
+
+
+def test_load_custom_time_value_rows(tmp_path):
+    path = tmp_path / "profile.csv"
+    path.write_text("0, 0.0\n5, 1.0\n10, 0.0\n")
+    lut = load_custom(str(path), size=4)
+    # times are rescaled to the cycle; the last row sits at phase 1, so the wrap adds nothing
+    assert np.allclose(lut, [0.0, 0.5, 1.0, 0.5])
+
+
+def test_phase_and_setpoint_follow_the_schedule():
+    eng = HeaterEngine("Linear", vmax=4.0, preheat=10.0, period=20.0, lut_size=400)
+    ts = np.array([-1.0, 0.0, 5.0, 10.0, 15.0, 20.0, 35.0])
+    assert np.all(np.isnan(eng.phase_at(ts)))  # not started
+    assert np.all(eng.setpoint_at(ts) == 0)
+    eng.t0 = 100.0
+    ts = ts + 100.0
+    phase = eng.phase_at(ts)
+    assert np.all(np.isnan(phase[:3]))
+    assert np.allclose(phase[3:], [0.0, 0.25, 0.5, 0.25])
+    # before start: off; preheat: full voltage; then the triangular ramp
+    assert np.allclose(eng.setpoint_at(ts), [0.0, 4.0, 4.0, 0.0, 2.0, 4.0, 2.0])
+
+
+def test_engine_reports_ticks():
+    eng = HeaterEngine("Linear", vmax=1.0, preheat=0.0, period=1.0, step_hz=200)
+    got = []
+    eng.output = got.append
+    eng.start()
+    try:
+        import time
+        time.sleep(0.2)
+    finally:
+        eng.stop()
+    stats = eng.jitter_stats()
+    assert stats["ticks"] > 0 and {"missed", "late", "p99_us"} <= set(stats)
+    assert got[-1] == 0.0  # stop switches the heater off
+
+
+@pytest.mark.skipif(not sys.platform.startswith(("linux", "darwin")), reason="needs a POSIX pty")
+def test_simulated_device_applies_schedule_per_sample():
+    from acquisition import FakeDevice
+    dev = FakeDevice(channels=2, rate=100)
+    try:
+        np.random.seed(0)
+        plain = dev.block(50)
+        # a schedule at 10 V: the board reads every sample against it, not the last pushed set-point
+        dev.set_schedule(lambda ts: np.full(len(ts), 10.0), clock=lambda: 1000.0)
+        np.random.seed(0)
+        scheduled = dev.block(50)
+    finally:
+        dev.stop()
+    assert np.allclose(plain - scheduled, 0.5)
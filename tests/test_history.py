@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from history import TieredHistory
+
+RATE = 200.0
+
+
+@pytest.fixture
+def history():
+    h = TieredHistory(2, 4096)
+    ts = np.arange(100_000) / RATE
+    data = np.random.default_rng(0).random((len(ts), 2))
+    data[-10, 1] = 5.0  # spike inside the unaggregated tail
+    h.append(ts, data)
+    yield h
+    h.close()
+
+
+@pytest.mark.parametrize("t0, t1, max_points", [
+    (0.0, 499.995, 200), (0.0, 499.995, 2000), (0.0, 499.995, 20), (400.0, 499.995, 200), (490.0, 499.995, 200),
+])
+def test_query_returns_requested_point_count(history, t0, t1, max_points):
+    x, y = history.query(t0, t1, max_points)
+    assert y.shape == (2, len(x))
+    assert max_points * 0.9 <= len(x) <= max_points
+    assert np.all(np.diff(x) >= 0)
+
+
+def test_query_covers_tail(history):
+    t1 = 499.995
+    x, y = history.query(0.0, t1, 200)
+    # the samples newer than the coarsest complete bucket still get their share of points
+    assert (x > t1 - 10.0).sum() >= 2
+    assert y[1].max() == 5.0
+
+
+def test_short_range_is_raw(history):
+    x, y = history.query(10.0, 10.2, 200)
+    assert np.allclose(np.diff(x), 1 / RATE)
+
+
+def test_spill_array_grows_across_remaps(tmp_path):
+    from history import SpillArray
+    a = SpillArray(str(tmp_path / "a.bin"), 2, np.float32, capacity=4)
+    rows = np.arange(200, dtype=np.float32).reshape(100, 2)
+    for i in range(0, 100, 7):
+        a.append(rows[i:i + 7])
+    assert len(a) == 100 and a.capacity >= 100
+    assert np.array_equal(a.rows(), rows)
+    assert np.array_equal(a.column(1), rows[:, 1])
+    a.close()
+
+
+def test_raw_reads_outlive_a_growing_append():
+    h = TieredHistory(1, 64)
+    h.append(np.arange(1000.0), np.arange(1000.0)[:, None])
+    x, y = h.raw_range(10.0, 19.0)  # old enough to come from the spill file
+    h.append(1000.0 + np.arange(1 << 17), np.zeros((1 << 17, 1)))  # remaps the spill files
+    assert x.tolist() == list(range(10, 20)) and y[0].tolist() == list(range(10, 20))
+    h.close()
+
+
+def test_tier_envelope_matches_raw_extremes(history):
+    x, y = history.query(0.0, 400.0, 100)
+    raw_x, raw_y = history.raw_range(0.0, 400.0)
+    assert y.min(axis=1) == pytest.approx(raw_y.min(axis=1), abs=1e-6)
+    assert y.max(axis=1) == pytest.approx(raw_y.max(axis=1), abs=1e-6)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from inference import SlidingWindows
+
+
+def stream(n, channels=2):
+    ts = np.arange(n, dtype=np.float64)
+    return ts, np.stack([ts * 10 ** c for c in range(channels)], axis=1)
+
+
+@pytest.mark.parametrize("window, hop", [(5, 2), (5, 5), (4, 7), (1, 1)])
+@pytest.mark.parametrize("batch", [1, 3, 16, 100])
+def test_windows_match_direct_slicing(window, hop, batch):
+    ts, data = stream(60)
+    sw = SlidingWindows(2, window, hop)
+    ends, wins = [], []
+    for i in range(0, len(ts), batch):
+        e, w = sw.push(ts[i:i + batch], data[i:i + batch])
+        assert w.shape == (len(e), window * 2)
+        ends += e.tolist()
+        wins += list(w)
+    # a window ends every `hop` samples once the first `window` samples are in
+    want = list(range(window - 1, 60, hop))
+    assert ends == want
+    for end, w in zip(ends, wins):
+        rows = data[int(end) - window + 1:int(end) + 1]
+        assert np.array_equal(w, rows.ravel())  # time-major: row by row, channels within each row
+
+
+def test_window_boundary_needs_the_last_sample():
+    sw = SlidingWindows(1, 4, 3)
+    ts, data = stream(7, 1)
+    assert len(sw.push(ts[:3], data[:3])[0]) == 0
+    assert sw.push(ts[3:4], data[3:4])[0].tolist() == [3]
+    assert len(sw.push(ts[4:6], data[4:6])[0]) == 0
+    assert sw.push(ts[6:7], data[6:7])[0].tolist() == [6]
+    # only the samples the next window can use are kept
+    assert len(sw._ts) <= sw.window
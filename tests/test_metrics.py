@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+import pytest
+
+from metrics import MetricsLog, Timer, flatten
+
+
+def test_timer_percentiles_in_milliseconds():
+    t = Timer(size=1000)
+    assert t.stats() is None
+    for ms in range(1, 101):
+        t.add(ms / 1000)
+    s = t.stats()
+    assert s["count"] == 100
+    assert s["p50_ms"] == pytest.approx(50.5)
+    assert s["p99_ms"] == pytest.approx(np.percentile(np.arange(1, 101), 99))
+    assert s["max_ms"] == pytest.approx(100)
+
+
+def test_timer_keeps_only_the_last_window():
+    t = Timer(size=10)
+    for _ in range(50):
+        t.add(1.0)  # slow start, then fast
+    for _ in range(10):
+        t.add(0.001)
+    s = t.stats()
+    assert s["count"] == 60
+    assert s["p50_ms"] == pytest.approx(1.0) and s["max_ms"] == pytest.approx(1.0)
+
+
+def test_flatten_and_metrics_log(tmp_path):
+    snap = {"time": 1.0, "devices": {"dev1": {"rate_hz": 200.0, "poll": {"p99_ms": np.float64(0.5)}}}}
+    assert flatten(snap) == {"time": 1.0, "devices.dev1.rate_hz": 200.0, "devices.dev1.poll.p99_ms": 0.5}
+    log = MetricsLog(str(tmp_path / "sub" / "metrics.jsonl"))
+    log.write(snap)
+    log.write({"time": 2.0})
+    log.close()
+    lines = (tmp_path / "sub" / "metrics.jsonl").read_text().splitlines()
+    assert [json.loads(ln)["time"] for ln in lines] == [1.0, 2.0]
+    assert json.loads(lines[0])["devices"]["dev1"]["poll"]["p99_ms"] == 0.5
@@ -0,0 +1,136 @@
+import time
+
+import numpy as np
+import pytest
+
+from codec import BinaryFrameEncoder
+from replay import BinaryRun, CsvRun, ReplaySource, open_run
+from runlog import write_run
+
+RATE = 100.0
+T0 = 1_700_000_000.0
+
+
+def make_run(path, n=1000, channels=3, ts_format="Epoch ms"):
+    ts = T0 + np.arange(n) / RATE
+    block = np.random.default_rng(2).random((n, channels)).round(6)
+    write_run(str(path), "HDF5" if str(path).endswith(".h5") else "CSV", ts, block, {"rate_hz": RATE}, ts_format)
+    return ts, block
+
+
+@pytest.fixture
+def small_index(monkeypatch):
+    monkeypatch.setattr(CsvRun, "index_every", 64)
+
+
+@pytest.mark.parametrize("ts_format", ["Epoch ms", "ISO 8601"])
+def test_csv_reads_and_locates_across_index_blocks(tmp_path, small_index, ts_format):
+    ts, block = make_run(tmp_path / "run.csv", ts_format=ts_format)
+    run = open_run(str(tmp_path / "run.csv"))
+    assert run.rows == 1000 and run.channels == 3 and run.rate == RATE
+    got_ts, got = run.read(100, 300)
+    assert np.allclose(got_ts, ts[100:300], atol=1e-3)
+    assert np.allclose(got, block[100:300], atol=1e-6)
+    assert run.locate(ts[513] - 0.004) == 513
+    got_ts, got = run.read_range(ts[200], ts[263])
+    assert len(got_ts) == 64 and np.allclose(got, block[200:264], atol=1e-6)
+    # the index is cached and reused on the next open
+    assert (tmp_path / "run.csv.idx.npz").exists()
+    assert np.array_equal(CsvRun(str(tmp_path / "run.csv")).idx_off, run.idx_off)
+
+
+def test_csv_malformed_line_does_not_shift_rows(tmp_path, small_index):
+    path = tmp_path / "run.csv"
+    ts, block = make_run(path)
+    lines = path.read_bytes().split(b"\n")
+    header = sum(1 for ln in lines if ln.startswith(b"#")) + 1
+    lines[header + 70] = b"garbage"
+    lines[header + 75] = lines[header + 75].replace(b",", b",x", 1)  # right field count, bad number
+    path.write_bytes(b"\n".join(lines))
+    run = CsvRun(str(path))
+    assert run.rows == 1000
+    got_ts, got = run.read(60, 90)
+    keep = [i for i in range(60, 90) if i not in (70, 75)]
+    assert np.allclose(got_ts, ts[keep], atol=1e-3)
+    assert np.allclose(got, block[keep], atol=1e-6)
+    assert run.bad_frames == 2
+    # rows after the damage are still where the index says they are
+    assert np.allclose(run.read(900, 901)[1], block[900:901], atol=1e-6)
+
+
+def test_hdf5_read_and_locate(tmp_path):
+    pytest.importorskip("h5py")
+    ts, block = make_run(tmp_path / "run.h5")
+    run = open_run(str(tmp_path / "run.h5"))
+    assert run.rows == 1000 and run.rate == RATE
+    assert run.locate(ts[400]) == 400
+    got_ts, got = run.read_range(ts[10], ts[19])
+    assert np.array_equal(got_ts, ts[10:20]) and np.allclose(got, block[10:20])
+    run.close()
+
+
+@pytest.mark.parametrize("crc", [False, True])
+def test_binary_capture_reads_frames(tmp_path, crc):
+    block = np.random.default_rng(3).random((200, 4)).astype(np.float32)
+    path = tmp_path / "cap.bin"
+    path.write_bytes(BinaryFrameEncoder(crc).encode(block))
+    run = BinaryRun(str(path), rate=RATE, start=T0)
+    assert run.rows == 200 and run.channels == 4
+    got_ts, got = run.read(50, 60)
+    assert np.allclose(got_ts, T0 + np.arange(50, 60) / RATE)
+    assert np.array_equal(got, block[50:60])
+    assert run.locate(T0 + 1.0) == 100
+
+
+def test_binary_capture_with_stray_byte_raises(tmp_path):
+    enc = BinaryFrameEncoder(True)
+    block = np.random.default_rng(4).random((100, 4)).astype(np.float32)
+    path = tmp_path / "cap.bin"
+    path.write_bytes(enc.encode(block[:40]) + b"\x00" + enc.encode(block[40:]))
+    run = BinaryRun(str(path), rate=RATE, start=T0)
+    assert np.array_equal(run.read(0, 40)[1], block[:40])
+    with pytest.raises(ValueError, match="row 40"):
+        run.read(30, 60)
+    assert run.bad_frames == 1
+
+
+def test_binary_capture_with_corrupt_payload_fails_crc(tmp_path):
+    data = bytearray(BinaryFrameEncoder(True).encode(np.ones((10, 2), np.float32)))
+    data[3 * (len(data) // 10) + 8] ^= 0xFF  # a sample byte of row 3
+    path = tmp_path / "cap.bin"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="row 3"):
+        BinaryRun(str(path), rate=RATE, start=T0).read(0, 10)
+
+
+def test_unpaced_replay_drains_in_bounded_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(ReplaySource, "max_rows", 100)
+    monkeypatch.setattr(ReplaySource, "drain_rows", 250)
+    ts, block = make_run(tmp_path / "run.csv", n=3000)
+    src = ReplaySource(open_run(str(tmp_path / "run.csv")), speed=None)
+    src.start()
+    got, deadline = [], time.time() + 10
+    while time.time() < deadline and not (src.finished and not src.backlog):
+        out = src.drain()
+        if out is not None:
+            assert len(out[0]) <= 300  # stops at the first batch that reaches drain_rows
+            got.append(out)
+        time.sleep(0.005)
+    src.stop()
+    assert src.error is None and src.finished
+    assert np.allclose(np.concatenate([t for t, _ in got]), ts, atol=1e-3)
+    assert np.allclose(np.concatenate([b for _, b in got]), block, atol=1e-6)
+
+
+def test_paced_replay_respects_range(tmp_path):
+    ts, block = make_run(tmp_path / "run.csv", n=400)
+    src = ReplaySource(open_run(str(tmp_path / "run.csv")), speed=100.0, t0=ts[100], t1=ts[299])
+    src.start()
+    deadline = time.time() + 10
+    while time.time() < deadline and not src.finished:
+        time.sleep(0.01)
+    src.stop()
+    got = []
+    while (out := src.drain()) is not None:
+        got.append(out)
+    assert np.allclose(np.concatenate([b for _, b in got]), block[100:300], atol=1e-6)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from ringbuffer import RingBuffer
+
+
+def feed(buf, n, start=0, chunk=7):
+    for i in range(start, start + n, chunk):
+        k = min(chunk, start + n - i)
+        buf.extend(np.arange(i, i + k, dtype=np.float64), np.arange(i, i + k)[:, None] * [1.0, -1.0])
+
+
+def test_window_is_newest_samples_after_wraparound():
+    buf = RingBuffer(2, 10)
+    feed(buf, 23)
+    ts, data = buf.view()
+    assert len(buf) == 10
+    assert ts.tolist() == list(range(13, 23))
+    assert data[0].tolist() == list(range(13, 23)) and data[1].tolist() == [-v for v in range(13, 23)]
+    assert np.shares_memory(ts, buf.ts)  # a view into the store, not a copy
+    assert buf.latest()[0] == 22 and buf.channel(1)[-1] == -22
+
+
+def test_single_appends_and_oversized_blocks():
+    buf = RingBuffer(2, 4)
+    for i in range(6):
+        buf.append(float(i), [i, -i])
+    assert buf.timestamps().tolist() == [2, 3, 4, 5]
+    buf.extend(np.arange(100.0, 110.0), np.zeros((10, 2)))  # more than the capacity at once
+    assert buf.timestamps().tolist() == [106, 107, 108, 109]
+    buf.clear()
+    assert len(buf) == 0 and buf.latest() == (None, None)
+
+
+def test_resize_keeps_the_newest_samples():
+    buf = RingBuffer(2, 8)
+    feed(buf, 13)
+    buf.resize(5)
+    assert buf.timestamps().tolist() == [8, 9, 10, 11, 12]
+    buf.resize(20)
+    assert buf.timestamps().tolist() == [8, 9, 10, 11, 12]
+    feed(buf, 20, start=13)
+    assert len(buf) == 20 and buf.timestamps().tolist() == list(range(13, 33))
+    assert buf.channel(1).tolist() == [-v for v in range(13, 33)]
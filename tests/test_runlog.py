@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from replay import open_run
+from runlog import RunLogger, format_timestamps
+
+RATE = 100.0
+
+
+def batches(n=20, rows=50, channels=2):
+    rng = np.random.default_rng(7)
+    for i in range(n):
+        ts = 1_700_000_000.0 + (i * rows + np.arange(rows)) / RATE
+        yield ts, rng.random((rows, channels)).round(6)
+
+
+def test_format_timestamps():
+    ts = [1_700_000_000.0, 1_700_000_000.1234]
+    assert format_timestamps(ts).tolist() == ["1700000000000.000", "1700000000123.400"]
+    assert format_timestamps(ts, "ISO 8601").tolist() == ["2023-11-14T22:13:20.000Z", "2023-11-14T22:13:20.123Z"]
+
+
+@pytest.mark.parametrize("fmt", ["CSV", "HDF5"])
+def test_rotates_by_size_without_losing_rows(tmp_path, fmt):
+    if fmt == "HDF5":
+        pytest.importorskip("h5py")
+    logger = RunLogger(str(tmp_path), fmt, 2, {"sample_id": "s1"}, rotate_mb=0.002, chunk_rows=100).start()
+    sent = list(batches())
+    for ts, block in sent:
+        logger.write(ts, block)
+    logger.stop()
+    assert logger.error is None and logger.rows == 1000
+    assert len(logger.files) > 2
+    assert os.path.basename(logger.files[1]) == logger.basename + "_part002" + os.path.splitext(logger.files[0])[1]
+    parts = [open_run(f) for f in logger.files]
+    assert [int(r.metadata["part"]) for r in parts] == list(range(1, len(parts) + 1))
+    ts = np.concatenate([r.read(0, r.rows)[0] for r in parts])
+    block = np.concatenate([r.read(0, r.rows)[1] for r in parts])
+    assert np.allclose(ts, np.concatenate([t for t, _ in sent]), atol=1e-3)
+    assert np.allclose(block, np.concatenate([b for _, b in sent]), atol=1e-6)
+    for r in parts:
+        r.close()
+
+
+def test_run_started_in_the_same_second_gets_a_counter(tmp_path):
+    first = RunLogger(str(tmp_path), "CSV", 2, {"device": "dev1"})
+    second = RunLogger(str(tmp_path), "CSV", 2, {"device": "dev1"})
+    third = RunLogger(str(tmp_path), "CSV", 2, {"device": "dev1"})
+    base = second.basename = third.basename = first.basename  # as if all three started within one second
+    for lg in (first, second, third):
+        lg.start()
+        lg.write(*next(batches(1)))
+        lg.stop()
+    assert [os.path.basename(lg.files[0]) for lg in (first, second, third)] == \
+        [base + ".csv", base + "_2.csv", base + "_3.csv"]
+    assert all(lg.rows == 50 for lg in (first, second, third))